@@ -1,13 +1,21 @@
 import os
 import sys
 import re
+import bisect
+import hashlib
 import concurrent.futures
+import gc
 import time
+import mmap
+import threading
+import tempfile
+import tracemalloc
 
+from collections import Counter
 from pathlib import Path
-import json
 
 from checks import *
+from scanner import *
 
 
 # Path to the main package file
@@ -17,284 +25,2497 @@ root_pkg_path = r"Logical\Libraries\Package.pkg"
 script_directory = Path(__file__).resolve().parent
 
 
-# filens containing discontinuation information
-discontinuation_info = {
-    "obsolete_libs": {},
-    "reinstall_libs": {},
-    "obsolete_fbks": {},
-    "obsolete_funcs": {},
-    "unsupported_hw": {},
-    "deprecated_string_functions" : {},
-    "deprecated_math_functions" : {},
+# Directory of the discontinuation lists
+discontinuation_directory = script_directory / "discontinuations"
+
+# Discontinuation lists (<name>.json in the discontinuations directory)
+discontinuation_lists = [
+    "obsolete_libs", # obsolete libraries with reasons
+    "reinstall_libs", # Libraries that must be deleted and re-added with a version >= 6.0
+    "obsolete_fbks", # list of obsolete function blocks with reasons
+    "obsolete_funcs", # Hardcoded list of obsolete functions with reasons
+    "unsupported_hw", # hardware not supported by >= 6.0
+    "deprecated_string_functions", # deprecated string functions 8 bit and 16 bit
+    "deprecated_math_functions", # deprecated math functions
+]
+
+# Files defining the scan rules. A change in any of them invalidates the scan cache
+rule_definition_files = (
+    [discontinuation_directory / f"{filename}.json" for filename in discontinuation_lists]
+    + [Path(__file__).resolve()]
+    + sorted((script_directory / "checks").glob("*.py"))
+    + sorted((script_directory / "scanner").glob("*.py"))
+)
+
+
+def compile_function_call_matcher(functions):
+    """
+    Compiles a matcher for function names, matching them only when followed by '('.
+
+    Args:
+        functions (list): Function names.
+
+    Returns:
+        re.Pattern: The compiled matcher.
+    """
+    return compile_keyword_matcher(functions, suffix=r'\s*\(')
+
+
+# Sections of the discontinuation rule pack in the format name -> ([discontinuation lists], builder).
+# Each section holds a prebuilt lookup structure, is compiled to the __pycache__ directory
+# and is only rebuilt when one of its lists changes.
+rule_pack_sections = {
+    # Case-folded lookup tables, so every name found in a file is resolved with a single hash lookup
+    "obsolete_library_table": (["obsolete_libs"], build_lookup_table),
+    "reinstall_library_table": (["reinstall_libs"], build_lookup_table),
+    "obsolete_function_block_table": (["obsolete_fbks"], build_lookup_table),
+    # Reverse index from module type to reason, with support for family entries like "3AI*"
+    "unsupported_hardware_index": (["unsupported_hw"], build_hardware_index),
+    # Matchers are compiled once, so every file is scanned in a single pass regardless of the number of rules
+    "obsolete_functions": (["obsolete_funcs"], dict),
+    "obsolete_function_matcher": (["obsolete_funcs"], compile_keyword_matcher),
+    "deprecated_string_matcher": (["deprecated_string_functions"], compile_keyword_matcher),
+    "deprecated_math_matcher": (["deprecated_math_functions"], compile_function_call_matcher),
+}
+
+# Sections are loaded lazily, when the first check that needs them runs
+rule_pack = create_rule_pack(
+    rule_pack_sections,
+    discontinuation_directory,
+    script_directory / "__pycache__" / "rule_pack",
+    [Path(__file__).resolve()] + sorted((script_directory / "scanner").glob("*.py")),
+)
+
+pass
+def get_positive_int_option(option):
+    """
+    Returns the positive number following a command line option, e.g. 4 for --jobs 4.
+    Exits with an error message if the value is not a positive number.
+
+    Args:
+        option (str): The command line option.
+
+    Returns:
+        int: The value of the option, or None if the option is not provided.
+    """
+    value = get_option_value(option)
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        print(f"Error: {option} expects a positive number, got: {value}")
+        sys.exit(1)
+    return int(value)
+
+def get_option_value(option, default=None):
+    """
+    Returns the value following a command line option, e.g. 4 for --jobs 4.
+
+    Args:
+        option (str): The command line option.
+        default: Value returned if the option is not provided.
+
+    Returns:
+        str: The value of the option, or the default value.
+    """
+    if option in sys.argv:
+        index = sys.argv.index(option)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+# Console progress output, disabled in batch worker processes
+show_progress = True
+
+def display_progress(message):
+    """
+    Displays a progress message on the same line in the terminal.
+    Ensures old text is cleared before writing new text.
+    """
+    if not show_progress:
+        return
+
+    sys.stdout.write('\r' + ' ' * 80)  # Clear line with space
+    sys.stdout.write('\r' + message)  # Write new message
+    sys.stdout.flush()
+
+def process_stub(file_path, content, *args):
+    """
+    Stub process function for demonstration purposes.
+    Simulates processing of files without actual logic.
+
+    Args:
+        file_path (str): The file path to process.
+        content (bytes): Raw content of the file.
+        *args: Additional arguments.
+
+    Returns:
+        list: An empty list for this stub function.
+    """
+    return []
+
+
+def resolve_rule_roots(project_path, rules):
+    """
+    Resolves the root directory of each scan rule.
+
+    Args:
+        project_path (str): Path to the project directory.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+
+    Returns:
+        dict: Normalized root directory per rule name.
+    """
+    return {name: os.path.normpath(os.path.join(project_path, sub_dir)) for name, (sub_dir, *_) in rules.items()}
+
+
+def get_active_rules(directory, rule_roots):
+    """
+    Returns the scan rules whose root directory contains the given directory.
+
+    Args:
+        directory (str): The directory to check.
+        rule_roots (dict): Root directory per rule name, see resolve_rule_roots.
+
+    Returns:
+        list: Names of the active rules.
+    """
+    current_dir = os.path.normpath(directory)
+    return [
+        name for name, rule_root in rule_roots.items()
+        if current_dir == rule_root or current_dir.startswith(rule_root + os.sep)
+    ]
+
+
+def get_file_rules(file_name, active_rules, rules):
+    """
+    Returns the active scan rules that are registered for the extension of a file.
+
+    Args:
+        file_name (str): Name of the file.
+        active_rules (list): Names of the rules active in the directory of the file.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+
+    Returns:
+        list: Names of the rules to apply to the file.
+    """
+    return [name for name in active_rules if any(file_name.endswith(ext) for ext in rules[name][1])]
+
+
+def collect_scan_targets(project_index, rules, project_model=None):
+    """
+    Assigns each file of the project index to the scan rules that apply to it.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        project_model (set): Files referenced by the packages of the project, see build_project_model.
+            If provided, files in the Logical directory that are not referenced are skipped.
+
+    Returns:
+        list: Files to scan in the format (file_path, [rule names]).
+    """
+    rule_roots = resolve_rule_roots(project_index["root"], rules)
+    logical_prefix = os.path.join(project_index["root"], "Logical", "")
+    targets = []
+    # Rules are registered for single extensions, so they are resolved once per set of active rules and extension
+    rules_by_extension = {}
+
+    for root, _, files in iter_directories(project_index, project_index["root"]):
+        active_rules = tuple(get_active_rules(root, rule_roots))
+        if not active_rules:
+            continue
+
+        for file in files:
+            key = (active_rules, file[file.rfind("."):] if "." in file else "")
+            rule_names = rules_by_extension.get(key)
+            if rule_names is None:
+                rule_names = rules_by_extension[key] = get_file_rules(file, active_rules, rules)
+            if rule_names:
+                file_path = os.path.join(root, file)
+                if project_model is not None and file_path.startswith(logical_prefix) and file_path not in project_model:
+                    continue
+                targets.append((file_path, rule_names))
+
+    return targets
+
+
+def apply_scan_rules(file_path, content, rule_names, rules, rule_times=None, deadline=None):
+    """
+    Passes the content of a file to the given scan rules, according to their read tier in scan_rule_tiers.
+    Header rules only get the start of the content, prefilter rules are skipped if their marker is missing.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        rule_names (list): Names of the scan rules to apply.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        rule_times (dict): If provided, filled with the time spent in each rule in seconds.
+        deadline (float): time.perf_counter() value after which no further rule is started, None to apply all rules.
+
+    Returns:
+        dict: Results per rule name. Rules that were not applied because of the deadline are missing.
+    """
+    results = {}
+    for name in rule_names:
+        if deadline is not None and results and time.perf_counter() > deadline:
+            break
+        _, _, process_function, sections = rules[name]
+        tier, marker = scan_rule_tiers.get(name, ("full", None))
+        if tier == "prefilter" and content.find(marker) == -1:
+            # The rule cannot match without the marker, so its regexes do not run at all
+            results[name] = []
+            continue
+
+        rule_content = content[:header_probe_size] if tier == "header" else content
+        args = [get_rule_section(rule_pack, section) for section in sections]
+        if rule_times is None:
+            results[name] = process_function(file_path, rule_content, *args)
+        else:
+            start_time = time.perf_counter()
+            results[name] = process_function(file_path, rule_content, *args)
+            rule_times[name] = time.perf_counter() - start_time
+    return results
+
+
+def find_rule_matches(rule_name, content, rules):
+    """
+    Finds the names a scan rule reports in the raw content of a file, with the matcher its process function uses,
+    so the positions are those of the matches the findings came from, e.g. commented out XML elements are skipped.
+
+    Args:
+        rule_name (str): Name of the scan rule.
+        content (bytes): Raw content of the file, or a memory map of the file.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+
+    Returns:
+        list: Matches in the format (key, (start, end)), in document order. The key is compared like the rule
+            compares names, see get_finding_key.
+    """
+    if rule_name in ("reinstall_libraries", "invalid_pkg_files"):
+        return [(name.lower(), span) for name, span in find_element_spans(object_matcher, content)]
+    if rule_name == "lby_dependencies":
+        return [(dependency.lower(), span) for dependency, span in find_element_spans(dependency_matcher, content)]
+    if rule_name == "hardware":
+        return find_element_spans(module_type_matcher, content)
+    if rule_name == "invalid_var_typ_files":
+        return [
+            (match.group(1).decode('ascii').lower(), match.span(1))
+            for match in function_block_declaration_pattern.finditer(content)
+        ]
+    if rule_name == "invalid_st_c_files":
+        matcher = get_rule_section(rule_pack, rules[rule_name][3][1])
+        return [(keyword, (offset, offset + len(keyword))) for keyword, offset in find_keywords(matcher, content)]
+    if rule_name == "c_include_dependencies":
+        matches = []
+        for match in include_pattern.finditer(content):
+            included_library = os.path.basename(match.group(1).decode('utf-8', errors='ignore').replace("\\", "/"))
+            if included_library.lower().endswith(".h"):
+                matches.append((included_library[:-2].lower(), match.span()))
+        return matches
+
+    # The finding is the file itself, located at the first match of the rule
+    if rule_name == "compatibility":
+        match = version_pattern.search(content)
+    else:
+        match = get_rule_section(rule_pack, rules[rule_name][3][0]).search(content)
+    return [(None, match.span())] if match else []
+
+
+def get_finding_key(rule_name, finding):
+    """
+    Returns the key of a finding, to compare it with the keys of find_rule_matches.
+    Names are compared case-insensitively for the rules that look them up in a lookup table, and exactly otherwise.
+
+    Args:
+        rule_name (str): Name of the scan rule.
+        finding: The finding as returned by the process function of the rule.
+
+    Returns:
+        str: The key, None for rules that report the file itself.
+    """
+    if rule_name in ("deprecated_string_functions", "deprecated_math_functions", "compatibility"):
+        return None
+    if rule_name == "lby_dependencies":
+        return finding[1].lower()
+    if rule_name in ("hardware", "invalid_st_c_files"):
+        return finding[0]
+    return finding[0].lower()
+
+
+def find_finding_spans(content, results, rules):
+    """
+    Determines the byte span of each finding of a file from the matches of its rule, see find_rule_matches.
+    Repeated findings are assigned to successive matches, while findings that differ only in the reason share their match.
+
+    Args:
+        content (bytes): Raw content of the file, or a memory map of the file.
+        results (dict): Results per rule name.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+
+    Returns:
+        dict: Spans per rule name in the format [(start, end)], in the order of the results. None if no match of the finding was found.
+    """
+    spans = {}
+    for name, findings in results.items():
+        spans[name] = []
+        if not findings:
+            continue
+
+        match_spans = {}
+        for key, span in find_rule_matches(name, content, rules):
+            match_spans.setdefault(key, []).append(span)
+        # Number of identical findings seen so far
+        repeats = Counter()
+        for finding in findings:
+            key_spans = match_spans.get(get_finding_key(name, finding))
+            if key_spans:
+                index = repeats[finding]
+                spans[name].append(key_spans[index] if index < len(key_spans) else key_spans[0])
+                repeats[finding] += 1
+            else:
+                spans[name].append(None)
+    return spans
+
+
+def locate_spans(content, spans):
+    """
+    Converts the spans of findings to line and column.
+    Only the start of the line of a finding is decoded, to count the characters before it. The findings are visited
+    in file order, so a long line with many findings is decoded only once.
+
+    Args:
+        content (bytes): Raw content of the file, or a memory map of the file.
+        spans (dict): Spans per rule name, see find_finding_spans.
+
+    Returns:
+        dict: Locations per rule name in the format [(line, column)]. Findings without a span are located at (1, 1).
+    """
+    locations = {name: [(1, 1)] * len(rule_spans) for name, rule_spans in spans.items()}
+    starts = sorted(
+        (span[0], name, index) for name, rule_spans in spans.items() for index, span in enumerate(rule_spans) if span is not None
+    )
+    if not starts:
+        return locations
+
+    # Offsets of all line breaks, collected once per file with findings
+    line_ends = [line_end.start() for line_end in re.finditer(rb'\n', content)]
+    line, position, column = 0, 0, 1
+    for start, name, index in starts:
+        start_line = bisect.bisect_left(line_ends, start) + 1
+        if start_line != line:
+            # Count the characters from the start of the line, further findings in the line continue from here
+            line, position, column = start_line, line_ends[start_line - 2] + 1 if start_line > 1 else 0, 1
+        column += len(content[position:start].decode('utf-8', errors='ignore'))
+        position = start
+        locations[name][index] = (line, column)
+    return locations
+
+
+def locate_findings(content, results, rules):
+    """
+    Determines the line and column of each finding of a file, see find_finding_spans.
+
+    Args:
+        content (bytes): Raw content of the file, or a memory map of the file.
+        results (dict): Results per rule name.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+
+    Returns:
+        dict: Locations per rule name in the format [(line, column)], in the order of the results.
+    """
+    return locate_spans(content, find_finding_spans(content, results, rules))
+
+
+def merge_chunk_findings(name, findings, chunk_findings, locations, chunk_locations):
+    """
+    Adds the findings of a chunk to the findings of the previous chunks, according to the merge mode of the rule
+    in chunk_merge_modes, so the result is the same as if the whole file had been scanned at once.
+
+    Args:
+        name (str): Name of the scan rule.
+        findings (list): Findings of the previous chunks. Updated in place.
+        chunk_findings (list): Findings of the chunk.
+        locations (list): Locations of the findings of the previous chunks, in the file. Updated in place.
+        chunk_locations (list): Locations of the findings of the chunk, in the file.
+    """
+    mode = chunk_merge_modes[name]
+    if mode == "all":
+        findings.extend(chunk_findings)
+        locations.extend(chunk_locations)
+    elif mode == "unique":
+        for finding, location in zip(chunk_findings, chunk_locations):
+            if finding not in findings:
+                findings.append(finding)
+                locations.append(location)
+    elif not chunk_findings:
+        return
+    elif not findings:
+        findings[:], locations[:] = chunk_findings[:1], chunk_locations[:1]
+    elif mode == "first_pattern":
+        # Keep the finding whose pattern comes first in the patterns of the rule
+        patterns = list(get_rule_section(rule_pack, scan_rules[name][3][0]))
+        if patterns.index(chunk_findings[0][0]) < patterns.index(findings[0][0]):
+            findings[:], locations[:] = chunk_findings[:1], chunk_locations[:1]
+
+
+def find_chunk_cut(data, boundary):
+    """
+    Finds the last position at which a chunk can be cut without splitting a match of the scan rules.
+
+    Args:
+        data (bytes): Content of the chunk.
+        boundary (str): Boundary of the matches, see chunk_boundaries.
+
+    Returns:
+        int: Length of the part of the chunk to scan, 0 if there is no such position.
+    """
+    if boundary == "statement":
+        return data.rfind(b";") + 1
+    if boundary == "element":
+        # Before the last start tag, so neither a start tag nor an element with its end tag is split
+        position = len(data)
+        while True:
+            position = data.rfind(b"<", 0, position)
+            if position <= 0:
+                return 0
+            if data[position + 1:position + 2] in (b"/", b""):
+                # An end tag, or a tag whose name is not read yet
+                continue
+            comment_start = data.rfind(b"<!--", 0, position)
+            if comment_start > data.rfind(b"-->", 0, position):
+                # Inside a comment, cut before the comment instead
+                return comment_start
+            return position
+    return data.rfind(b"\n") + 1
+
+
+def scan_file_chunks(f, file_path, rule_names, rules, chunk_size, deadline=None):
+    """
+    Scans an oversized file in chunks of about chunk_size bytes, so the time per rule call stays bounded.
+    Scanning stops early if the time budget of the file is used up. Chunks are cut where no match of the rules
+    can be split, see chunk_boundaries, and the findings of the chunks are merged according to chunk_merge_modes.
+    If a chunk contains no such position, e.g. a line longer than a chunk, it is cut before its last word and the next
+    chunk starts with the last chunk_overlap bytes of it. Findings at the same offset of the file are then only kept once.
+    Header rules are only applied to the first chunk.
+
+    Args:
+        f (file): The file, opened in binary mode.
+        file_path (str): Path to the file.
+        rule_names (list): Names of the scan rules to apply.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        chunk_size (int): Number of bytes read per chunk.
+        deadline (float): time.perf_counter() value at which scanning stops, None to scan the whole file.
+
+    Returns:
+        tuple: (results per rule name, locations per rule name, content hash, scanned bytes, True if the whole file was scanned).
+    """
+    results = {name: [] for name in rule_names}
+    locations = {name: [] for name in rule_names}
+    body_rule_names = [name for name in rule_names if scan_rule_tiers.get(name, ("full", None))[0] != "header"]
+    boundaries = {chunk_boundaries.get(name, "line") for name in body_rule_names}
+    boundary = boundaries.pop() if len(boundaries) == 1 else "line"
+    sha = hashlib.sha1()
+    scanned_bytes = 0
+    # Line breaks in the file before the chunk, and characters of the line before the chunk if the chunk starts within a line
+    line_offset = 0
+    column_offset = 0
+    pending = b""
+    overlap = b""
+    # Findings in the overlap with the next chunk, as (rule name, finding, offset in the file)
+    overlap_findings = set()
+
+    while True:
+        block = f.read(chunk_size)
+        data = pending + block
+        pending = b""
+        forced_cut = False
+        if block:
+            # Keep the rest after the last boundary for the next chunk
+            cut = find_chunk_cut(data, boundary)
+            if not cut:
+                # Cut before the last word, so a keyword is never shortened, and scan the end again with the next chunk
+                cut = len(data) - len(re.search(rb'\w*\Z', data[-chunk_overlap:]).group()) or len(data)
+                forced_cut = True
+            data, pending = data[:cut], data[cut:]
+        if not data:
+            return results, locations, sha.hexdigest(), scanned_bytes, True
+
+        sha.update(data)
+        chunk = overlap + data
+        chunk_start = scanned_bytes - len(overlap)
+        chunk_results = apply_scan_rules(file_path, chunk, rule_names if scanned_bytes == 0 else body_rule_names, rules)
+        chunk_spans = find_finding_spans(chunk, chunk_results, rules)
+
+        overlap = chunk[-chunk_overlap:] if forced_cut else b""
+        next_start = chunk_start + len(chunk) - len(overlap)
+        previous_findings, overlap_findings = overlap_findings, set()
+        kept_results = {}
+        kept_spans = {}
+        for name, findings in chunk_results.items():
+            kept_results[name] = []
+            kept_spans[name] = []
+            for finding, span in zip(findings, chunk_spans[name]):
+                if span is not None:
+                    key = (name, finding, chunk_start + span[0])
+                    if key[2] >= next_start:
+                        overlap_findings.add(key)
+                    if key in previous_findings:
+                        # Already found by the previous chunk
+                        continue
+                kept_results[name].append(finding)
+                kept_spans[name].append(span)
+
+        chunk_locations = locate_spans(chunk, kept_spans)
+        for name, findings in kept_results.items():
+            merge_chunk_findings(
+                name, results[name], findings, locations[name], [
+                    (line + line_offset, column + column_offset if line == 1 else column)
+                    for line, column in chunk_locations[name]
+                ],
+            )
+
+        # Position of the next chunk, after the overlap is taken from this chunk
+        next_chunk_start = len(chunk) - len(overlap)
+        line_start = chunk.rfind(b"\n", 0, next_chunk_start) + 1
+        line_offset += chunk.count(b"\n", 0, next_chunk_start)
+        line_columns = len(chunk[line_start:next_chunk_start].decode('utf-8', errors='ignore'))
+        column_offset = column_offset + line_columns if line_start == 0 else line_columns
+        scanned_bytes += len(data)
+        if not block and not pending:
+            return results, locations, sha.hexdigest(), scanned_bytes, True
+        if deadline is not None and time.perf_counter() > deadline:
+            return results, locations, sha.hexdigest(), scanned_bytes, False
+
+
+def scan_file(file_path, rule_names, rules, cached_entry=None, profile=False, limits=None):
+    """
+    Reads a file once and passes its raw content to every scan rule registered for it.
+    The content is never decoded as a whole. Large files are mapped into memory instead of copied.
+    If only header rules apply to the file, only its first header_probe_size bytes are read and hashed.
+    Files above the size limit are scanned in chunks, see scan_file_chunks. Once the time budget is used up,
+    no further chunk or rule is scanned and the record is marked as incomplete.
+
+    Args:
+        file_path (str): Path to the file.
+        rule_names (list): Names of the scan rules to apply.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        cached_entry (dict): Cache entry of a previous scan. Its results are reused if the content hash is unchanged.
+        profile (bool): Add the measurements of the scan to the record under "profile", see add_file_profile.
+        limits (dict): Scan limits in the format {"max_file_size": bytes, "time_budget": seconds}, None for no limits.
+            Files exceeding a limit get a "limits" entry in the record, see add_limit_report.
+
+    Returns:
+        dict: File record in the format {"size", "mtime", "hash", "results", "locations"},
+              with the results and their (line, column) locations per rule name.
+    """
+    start_time = time.perf_counter()
+    if profile:
+        start_wall = start_time
+        start_cpu = time.thread_time()
+        start_memory = start_memory_measurement()
+    rule_times = {} if profile else None
+
+    header_only = all(scan_rule_tiers.get(name, ("full", None))[0] == "header" for name in rule_names)
+    max_file_size = limits["max_file_size"] if limits else None
+    time_budget = limits["time_budget"] if limits else None
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        deadline = start_time + time_budget if time_budget is not None else None
+        if not header_only and max_file_size is not None and stat.st_size > max_file_size:
+            results, locations, content_hash, size, complete = scan_file_chunks(
+                f, file_path, rule_names, rules, max_file_size, deadline
+            )
+            elapsed = time.perf_counter() - start_time
+            record = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": content_hash, "results": results, "locations": locations}
+            record["limits"] = {"elapsed": elapsed, "oversized": True, "scanned_bytes": size, "complete": complete}
+            if profile:
+                record["profile"] = {
+                    "bytes": size, "wall_time": elapsed, "cpu_time": time.thread_time() - start_cpu, "read_time": 0.0, "rule_times": {},
+                    "peak_memory": get_peak_memory(start_memory),
+                }
+            return record
+
+        if header_only:
+            data = f.read(header_probe_size)
+        elif stat.st_size >= mmap_threshold:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    if profile:
+        read_time = time.perf_counter() - start_wall
+
+    try:
+        content_hash = hash_content(data)
+        complete = True
+        if cached_entry and cached_entry["hash"] == content_hash and all(name in cached_entry["results"] for name in rule_names):
+            # Only the timestamp changed, e.g. after a checkout
+            results = {name: cached_entry["results"][name] for name in rule_names}
+            locations = {name: cached_entry["locations"][name] for name in rule_names}
+        else:
+            results = apply_scan_rules(file_path, data, rule_names, rules, rule_times, deadline)
+            locations = locate_findings(data, results, rules)
+            # Rules skipped after the time budget was used up report nothing
+            complete = len(results) == len(rule_names)
+            for name in rule_names:
+                results.setdefault(name, [])
+                locations.setdefault(name, [])
+        size = len(data)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    record = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": content_hash, "results": results, "locations": locations}
+    elapsed = time.perf_counter() - start_time
+    if time_budget is not None and elapsed > time_budget:
+        record["limits"] = {"elapsed": elapsed, "oversized": False, "scanned_bytes": size, "complete": complete}
+    if profile:
+        record["profile"] = {
+            "bytes": size,
+            "wall_time": time.perf_counter() - start_wall,
+            "cpu_time": time.thread_time() - start_cpu,
+            "read_time": read_time,
+            "rule_times": rule_times,
+            "peak_memory": get_peak_memory(start_memory),
+        }
+    return record
+
+
+# Files of at least this size are mapped into memory instead of read
+mmap_threshold = 1024 * 1024
+
+# Bytes at the end of a chunk that are scanned again at the start of the next chunk if the chunk contains no boundary
+# and was cut between two words, so a match that spans the cut is found. Far longer than the patterns the rules match.
+chunk_overlap = 64 * 1024
+
+# Where the chunks of a file above the size limit may be cut, in the format scan rule name -> boundary.
+# "element": before an XML start tag outside of a comment, as the matched elements may span lines.
+# "statement": after a semicolon, as a declaration may span lines.
+# Rules not listed match within a line, their chunks are cut after a line break.
+chunk_boundaries = {
+    "reinstall_libraries": "element",
+    "invalid_pkg_files": "element",
+    "hardware": "element",
+    "lby_dependencies": "element",
+    "invalid_var_typ_files": "statement",
+}
+
+# How the findings of the chunks of a file above the size limit are merged, in the format scan rule name -> merge mode.
+# "all": the findings of all chunks are reported.
+# "unique": like "all", but a finding already reported by a previous chunk is not repeated.
+# "once": the rule reports the file once, the finding of the first chunk with a finding is kept.
+# "first_pattern": like "once", but the finding whose pattern comes first in the patterns of the rule is kept.
+chunk_merge_modes = {
+    "reinstall_libraries": "all",
+    "invalid_pkg_files": "all",
+    "invalid_var_typ_files": "all",
+    "invalid_st_c_files": "first_pattern",
+    "hardware": "unique",
+    "lby_dependencies": "all",
+    "c_include_dependencies": "all",
+    "deprecated_string_functions": "once",
+    "deprecated_math_functions": "once",
+    "compatibility": "once",
+}
+
+# Default scan limits per file: files above the size are scanned in chunks of that size, and the scan of a file
+# stops when the time budget in seconds is used up. Files exceeding a limit are listed in the report.
+default_scan_limits = {"max_file_size": 64 * 1024 * 1024, "time_budget": 10.0}
+
+
+# Allocations between two collections of the youngest generation. The project index and the caches hold
+# hundreds of thousands of acyclic objects, with the default of 700 the collector traverses them over and over.
+gc_threshold = 100000
+
+
+# Scan rules of a process pool worker, set once per worker process by init_scan_worker
+worker_rules = None
+
+# Whether a process pool worker measures the scanned files, set by init_scan_worker
+worker_profile = False
+
+# Scan limits of a process pool worker, set by init_scan_worker
+worker_limits = None
+
+# Upper limit of files sent to a worker process at once
+max_batch_size = 256
+
+
+def init_scan_worker(rules, profile=False, limits=None):
+    """
+    Initializes a process pool worker with the scan rules, so they are transferred only once per process.
+
+    Args:
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        profile (bool): Measure the scanned files, see scan_file.
+        limits (dict): Scan limits per file, see scan_file.
+    """
+    global worker_rules, worker_profile, worker_limits
+    worker_rules = rules
+    worker_profile = profile
+    worker_limits = limits
+    if profile:
+        # Every worker scans its files one after another, so the peak memory of each file is exact
+        tracemalloc.start()
+
+
+def scan_batch(batch):
+    """
+    Scans a batch of files in a process pool worker.
+
+    Args:
+        batch (list): Files to scan in the format (file_path, [rule names], cached entry).
+
+    Returns:
+        list: File records in the format (file_path, record).
+    """
+    return [
+        (file_path, scan_file(file_path, rule_names, worker_rules, cached_entry, worker_profile, worker_limits))
+        for file_path, rule_names, cached_entry in batch
+    ]
+
+
+def split_into_batches(file_targets, jobs, keep_order=False):
+    """
+    Splits the files to scan into batches for the process pool.
+    Several batches per worker keep the load balanced, while batching keeps the IPC overhead low.
+    The files are dealt round robin, so files sorted by size are spread evenly over the batches.
+
+    Args:
+        file_targets (list): Files to scan in the format (file_path, [rule names], cached entry).
+        jobs (int): Number of worker processes.
+        keep_order (bool): If True, every batch holds consecutive files instead, so the batches complete
+            roughly in the order of the files.
+
+    Returns:
+        list: Batches of files to scan.
+    """
+    batch_size = max(1, min(max_batch_size, len(file_targets) // (jobs * 4)))
+    if keep_order:
+        return [file_targets[i:i + batch_size] for i in range(0, len(file_targets), batch_size)]
+    batch_count = -(-len(file_targets) // batch_size)
+    return [file_targets[i::batch_count] for i in range(batch_count)]
+
+
+def scan_files_parallel(
+    project_path, rules, jobs=None, cache=None, on_file=None, project_index=None, profile=None, project_model=None, limits=None
+):
+    """
+    Scans the project files in parallel for specific content.
+    The directory tree is walked once and every file is read once, no matter how many rules apply to it.
+
+    Args:
+        project_path (str): Path to the project directory.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        jobs (int): Number of worker processes. If None, the files are scanned in a thread pool instead.
+        cache (dict): Cache entries of a previous scan, see load_scan_cache. Files with unchanged size and
+            modification time are not read at all. The dictionary is updated in place with the entries of this scan.
+        on_file (callable): Called as on_file(file_path, record) to stream the findings while the scan runs.
+            Files are passed in traversal order, see build_project_index, each as soon as it and all files before it are scanned,
+            so the output is the same in every run. See scan_file for the format of the record.
+        project_index (dict): Index of the project directory tree, see build_project_index. Built if not provided.
+        profile (dict): Profile created by create_profile. If provided, every scanned file is measured and added to it.
+        project_model (set): Files referenced by the packages of the project, see build_project_model.
+            If provided, unreferenced files in the Logical directory are not scanned.
+        limits (dict): Scan limits per file, see scan_file. Without on_file, the largest files are scanned first,
+            so that they do not delay the end of the scan.
+
+    Returns:
+        dict: Aggregated results from all scanned files per rule name, and "slow_files" with the files that
+              exceeded a limit in the format (file_path, size, elapsed seconds, scanned bytes, oversized, complete).
+    """
+    if project_index is None:
+        project_index = build_project_index(project_path)
+
+    results = {name: [] for name in rules}
+    file_targets = collect_scan_targets(project_index, rules, project_model)
+    file_records = {}
+    pending_targets = []
+    slow_files = []
+    streamed_files = 0
+
+    def stream_records():
+        # Pass on the completed records in traversal order, up to the first file that is still being scanned
+        nonlocal streamed_files
+        while streamed_files < len(file_targets) and file_targets[streamed_files][0] in file_records:
+            file_path = file_targets[streamed_files][0]
+            on_file(file_path, file_records[file_path])
+            streamed_files += 1
+
+    def add_record(file_path, record):
+        file_limits = record.pop("limits", None)
+        if file_limits is not None:
+            slow_files.append((
+                file_path, record["size"], file_limits["elapsed"], file_limits["scanned_bytes"],
+                file_limits["oversized"], file_limits["complete"],
+            ))
+            if not file_limits["complete"]:
+                record["partial"] = True
+        file_records[file_path] = record
+        if profile is not None:
+            add_file_profile(profile, file_path, record.pop("profile", None))
+        if on_file:
+            stream_records()
+
+    for file_path, rule_names in file_targets:
+        cached_entry = cache.get(file_path) if cache is not None else None
+        if cached_entry is not None:
+            size, mtime = project_index["stats"][file_path]
+            if is_entry_current(cached_entry, size, mtime, rule_names):
+                add_record(file_path, cached_entry)
+                continue
+        pending_targets.append((file_path, rule_names, cached_entry))
+
+    # Largest files first, so a single large file does not keep the scan running after all others are done.
+    # Streamed findings are released in traversal order, so then the files are scanned in that order instead.
+    if not on_file:
+        pending_targets.sort(key=lambda target: project_index["stats"][target[0]][0], reverse=True)
+
+    total_files = len(pending_targets)
+    if cache is not None:
+        display_progress(f"Found {total_files} changed files to process ({len(file_records)} unchanged)...")
+    else:
+        display_progress(f"Found {total_files} files to process...")
+
+    if jobs:
+        # The regex and string matching holds the GIL, so only separate processes use more than one core
+        batches = split_into_batches(pending_targets, jobs, keep_order=bool(on_file))
+        processed_files = 0
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_scan_worker, initargs=(rules, profile is not None, limits)
+        ) as executor:
+            futures = [executor.submit(scan_batch, batch) for batch in batches]
+            for future in concurrent.futures.as_completed(futures):
+                for file_path, record in future.result():
+                    add_record(file_path, record)
+                    processed_files += 1
+                display_progress(f"Processing file {processed_files}/{total_files}...")
+    else:
+        # The threads share the peak memory of tracemalloc, so a profiled scan uses a single thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1 if profile is not None else None) as executor:
+            futures = {
+                executor.submit(scan_file, path, rule_names, rules, cached_entry, profile is not None, limits): path
+                for path, rule_names, cached_entry in pending_targets
+            }
+            for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                display_progress(f"Processing file {i}/{total_files}...")
+                add_record(futures[future], future.result())
+
+    # Merge in walk order, so the results do not depend on which worker finished first
+    for file_path, rule_names in file_targets:
+        for name in rule_names:
+            results[name].extend(file_records[file_path]["results"][name])
+
+    if cache is not None:
+        # Partially scanned files are scanned again on the next run
+        cache.clear()
+        cache.update((file_path, record) for file_path, record in file_records.items() if not record.get("partial"))
+    results["slow_files"] = sorted(slow_files)
+
+    display_progress("Processing complete.".ljust(50))  # Clear line
+    if show_progress:
+        print()  # Move to next line
+    return results
+
+def scan_file_changes(project_path, relative_path, rule_names, rules, revision):
+    """
+    Scans the current and the previous version of a changed file and compares the findings.
+
+    Args:
+        project_path (str): Path to the project directory.
+        relative_path (str): Path of the changed file relative to the project directory.
+        rule_names (list): Names of the scan rules to apply.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        revision (str): Git revision to compare against.
+
+    Returns:
+        tuple: Introduced and removed findings, each as results per rule name.
+    """
+    file_path = os.path.join(project_path, relative_path)
+
+    current_results = {}
+    if os.path.isfile(file_path):
+        with open(file_path, 'rb') as f:
+            current_results = apply_scan_rules(file_path, f.read(), rule_names, rules)
+
+    previous_results = {}
+    previous_data = read_file_at_revision(project_path, revision, relative_path)
+    if previous_data is not None:
+        # Use the working tree path, so findings of both versions can be compared
+        previous_results = apply_scan_rules(file_path, previous_data, rule_names, rules)
+
+    introduced = {}
+    removed = {}
+    for name in rule_names:
+        introduced[name], removed[name] = compare_findings(current_results.get(name, []), previous_results.get(name, []))
+    return introduced, removed
+
+
+def compare_findings(current, previous):
+    """
+    Compares the findings of two versions as multisets, so an additional occurrence of an existing finding is
+    introduced as well, and a finding that occurs less often than before is removed once per missing occurrence.
+
+    Args:
+        current (list): Findings of the current version.
+        previous (list): Findings of the previous version.
+
+    Returns:
+        tuple: Introduced and removed findings, each in the order of its version.
+    """
+    previous_counts = Counter(previous)
+    current_counts = Counter(current)
+    introduced = []
+    for finding in current:
+        if previous_counts[finding] > 0:
+            previous_counts[finding] -= 1
+        else:
+            introduced.append(finding)
+    removed = []
+    for finding in previous:
+        if current_counts[finding] > 0:
+            current_counts[finding] -= 1
+        else:
+            removed.append(finding)
+    return introduced, removed
+
+
+# Extensions of the files whose change can change the result of a project level check: the project file,
+# the library descriptors and the files of the include graph. Any change in the Physical directory counts as well,
+# as the mapp configurations and the .uad files are detected by their location.
+project_check_extensions = (".apj", ".lby") + include_graph_extensions
+
+
+def read_previous_version(project_path, revision, relative_path, parse):
+    """
+    Reads a changed file at a revision with git and parses it.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git revision.
+        relative_path (str): Path relative to the project directory, as returned by get_changed_files.
+        parse (callable): Function parsing the raw content, e.g. parse_includes.
+
+    Returns:
+        The parsed content, or None if the file did not exist at the revision.
+    """
+    content = read_file_at_revision(project_path, revision, relative_path)
+    return parse(content) if content is not None else None
+
+
+def derive_previous_graph(graph, changed_files, previous_versions):
+    """
+    Derives the graph of the previous version from the current graph by replacing the nodes of the changed files.
+
+    Args:
+        graph (dict): The current graph, e.g. see build_include_graph.
+        changed_files (iterable): Paths of the changed files of the graph.
+        previous_versions (dict): Previous version of the node per changed file, None if the file did not exist.
+
+    Returns:
+        dict: The previous graph, sorted by path.
+    """
+    previous_graph = dict(graph)
+    for file_path in changed_files:
+        previous_graph.pop(file_path, None)
+        if previous_versions[file_path] is not None:
+            previous_graph[file_path] = previous_versions[file_path]
+    return {file_path: previous_graph[file_path] for file_path in sorted(previous_graph)}
+
+
+def scan_project_changes(project_path, revision, changed_files):
+    """
+    Compares the project level checks of the current and the previous version of a project, scoped to the changed files.
+    Only the previous versions of the changed descriptors, sources and headers are read, with git. The current
+    include and library graphs come from their caches, see get_include_graph and get_library_graph, and the previous
+    graphs are derived from them. The transitive findings are only determined for the changed files and the files
+    depending on them, the findings of all other files are the same in both versions. The checks based on the
+    directory tree are compared on an index of the previous tree, derived from the current one.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git commit to compare against, see resolve_revision.
+        changed_files (list): Paths relative to the project directory, see get_changed_files.
+
+    Returns:
+        tuple: Introduced and removed findings, each per check name in the format [(message, file_path)].
+    """
+    project_index = build_project_index(project_path)
+    options = {"use_cache": True, "project_model": False}
+    patterns = get_rule_section(rule_pack, "obsolete_library_table")
+    relative_paths = {os.path.join(project_path, *relative_path.split("/")): relative_path for relative_path in changed_files}
+    added_paths = {os.path.join(project_path, *relative_path.split("/")) for relative_path in get_changed_files(project_path, revision, "A")}
+    deleted_paths = {file_path for file_path in relative_paths if file_path not in project_index["stats"]}
+    previous_index = derive_project_index(project_index, added_paths, deleted_paths) if added_paths or deleted_paths else project_index
+
+    # Results of the checks that no changed file affects stay empty in both versions
+    current_results = {
+        "transitive_dependencies": [], "transitive_includes": [], "uad_files": [],
+        "vision_settings": {"total_files": 0, "locations": []}, "mappView_settings": {"locations": []}, "mapp_version": [],
+    }
+    previous_results = dict(current_results)
+
+    def read_previous_versions(file_paths, parse):
+        return {
+            file_path: None if file_path in added_paths else read_previous_version(project_path, revision, relative_paths[file_path], parse)
+            for file_path in file_paths
+        }
+
+    libraries_prefix = os.path.join(project_path, "Logical", "Libraries", "")
+    changed_libraries = [file_path for file_path in relative_paths if file_path.startswith(libraries_prefix) and file_path.endswith(".lby")]
+    if changed_libraries:
+        graph = get_library_graph(project_path, project_index, options)
+        previous_graph = derive_previous_graph(graph, changed_libraries, read_previous_versions(changed_libraries, parse_library_dependencies))
+        libraries = find_dependent_libraries(graph, changed_libraries) | find_dependent_libraries(previous_graph, changed_libraries)
+        current_results["transitive_dependencies"] = find_transitive_dependencies(graph, patterns, libraries)
+        previous_results["transitive_dependencies"] = find_transitive_dependencies(previous_graph, patterns, libraries)
+
+    logical_prefix = os.path.join(project_path, "Logical", "")
+    changed_sources = [
+        file_path for file_path in relative_paths
+        if file_path.startswith(logical_prefix) and os.path.splitext(file_path)[1] in include_graph_extensions
+    ]
+    if changed_sources:
+        graph = get_include_graph(project_path, project_index, options)
+        previous_graph = derive_previous_graph(graph, changed_sources, read_previous_versions(changed_sources, parse_includes))
+        sources = find_including_files(graph, changed_sources) | find_including_files(previous_graph, changed_sources)
+        current_results["transitive_includes"] = find_transitive_includes(graph, project_index, patterns, sources)
+        previous_results["transitive_includes"] = find_transitive_includes(previous_graph, previous_index, patterns, sources)
+
+    physical_path = os.path.join(project_path, "Physical")
+    if any(file_path.startswith(os.path.join(physical_path, "")) for file_path in added_paths | deleted_paths):
+        for results, index in ((current_results, project_index), (previous_results, previous_index)):
+            results["vision_settings"] = check_vision_settings(index, physical_path)
+            results["mappView_settings"] = check_mappView(index, physical_path)
+            results["uad_files"] = check_uad_files(index, physical_path)
+
+    project_file = find_project_file(project_index, project_path)
+    previous_project_file = find_project_file(previous_index, project_path)
+    if project_file in relative_paths or previous_project_file in relative_paths:
+        current_results["mapp_version"] = check_mapp_version(project_file)
+        if previous_project_file not in relative_paths:
+            previous_results["mapp_version"] = check_mapp_version(previous_project_file)
+        else:
+            previous_content = read_file_at_revision(project_path, revision, relative_paths[previous_project_file])
+            if previous_content is not None:
+                # check_mapp_version reads a file, the previous version is written to a temporary one
+                with tempfile.TemporaryDirectory() as previous_path:
+                    previous_apj = os.path.join(previous_path, os.path.basename(previous_project_file))
+                    with open(previous_apj, "wb") as f:
+                        f.write(previous_content)
+                    previous_results["mapp_version"] = check_mapp_version(previous_apj)
+
+    introduced = {}
+    removed = {}
+    current = [finding[:3] for finding in collect_project_findings(project_path, current_results)]
+    previous = [finding[:3] for finding in collect_project_findings(project_path, previous_results)]
+    for findings, changes in zip(compare_findings(current, previous), (introduced, removed)):
+        for name, message, file_path in findings:
+            changes.setdefault(name, []).append((message, file_path))
+    return introduced, removed
+
+
+def scan_changes_since(project_path, rules, revision):
+    """
+    Scans only the files git reports as changed since a revision. Unchanged files are not read.
+    If a changed file can change the result of a project level check, see project_check_extensions,
+    the project level checks are compared as well, see scan_project_changes.
+
+    Args:
+        project_path (str): Path to the project directory.
+        rules (dict): Scan rules in the format name -> (sub directory, extensions, process function, rule sections).
+        revision (str): Git revision to compare against, or a range A...B, see resolve_revision.
+
+    Returns:
+        tuple: Introduced and removed findings, each as results per rule or check name, and the number of scanned files.
+    """
+    # A range A...B is compared against its merge base, the previous file versions are read from there as well
+    revision = resolve_revision(project_path, revision)
+    introduced = {name: [] for name in rules}
+    removed = {name: [] for name in rules}
+    rule_roots = resolve_rule_roots(project_path, rules)
+
+    changed_files = get_changed_files(project_path, revision)
+    file_targets = []
+    for relative_path in changed_files:
+        file_path = os.path.join(project_path, relative_path)
+        rule_names = get_file_rules(os.path.basename(file_path), get_active_rules(os.path.dirname(file_path), rule_roots), rules)
+        if rule_names:
+            file_targets.append((relative_path, rule_names))
+
+    total_files = len(file_targets)
+    display_progress(f"Found {total_files} changed files to process...")
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(scan_file_changes, project_path, relative_path, rule_names, rules, revision)
+            for relative_path, rule_names in file_targets
+        ]
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            display_progress(f"Processing file {i}/{total_files}...")
+
+        # Merge in the sorted order of the changed files
+        for future in futures:
+            file_introduced, file_removed = future.result()
+            for name in file_introduced:
+                introduced[name].extend(file_introduced[name])
+                removed[name].extend(file_removed[name])
+
+    if any(path.lower().endswith(project_check_extensions) or path.split("/")[0] == "Physical" for path in changed_files):
+        display_progress("Comparing the project checks...")
+        project_introduced, project_removed = scan_project_changes(project_path, revision, changed_files)
+        introduced.update(project_introduced)
+        removed.update(project_removed)
+
+    display_progress("Processing complete.".ljust(50))  # Clear line
+    print()  # Move to next line
+    return introduced, removed, total_files
+
+
+def format_finding(rule_name, finding):
+    """
+    Formats a single finding of a scan rule for the report.
+
+    Args:
+        rule_name (str): Name of the scan rule.
+        finding: The finding as returned by the process function of the rule.
+
+    Returns:
+        str: The formatted finding.
+    """
+    if rule_name in ("deprecated_string_functions", "deprecated_math_functions"):
+        return f"Deprecated function call (Found in: {finding})"
+    if rule_name == "compatibility":
+        file_path, issue = finding
+        return f"{file_path}: {issue}"
+    if rule_name == "lby_dependencies":
+        library_name, dependency, reason, file_path = finding
+        return f"{library_name}: Dependency on {dependency}: {reason} (Found in: {file_path})"
+    name, reason, file_path = finding
+    return f"{name}: {reason} (Found in: {file_path})"
+
+
+def report_changes_since(project_path, revision, output_file):
+    """
+    Runs the differential scan and writes the introduced and removed findings to the console and the output file.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git revision to compare against.
+        output_file (str): Path to the report file.
+    """
+    with open(output_file, "w", encoding="utf-8") as file:
+        def log(message):
+            print(message)  # Print to console
+            file.write(message + "\n")  # Write to file
+
+        log(f"Differential scan against {revision} started... Only files changed since then are scanned.\n")
+        start_time = time.time()
+
+        introduced, removed, total_files = scan_changes_since(project_path, scan_rules, revision)
+
+        def format_change(name, finding):
+            if name in scan_rule_titles:
+                return format_finding(name, finding)
+            message, file_path = finding
+            return f"{message} (Found in: {file_path})"
+
+        found_any_changes = False
+        for name, title in dict(scan_rule_titles, **project_check_titles).items():
+            if not introduced.get(name) and not removed.get(name):
+                continue
+            found_any_changes = True
+            log(f"\n\n{title}:")
+            for finding in introduced.get(name, []):
+                log(f"+ {format_change(name, finding)}")
+            for finding in removed.get(name, []):
+                log(f"- {format_change(name, finding)}")
+
+        if not found_any_changes:
+            log(f"\n\nNo findings were introduced or removed by the {total_files} changed files.")
+
+        end_time = time.time()
+        log(f"\n\nScanning completed successfully in {end_time - start_time:.2f} seconds.")
+
+
+# Matchers for the XML elements read by the process functions
+object_matcher = compile_element_matcher("Object")
+dependency_matcher = compile_element_matcher("Dependency", "ObjectName")
+module_type_matcher = compile_element_matcher("Module", "Type")
+
+# Function block declarations in .var and .typ files, e.g. : MpAlarmXConfigMapping;
+function_block_declaration_pattern = re.compile(rb':\s*([A-Za-z0-9_]+)\s*;')
+
+# Version of the AutomationStudio processing instruction, see check_file_compatibility
+version_pattern = re.compile(rb'AutomationStudio Version="?([\d.]+)')
+
+
+def process_pkg_file(file_path, content, patterns):
+    """
+    Processes a .pkg file to find matches for obsolete libraries.
+
+    Args:
+        file_path (str): Path to the .pkg file.
+        content (bytes): Raw content of the .pkg file.
+        patterns (dict): Lookup table of patterns with reasons, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file.
+    """
+    results = []
+    # Library names are the text of the <Object> elements
+    for name in find_element_values(object_matcher, content):
+        for pattern, reason in lookup(patterns, name):
+            results.append((pattern, reason, file_path))
+    return results
+
+def process_var_file(file_path, content, patterns):
+    """
+    Processes a .var file to find matches for obsolete function blocks.
+
+    Args:
+        file_path (str): Path to the .var file.
+        content (bytes): Raw content of the .var file.
+        patterns (dict): Lookup table of patterns with reasons, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file.
+    """
+    results = []
+    matches = function_block_declaration_pattern.findall(content)
+    for match in matches:
+        for pattern, reason in lookup(patterns, match.decode('ascii')):
+            results.append((pattern, reason, file_path))
+    return results
+
+def process_var_typ_file(file_path, content, patterns):
+    """
+    Processes a .var file to find matches for the given patterns.
+    Ensures function block names in variable declarations are matched.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        patterns (dict): Lookup table of patterns with reasons, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file.
+    """
+    results = []
+    # Declarations in the format: name : FunctionBlockName;
+    matches = function_block_declaration_pattern.findall(content)
+    for match in matches:
+        # Compare case-insensitively
+        for pattern, reason in lookup(patterns, match.decode('ascii')):
+            results.append((pattern, reason, file_path))
+    return results
+
+
+def process_st_c_file(file_path, content, patterns, matcher):
+    """
+    Processes a .st, .c, or .cpp file to find matches for the given patterns.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        patterns (dict): Patterns to match with reasons.
+        matcher (re.Pattern): Matcher compiled from the patterns with compile_keyword_matcher.
+
+    Returns:
+        list: Matches found in the file.
+    """
+    found_patterns = {keyword for keyword, _ in find_keywords(matcher, content)}
+
+    # Report the file only once, with the first matching pattern
+    for pattern, reason in patterns.items():
+        if pattern in found_patterns:
+            return [(pattern, reason, file_path)]
+
+    return []
+
+
+def process_hw_file(file_path, content, hardware_index):
+    """
+    Processes a .hw file to find unsupported hardware matches.
+
+    Args:
+        file_path (str): Path to the .hw file.
+        content (bytes): Raw content of the .hw file.
+        hardware_index (dict): Index of unsupported hardware and their reasons, created by build_hardware_index.
+
+    Returns:
+        list: Unique matches found in the file, in document order.
+    """
+    results = {}  # Use a dict to store unique matches in the order they appear in the file
+    # Type attributes of the <Module> elements
+    for hw_type in dict.fromkeys(find_element_values(module_type_matcher, content)):
+        for reason in lookup_hardware(hardware_index, hw_type):
+            results[(hw_type, reason, file_path)] = None  # Add as a tuple to ensure uniqueness
+    return list(results)  # Convert back to a list for consistency
+
+
+def process_lby_file(file_path, content, patterns):
+    """
+    Processes a .lby file to find obsolete dependencies.
+
+    Args:
+        file_path (str): Path to the .lby file.
+        content (bytes): Raw content of the .lby file.
+        patterns (dict): Lookup table of obsolete dependencies with reasons, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file in the format (library_name, dependency, reason, file_path).
+    """
+    results = []
+    # Extract library name (directory name as identifier)
+    library_name = os.path.basename(os.path.dirname(file_path))
+    # Extract dependencies from the ObjectName attributes of the <Dependency> elements
+    for dependency in find_element_values(dependency_matcher, content):
+        # Compare case-insensitively
+        for _, reason in lookup(patterns, dependency):
+            results.append((library_name, dependency, reason, file_path))
+    return results
+
+def process_c_cpp_hpp_includes_file(file_path, content, patterns):
+    """
+    Processes a C, C++, or header (.hpp) file to find obsolete dependencies in #include statements.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        patterns (dict): Lookup table of obsolete libraries with reasons, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file in the format (library_name, reason, file_path).
+    """
+    results = []
+    for match in include_pattern.finditer(content):
+        # The header may be included with a path, e.g. <sub/AsTPU.h>, only its file name refers to the library
+        included_library = os.path.basename(match.group(1).decode('utf-8', errors='ignore').replace("\\", "/"))
+        # Only headers named <library>.h refer to a library
+        if included_library.lower().endswith(".h"):
+            for pattern, reason in lookup(patterns, included_library[:-2]):
+                results.append((pattern, reason, file_path))
+
+    return results
+
+# Function to process libraries requiring reinstallation
+def process_reinstall_libraries(file_path, content, patterns):
+    """
+    Processes a .pkg or .lby file to find libraries that need reinstallation.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        patterns (dict): Lookup table of libraries to be checked for reinstallation, created by build_lookup_table.
+
+    Returns:
+        list: Matches found in the file.
+    """
+    results = []
+    for name in find_element_values(object_matcher, content):
+        for library, action in lookup(patterns, name):
+            results.append((library, action, file_path))
+    return results
+
+
+# Checks applied to the file contents, in the format name -> (sub directory, extensions, process function, rule sections).
+# The rule sections are passed to the process function as arguments.
+# All rules are served by a single walk of the project, and every file is read only once.
+scan_rules = {
+    "reinstall_libraries": (os.path.join("Logical", "Libraries"), [".pkg"], process_reinstall_libraries, ("reinstall_library_table",)),
+    "invalid_pkg_files": (os.path.join("Logical", "Libraries"), [".pkg"], process_pkg_file, ("obsolete_library_table",)),
+    "invalid_var_typ_files": ("Logical", [".var", ".typ"], process_var_file, ("obsolete_function_block_table",)),
+    "invalid_st_c_files": ("Logical", [".st", ".c", ".cpp"], process_st_c_file, ("obsolete_functions", "obsolete_function_matcher")),
+    "hardware": ("Physical", [".hw"], process_hw_file, ("unsupported_hardware_index",)),
+    "lby_dependencies": (os.path.join("Logical", "Libraries"), [".lby"], process_lby_file, ("obsolete_library_table",)),
+    "c_include_dependencies": ("Logical", [".c", ".cpp", ".hpp"], process_c_cpp_hpp_includes_file, ("obsolete_library_table",)),
+    "deprecated_string_functions": ("Logical", [".st"], check_deprecated_string_functions, ("deprecated_string_matcher",)),
+    "deprecated_math_functions": ("Logical", [".st"], check_deprecated_math_functions, ("deprecated_math_matcher",)),
+    "compatibility": ("", [".apj", ".hw"], check_file_compatibility, ()),
 }
 
-try:
-    for filename in discontinuation_info:
-        with open( f"{script_directory}/discontinuations/{filename}.json", "r") as json_file:
-            discontinuation_info[filename]  = json.load(json_file)
-except Exception as e:
-    sys.stderr.write(f"error reading discontinuation lists: {e}")
-    sys.exit(1)
-    
-obsolete_dict = discontinuation_info["obsolete_libs"] # obsolete libraries with reasons
-reinstall_libraries = discontinuation_info["reinstall_libs"] # Libraries that must be deleted and re-added with a version >= 6.0
-obsolete_function_blocks = discontinuation_info["obsolete_fbks"] # list of obsolete function blocks with reasons
-obsolete_functions = discontinuation_info["obsolete_funcs"] # Hardcoded list of obsolete functions with reasons
-unsupported_hardware = discontinuation_info["unsupported_hw"] # hardware not supported by >= 6.0
-deprecated_string_functions = set(discontinuation_info["deprecated_string_functions"]) # deprecated string functions 8 bit and 16 bit   
-deprecated_math_functions = set(discontinuation_info["deprecated_math_functions"]) # deprecated math functions  
+# Number of bytes at the start of a file that hold the header, e.g. the AutomationStudio processing instruction
+header_probe_size = 4096
+
+# Read tiers of the scan rules in the format name -> (tier, marker). Rules not listed need the full content.
+# "header": the rule only needs the first header_probe_size bytes of a file.
+# "prefilter": the rule can only match if the file contains the marker, checked with a plain substring search.
+scan_rule_tiers = {
+    "compatibility": ("header", None),
+    "hardware": ("prefilter", b"<Module"),
+    "c_include_dependencies": ("prefilter", b"#include"),
+}
+
+# Report titles of the scan rules, in report order. The names are also the rule ids of the machine readable findings
+scan_rule_titles = {
+    "compatibility": "Project and hardware files not saved with Automation Studio 4.12",
+    "hardware": "Unsupported hardware",
+    "invalid_pkg_files": "Invalid libraries in .pkg files",
+    "reinstall_libraries": "Libraries that must be deleted and re-added with a version >= 6.0",
+    "lby_dependencies": "Obsolete dependencies in .lby files",
+    "c_include_dependencies": "Obsolete dependencies in .c, .cpp, and .hpp files",
+    "invalid_var_typ_files": "Invalid function blocks in .var and .typ files",
+    "invalid_st_c_files": "Invalid functions in .st, .c and .cpp files",
+    "deprecated_string_functions": "Deprecated AsString functions (use AsStringToAsBrStr.py to replace them)",
+    "deprecated_math_functions": "Deprecated AsMath functions (use AsMathToAsBrMath.py to replace them)",
+}
+
+# Titles of the project level checks, which are not bound to file contents
+project_check_titles = {
+    "transitive_dependencies": "Libraries depending on obsolete libraries through other libraries",
+    "transitive_includes": "Sources including obsolete library headers through other headers",
+    "slow_files": "Files exceeding the scan limits",
+    "uad_files": "Misplaced .uad files",
+    "vision_settings": "mappVision configuration found",
+    "mappView_settings": "mappView configuration found",
+    "mapp_version": "mapp Services and mappMotion versions",
+}
+
+
+def write_file_findings(findings_sinks, file_path, record):
+    """
+    Streams the findings of one scanned file to the machine readable outputs.
+
+    Args:
+        findings_sinks (list): Sinks created by open_findings_sink.
+        file_path (str): Path to the file.
+        record (dict): File record, see scan_file.
+    """
+    for name, findings in record["results"].items():
+        for finding, (line, column) in zip(findings, record["locations"][name]):
+            message = format_finding(name, finding)
+            for sink in findings_sinks:
+                write_finding(sink, name, message, file_path, line, column)
+
+
+def format_transitive_dependency(finding):
+    """
+    Formats a transitive dependency on an obsolete library for the report, from a library or from an include.
+
+    Args:
+        finding (tuple): Finding in the format (name, [intermediate libraries or headers], obsolete library, reason, file_path).
+
+    Returns:
+        str: The formatted finding, without the file path.
+    """
+    library_name, path, obsolete_library, reason, _ = finding
+    return f"{library_name}: Dependency on {obsolete_library} through {' -> '.join(path)}: {reason}"
+
+
+def format_slow_file(slow_file):
+    """
+    Describes a file that exceeded the scan limits.
+
+    Args:
+        slow_file (tuple): Entry in the format (file_path, size, elapsed seconds, scanned bytes, oversized, complete).
+
+    Returns:
+        str: The description, without the file path.
+    """
+    _, size, elapsed, scanned_bytes, oversized, complete = slow_file
+    description = f"{size / (1024 * 1024):.1f} MB, scanned in {elapsed:.1f} seconds"
+    if oversized:
+        description += ", scanned in chunks"
+    if not complete and oversized:
+        description += f", time budget exceeded: only the first {scanned_bytes / (1024 * 1024):.1f} MB were scanned"
+    elif not complete:
+        description += ", time budget exceeded: not all checks were applied"
+    return description
+
+
+def collect_project_findings(project_path, results):
+    """
+    Collects the findings of the project level checks, each with a message and the file it refers to.
+
+    Args:
+        project_path (str): Path to the project directory.
+        results (dict): Results per check, as returned by run_checks.
+
+    Returns:
+        list: Findings in the format (check name, message, file_path, level).
+    """
+    findings = [
+        (name, format_transitive_dependency(finding), finding[4], "warning")
+        for name in ("transitive_dependencies", "transitive_includes")
+        for finding in results[name]
+    ]
+    findings += [("uad_files", "Not located in the required Connectivity/OpcUA directory", file_path, "warning") for file_path in results["uad_files"]]
+    if results["vision_settings"]['total_files'] > 2:
+        findings += [("vision_settings", "Vision configuration: Make sure that IP forwarding is activated under the Powerlink interface", location, "warning") for location in results["vision_settings"]['locations']]
+    findings += [("mappView_settings", "mappView configuration: Several security settings will be enforced after the migration", location, "warning") for location in results["mappView_settings"]['locations']]
 
-pass
-def display_progress(message):
+    apj_files = [file for file in os.listdir(project_path) if file.endswith(".apj")]
+    if apj_files:
+        findings += [("mapp_version", message.strip(), os.path.join(project_path, apj_files[0]), "note") for message in results["mapp_version"]]
+    return findings
+
+
+def write_project_findings(findings_sinks, project_path, results):
     """
-    Displays a progress message on the same line in the terminal.
-    Ensures old text is cleared before writing new text.
+    Writes the findings of the project level checks and the files exceeding the scan limits to the machine readable outputs.
+
+    Args:
+        findings_sinks (list): Sinks created by open_findings_sink.
+        project_path (str): Path to the project directory.
+        results (dict): Results per check, as returned by run_checks.
     """
-    sys.stdout.write('\r' + ' ' * 80)  # Clear line with space
-    sys.stdout.write('\r' + message)  # Write new message
-    sys.stdout.flush()
+    findings = collect_project_findings(project_path, results)
+    findings += [("slow_files", format_slow_file(slow_file), slow_file[0], "note") for slow_file in results["slow_files"]]
+    for name, message, file_path, level in findings:
+        for sink in findings_sinks:
+            write_finding(sink, name, message, file_path, level=level)
 
-def process_stub(file_path, *args):
+
+def find_project_file(project_index, project_path):
     """
-    Stub process function for demonstration purposes.
-    Simulates processing of files without actual logic.
+    Returns the .apj project file of a project.
 
     Args:
-        file_path (str): The file path to process.
-        *args: Additional arguments.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        project_path (str): Path to the project directory.
 
     Returns:
-        list: An empty list for this stub function.
+        str: Path to the .apj file, or None if the project has none.
     """
-    return []
+    _, files = project_index["directories"].get(project_path, ([], []))
+    for file in files:
+        if file.endswith(".apj"):
+            return os.path.join(project_path, file)
+    return None
 
 
-def scan_files_parallel(root_dir, extensions, process_function, *args):
+def resolve_project_model(project_path, project_index, options):
     """
-    Scans files in a directory tree in parallel for specific content.
+    Resolves the files referenced by the package hierarchy of the project, starting from the root Logical
+    package and the library package (root_pkg_path). The model is cached and only resolved again
+    when a package, program or library descriptor changes.
 
     Args:
-        root_dir (str): The root directory to search in.
-        extensions (list): File extensions to include.
-        process_function (callable): The function to apply on each file.
-        *args: Additional arguments to pass to the process_function.
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options, see run_checks.
 
     Returns:
-        list: Aggregated results from all scanned files.
+        set: Paths of all referenced files, or None if the project model mode is disabled.
     """
-    results = []
-    file_paths = []
+    if not options["project_model"]:
+        return None
+
+    logical_path = os.path.join(project_path, "Logical")
+    model_file = os.path.join(project_path, "AS6_migration_model.json")
+    descriptor_stats = get_descriptor_stats(project_index, logical_path)
+
+    project_model = load_project_model(model_file, descriptor_stats) if options["use_cache"] else None
+    if project_model is None:
+        root_descriptors = [
+            os.path.join(logical_path, "Package.pkg"),
+            os.path.join(project_path, *root_pkg_path.split("\\")),
+        ]
+        project_model = build_project_model(project_index, root_descriptors)
+        if options["use_cache"]:
+            save_project_model(model_file, descriptor_stats, project_model)
+
+    if show_progress:
+        logical_files = sum(len(files) for _, _, files in iter_directories(project_index, logical_path))
+        referenced_files = sum(1 for file_path in project_model if file_path in project_index["stats"])
+        print(f"Project model: {referenced_files} of {logical_files} files in Logical are referenced by the packages.")
+    return project_model
+
+
+def get_library_graph(project_path, project_index, options, project_model=None):
+    """
+    Builds the dependency graph of all libraries. The graph is cached, only .lby files that changed since are read.
 
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if any(file.endswith(ext) for ext in extensions):
-                file_paths.append(os.path.join(root, file))
+    Args:
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options, see run_checks.
+        project_model (set): Files referenced by the packages of the project, see resolve_project_model.
+            If provided, unreferenced libraries are left out.
+
+    Returns:
+        dict: The library graph, see build_library_graph.
+    """
+    libraries_path = os.path.join(project_path, "Logical", "Libraries")
+    graph_file = os.path.join(project_path, "AS6_migration_libraries.json")
+    library_files = get_library_files(project_index, libraries_path, project_model)
+
+    cache = load_library_graph(graph_file) if options["use_cache"] else None
+    graph = build_library_graph(library_files, cache)
+    if options["use_cache"] and cache["libraries"] != library_files:
+        save_library_graph(graph_file, library_files, graph)
+    return graph
 
-    total_files = len(file_paths)
-    display_progress(f"Found {total_files} files to process...")
-    
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(process_function, path, *args): path for path in file_paths}
-        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-            display_progress(f"Processing file {i}/{total_files}...")
-            results.extend(future.result())
-    
-    display_progress("Processing complete.".ljust(50))  # Clear line
-    print()  # Move to next line
-    return results
 
-def process_pkg_file(file_path, patterns):
+def check_transitive_dependencies(project_path, project_index, options, project_model=None):
     """
-    Processes a .pkg file to find matches for obsolete libraries.
+    Finds libraries that depend on an obsolete library through other libraries, see get_library_graph.
 
     Args:
-        file_path (str): Path to the .pkg file.
-        patterns (dict): Patterns to match with reasons.
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options, see run_checks.
+        project_model (set): Files referenced by the packages of the project, see resolve_project_model.
+            If provided, unreferenced libraries are left out.
 
     Returns:
-        list: Matches found in the file.
+        list: Findings in the format (library_name, [intermediate libraries], obsolete library, reason, file_path).
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        # Regex for library names between > and <
-        matches = re.findall(r'>([^<]+)<', content, re.IGNORECASE)
-        for match in matches:
-            for pattern, reason in patterns.items():
-                if match.lower() == pattern.lower():
-                    results.append((pattern, reason, file_path))
-    return results
+    graph = get_library_graph(project_path, project_index, options, project_model)
+    return find_transitive_dependencies(graph, get_rule_section(rule_pack, "obsolete_library_table"))
 
-def process_var_file(file_path, patterns):
+
+def get_include_graph(project_path, project_index, options, project_model=None):
     """
-    Processes a .var file to find matches for obsolete function blocks.
+    Builds the include graph of all C/C++ sources and headers. The include lists are cached by content hash,
+    files with unchanged size and modification time are not read again.
 
     Args:
-        file_path (str): Path to the .var file.
-        patterns (dict): Patterns to match with reasons.
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options, see run_checks.
+        project_model (set): Files referenced by the packages of the project, see resolve_project_model.
+            If provided, unreferenced files are left out.
 
     Returns:
-        list: Matches found in the file.
+        dict: The include graph, see build_include_graph.
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        # Regex for function block declarations, e.g., : MpAlarmXConfigMapping;
-        matches = re.findall(r':\s*([A-Za-z0-9_]+)\s*;', content)
-        for match in matches:
-            for pattern, reason in patterns.items():
-                if match.lower() == pattern.lower():
-                    results.append((pattern, reason, file_path))
+    cache_file = os.path.join(project_path, "AS6_migration_includes.json")
+    include_cache = load_include_cache(cache_file) if options["use_cache"] else {"files": {}, "includes": {}}
+    previous_files = dict(include_cache["files"])
+    graph = build_include_graph(project_index, os.path.join(project_path, "Logical"), include_cache, project_model)
+    if options["use_cache"] and has_cache_changed(previous_files, include_cache["files"]):
+        save_include_cache(cache_file, include_cache)
+    return graph
+
+
+def check_transitive_includes(project_path, project_index, options, project_model=None):
+    """
+    Finds sources that include the header of an obsolete library through other headers of the project,
+    see get_include_graph.
+
+    Args:
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options, see run_checks.
+        project_model (set): Files referenced by the packages of the project, see resolve_project_model.
+            If provided, unreferenced files are left out.
+
+    Returns:
+        list: Findings in the format (file_name, [intermediate headers], obsolete library, reason, file_path).
+    """
+    graph = get_include_graph(project_path, project_index, options, project_model)
+    return find_transitive_includes(graph, project_index, get_rule_section(rule_pack, "obsolete_library_table"))
+
+
+def run_file_scan(project_path, project_index, options, project_model=None):
+    """
+    Applies all file content rules, serving unchanged files from the scan cache of the previous run.
+
+    Args:
+        project_path (str): Path to the project directory.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        options (dict): Scan options with the keys "jobs", "use_cache", "findings_sinks", "profile", "project_model",
+            "scan_cache" and "scan_limits", see run_checks.
+        project_model (set): Files referenced by the packages of the project, see resolve_project_model.
+            If provided, unreferenced files in the Logical directory are not scanned.
+
+    Returns:
+        dict: Results per scan rule name and "slow_files", see scan_files_parallel.
+    """
+    findings_sinks = options["findings_sinks"]
+
+    # Results of unchanged files are served from the cache of the previous run. The watch mode keeps
+    # the cache in memory instead.
+    scan_cache = options["scan_cache"]
+    use_cache = options["use_cache"] and scan_cache is None
+    cache_file = os.path.join(project_path, "AS6_migration_cache.json")
+    rules_fingerprint = compute_fingerprint(rule_definition_files) if use_cache else None
+    if use_cache:
+        scan_cache = load_scan_cache(cache_file, rules_fingerprint)
+        previous_entries = dict(scan_cache)
+
+    def on_file(file_path, record):
+        write_file_findings(findings_sinks, file_path, record)
+
+    results = scan_files_parallel(
+        project_path, scan_rules, options["jobs"], scan_cache, on_file if findings_sinks else None, project_index,
+        options["profile"], project_model, options["scan_limits"],
+    )
+
+    if use_cache and has_cache_changed(previous_entries, scan_cache):
+        save_scan_cache(cache_file, rules_fingerprint, scan_cache)
     return results
 
-def process_var_typ_file(file_path, patterns):
+
+# Project checks in the format name -> ([inputs], check function).
+# Inputs are other entries of this registry or the values provided by run_checks ("project_path",
+# "physical_path" and "options"). Each entry runs as soon as its inputs are available, and shared
+# inputs such as the project index are computed only once.
+project_checks = {
+    "project_index": (["project_path"], build_project_index),
+    "project_file": (["project_index", "project_path"], find_project_file),
+    "project_model": (["project_path", "project_index", "options"], resolve_project_model),
+    "file_scan": (["project_path", "project_index", "options", "project_model"], run_file_scan),
+    "transitive_dependencies": (["project_path", "project_index", "options", "project_model"], check_transitive_dependencies),
+    "transitive_includes": (["project_path", "project_index", "options", "project_model"], check_transitive_includes),
+    "vision_settings": (["project_index", "physical_path"], check_vision_settings),
+    "mappView_settings": (["project_index", "physical_path"], check_mappView),
+    "mapp_version": (["project_file"], check_mapp_version),
+    "uad_files": (["project_index", "physical_path"], check_uad_files),
+}
+
+
+def run_checks(
+    project_path, jobs=None, use_cache=True, findings_sinks=(), profile=None, project_model=False, project_index=None, scan_cache=None,
+    scan_limits=None,
+):
     """
-    Processes a .var file to find matches for the given patterns.
-    Ensures function block names in variable declarations are matched.
+    Runs all checks on a project. Independent checks run concurrently.
 
     Args:
-        file_path (str): Path to the file.
-        patterns (dict): Patterns to match with reasons.
+        project_path (str): Path to the project directory.
+        jobs (int): Number of worker processes for the file scan, None for the thread pool.
+        use_cache (bool): Serve the results of unchanged files from the scan cache.
+        findings_sinks (list): Machine readable outputs, see open_findings_sink. Findings are written as soon as they are found.
+        profile (dict): Profile created by create_profile. If provided, every check and every scanned file is measured.
+            The checks then run one after another, so their time and memory can be told apart.
+        project_model (bool): Scan only the files in the Logical directory that are referenced by the package hierarchy.
+        project_index (dict): Index of the project directory tree, see build_project_index. Built if not provided.
+        scan_cache (dict): Cache entries kept in memory between runs, see load_scan_cache. If provided, it is used
+            and updated instead of the cache file.
+        scan_limits (dict): Size and time limits per file, see scan_file. Defaults to default_scan_limits.
 
     Returns:
-        list: Matches found in the file.
+        dict: Results per check: the results of the scan rules, "slow_files", "transitive_dependencies",
+              "transitive_includes", "vision_settings", "mappView_settings", "mapp_version" and "uad_files".
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        # Regex to match the format: name : FunctionBlockName;
-        matches = re.findall(r':\s*([A-Za-z0-9_]+)\s*;', content)
-        for match in matches:
-            for pattern, reason in patterns.items():
-                # Compare case-insensitively
-                if match.lower() == pattern.lower():
-                    results.append((pattern, reason, file_path))
+    inputs = {
+        "project_path": project_path,
+        "physical_path": os.path.join(project_path, "Physical"),
+        "options": {
+            "jobs": jobs, "use_cache": use_cache, "findings_sinks": findings_sinks, "profile": profile, "project_model": project_model,
+            "scan_cache": scan_cache, "scan_limits": scan_limits or default_scan_limits,
+        },
+    }
+    if project_index is not None:
+        inputs["project_index"] = project_index
+    if profile is None:
+        check_results = run_scheduled_checks(project_checks, inputs)
+    else:
+        profiled_checks = {
+            name: (check_inputs, profile_check(profile, name, check_function))
+            for name, (check_inputs, check_function) in project_checks.items()
+        }
+        check_results = run_scheduled_checks(profiled_checks, inputs, max_workers=1)
+
+    results = check_results["file_scan"]
+    for name in ("transitive_dependencies", "transitive_includes", "vision_settings", "mappView_settings", "mapp_version", "uad_files"):
+        results[name] = check_results[name]
+
+    if findings_sinks:
+        write_project_findings(findings_sinks, project_path, results)
     return results
 
 
-def process_st_c_file(file_path, patterns):
+def write_report(results, log, debug_mode=False):
     """
-    Processes a .st, .c, or .cpp file to find matches for the given patterns.
+    Writes the results of all checks as a human readable report.
 
     Args:
-        file_path (str): Path to the file.
-        patterns (dict): Patterns to match with reasons.
+        results (dict): Results per check, as returned by run_checks.
+        log (callable): Function writing one line of the report.
+        debug_mode (bool): Print the locations of deprecated functions and mapp folders to the console.
+    """
+    reinstall_library_results = results["reinstall_libraries"]
+    invalid_pkg_files = results["invalid_pkg_files"]
+    invalid_var_typ_files = results["invalid_var_typ_files"]
+    invalid_st_c_files = results["invalid_st_c_files"]
+    hardware_results = results["hardware"]
+    lby_dependency_results = results["lby_dependencies"]
+    c_include_dependency_results = results["c_include_dependencies"]
+    vision_settings_results = results["vision_settings"]
+    mappView_settings_results = results["mappView_settings"]
+    mapp_version_results = results["mapp_version"]
+
+    # Store the list of files containing deprecated string functions
+    deprecated_string_files = results["deprecated_string_functions"]
+
+    # Boolean flag to indicate whether deprecated string functions were found
+    found_deprecated_string = bool(deprecated_string_files)
+
+    # Store the list of files containing deprecated math functions
+    deprecated_math_files = results["deprecated_math_functions"]
+
+    # Boolean flag to indicate whether deprecated math functions were found
+    found_deprecated_math = bool(deprecated_math_files)
+
+    log("\n\nChecking project and hardware files for compatibility...")
+    compatibility_results = results["compatibility"]
+    if compatibility_results:
+        for file_path, issue in compatibility_results:
+            log(f"- {file_path}: {issue}")
+        log("\nPlease ensure these files are saved at least once with Automation Studio 4.12.")
+    else:
+        log("- All project and hardware files are valid.")
+
+    log("\n\nChecking for misplaced .uad files...")
+    uad_results = results["uad_files"]
+    if uad_results:
+        log("The following .uad files are not located in the required Connectivity/OpcUA directory:")
+        for file_path in uad_results:
+            log(f"- {file_path}")
+        log("\nPlease create (via AS 4.12) and move these files to the required directory: Connectivity/OpcUA.")
+    else:
+        log("- All .uad files are in the correct location.")
+
+    log("\n\nThe following unsupported hardware were found:")
+    if hardware_results:
+        grouped_results = {}
+        for hardware_id, reason, file_path in hardware_results:
+            config_name = os.path.basename(os.path.dirname(file_path))
+            grouped_results.setdefault(config_name, set()).add((hardware_id, reason))
+
+        for config_name, entries in grouped_results.items():
+            log(f"\nHardware configuration: {config_name}")
+            for hardware_id, reason in sorted(entries):
+                log(f"- {hardware_id}: {reason}")
+    else:
+        log("- None")
+
+    log("\n\nThe following invalid libraries were found in .pkg files:")
+    if invalid_pkg_files:
+        for library, reason, file_path in invalid_pkg_files:
+            log(f"- {library}: {reason} (Found in: {file_path})")
+    else:
+        log("- None")
+
+    log("\n\nThe following libraries must be deleted and re-added with a version >= 6.0:")
+    if reinstall_library_results:
+        for library, reason, file_path in reinstall_library_results:
+            log(f"- {library}: {reason} (Found in: {file_path})")
+    else:
+        log("- None")
+
+    # Convert .lby results to match the (library_name, reason, file_path) format
+    normalized_lby_results = [(lib, f"Dependency on {dep}: {reason}", path) for lib, dep, reason, path in lby_dependency_results]
+
+    # Merge results from .lby and C/C++/HPP include dependencies
+    all_dependency_results = normalized_lby_results + c_include_dependency_results
+
+    log("\n\nThe following obsolete dependencies were found in .lby, .c, .cpp, and .hpp files:")
+    if all_dependency_results:
+        for library_name, reason, file_path in all_dependency_results:
+            log(f"- {library_name}: {reason} (Found in: {file_path})")
+    else:
+        log("- None")
+
+    log("\n\nThe following libraries depend on obsolete libraries through other libraries:")
+    if results["transitive_dependencies"]:
+        for finding in results["transitive_dependencies"]:
+            log(f"- {format_transitive_dependency(finding)} (Found in: {finding[4]})")
+    else:
+        log("- None")
+
+    log("\n\nThe following sources include obsolete library headers through other headers:")
+    if results["transitive_includes"]:
+        for finding in results["transitive_includes"]:
+            log(f"- {format_transitive_dependency(finding)} (Found in: {finding[4]})")
+    else:
+        log("- None")
+
+    log("\n\nThe following invalid function blocks were found in .var and .typ files:")
+    if invalid_var_typ_files:
+        for block, reason, file_path in invalid_var_typ_files:
+            log(f"- {block}: {reason} (Found in: {file_path})")
+    else:
+        log("- None")
+
+    log("\n\nThe following invalid functions were found in .st, .c and .cpp files:")
+    found_any_invalid_functions = False
+
+    if invalid_st_c_files:
+        for function, reason, file_path in invalid_st_c_files:
+            log(f"- {function}: {reason} (Found in: {file_path})")
+        found_any_invalid_functions = True
+
+    if found_deprecated_string:
+        log("- Deprecated AsString functions detected in the project: Consider using AsStringToAsBrStr.py to replace them.")
+        found_any_invalid_functions = True
+
+        # Debug: Print where the deprecated string functions were found only if --debug is enabled
+        if debug_mode and deprecated_string_files:
+            print("\n[DEBUG] Deprecated AsString functions detected in the following files:")
+            for file in deprecated_string_files:
+                print(f"[DEBUG] - {file}")
+
+    if found_deprecated_math:
+        log("- Deprecated AsMath functions detected in the project: Consider using AsMathToAsBrMath.py to replace them.")
+        found_any_invalid_functions = True
+
+        # Debug: Print where the deprecated math functions were found only if --debug is enabled
+        if debug_mode and found_deprecated_math:
+            print("\n[DEBUG] Deprecated AsMath functions detected in the following files:")
+            for file in deprecated_math_files:
+                print(f"[DEBUG] - {file}")
+    
+    if not found_any_invalid_functions:
+        log("- None")
+
+
+    if vision_settings_results['total_files'] > 2:
+        log("\n\nFound vision configuration. Make sure that IP forwarding is activated under the Powerlink interface!")
+        
+        # Debug: Print detailed information about mappVision locations if debug mode is enabled
+        if debug_mode and vision_settings_results['locations']:
+            print("\n[DEBUG] mappVision folders found at:")
+            for location in vision_settings_results['locations']:
+                print(f"[DEBUG] - {location}")
+        
+        found_any_invalid_functions = True
+
+    if mappView_settings_results['found']:
+        log("\n\nFound mappView configuration. Several security seetings will be enforced after the migration.")
+        log("\n- To allow access without a certificate")
+        log("  Change the following settings in the OPC Client/Server configuration (Physical View/Connectivity/OpcUaCs/UaCsConfig.uacfg):")
+        log("  ClientServerConfiguration->Security->MessageSecurity->SecurityPolicies->None: Enabled")
+        log("\n- User login will be enabled by default. To allow anonymous access")
+        log("  Change the following settings in mappView configuration (Physical View/mappView/Config.mappviewcfg):")
+        log("  MappViewConfiguration->Server Configuration->Startup User: anonymous token")
+        log("\n  Change the following settings in the OPC Client/Server configuration (Physical View/Connectivity/OpcUaCs/UaCsConfig.uacfg):")
+        log("  ClientServerConfiguration->Security->Authentication->Authentication Methods->Anymous: Enabled")
+        log("  ClientServerConfiguration->Security->Authorization->Anonymous Access Add new user role and select \"everyone\"")
+                            
+        # Debug: Print detailed information about mappVision locations if debug mode is enabled
+        if debug_mode and vision_settings_results['locations']:
+            print("\n[DEBUG] mappView folders found at:")
+            for location in vision_settings_results['locations']:
+                print(f"[DEBUG] - {location}")
+        
+        found_any_invalid_functions = True                
+
+    log("\n\nChecking mapp version in project file...")
+    if mapp_version_results:
+        for msg in mapp_version_results:
+            log(f"- {msg}")
+    else:
+        log("- No mapp version information found.")
+
+    log("\n\nThe following files exceeded the size or time limits of the scan:")
+    if results["slow_files"]:
+        for slow_file in results["slow_files"]:
+            log(f"- {slow_file[0]}: {format_slow_file(slow_file)}")
+    else:
+        log("- None")
+
+
+def count_findings(results):
+    """
+    Counts the findings of each check, for the aggregate report of a batch scan.
+
+    Args:
+        results (dict): Results per check, as returned by run_checks.
 
     Returns:
-        list: Matches found in the file.
+        dict: Number of findings per check.
     """
-    results = []
-    matched_files = set()  # To store file paths and ensure uniqueness
+    counts = {name: len(results[name]) for name in scan_rules}
+    counts["transitive_dependencies"] = len(results["transitive_dependencies"])
+    counts["transitive_includes"] = len(results["transitive_includes"])
+    counts["uad_files"] = len(results["uad_files"])
+    return counts
 
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
 
-        # Check for other patterns if necessary
-        for pattern, reason in patterns.items():
-            if re.search(rf'\b{re.escape(pattern)}\b', content) and file_path not in matched_files:
-                results.append((pattern, reason, file_path))
-                matched_files.add(file_path)  # Ensure file is added only once
-                
-    return results
+def init_batch_worker():
+    """
+    Initializes a batch worker process. Projects are scanned side by side, so the progress output is disabled.
+    """
+    global show_progress
+    show_progress = False
 
 
-def process_hw_file(file_path, hardware_dict):
+def scan_project_to_file(project_path, use_cache=True, triage_hits=None):
     """
-    Processes a .hw file to find unsupported hardware matches.
+    Scans one project of a batch and writes its AS6_migration_result.txt.
 
     Args:
-        file_path (str): Path to the .hw file.
-        hardware_dict (dict): Dictionary of unsupported hardware and their reasons.
+        project_path (str): Path to the project directory.
+        use_cache (bool): Serve the results of unchanged files from the scan cache.
+        triage_hits (int): If provided, only triage the project and write its AS6_migration_triage.txt, see run_triage.
 
     Returns:
-        list: Unique matches found in the file.
+        dict: Either {"counts": number of findings per check} or {"error": error message}.
     """
-    results = set()  # Use a set to store unique matches
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        # Regex to extract the Type value from the <Module> elements
-        matches = re.findall(r'<Module [^>]*Type="([^"]+)"', content)
-        for hw_type in matches:
-            for reason, items in hardware_dict.items():
-                if hw_type in items:
-                    results.add((hw_type, reason, file_path))  # Add as a tuple to ensure uniqueness
-    return list(results)  # Convert back to a list for consistency
+    if triage_hits:
+        output_file = os.path.join(project_path, "AS6_migration_triage.txt")
+        with open(output_file, "w", encoding="utf-8") as file:
+            try:
+                triage = run_triage(project_path, triage_hits)
+            except Exception as e:
+                file.write(f"[ERROR] An unexpected error occurred: {str(e)}\n")
+                return {"error": str(e)}
+            write_triage_verdict(triage, lambda message: file.write(message + "\n"))
+        return {"counts": {name: len(findings) for name, findings in triage["hits"].items()}}
+
+    output_file = os.path.join(project_path, "AS6_migration_result.txt")
+    with open(output_file, "w", encoding="utf-8") as file:
+        def log(message):
+            file.write(message + "\n")
+
+        log("Scanning started... Please wait while the script analyzes your project files.\n")
+        start_time = time.time()
+        try:
+            results = run_checks(project_path, None, use_cache)
+            write_report(results, log)
+        except Exception as e:
+            log(f"\n[ERROR] An unexpected error occurred: {str(e)}")
+            return {"error": str(e)}
+
+        end_time = time.time()
+        log(f"\n\nScanning completed successfully in {end_time - start_time:.2f} seconds.")
+
+    return {"counts": count_findings(results)}
 
 
-def process_lby_file(file_path, patterns):
+def find_projects(root_dir):
     """
-    Processes a .lby file to find obsolete dependencies.
+    Finds every Automation Studio project below a root directory.
 
     Args:
-        file_path (str): Path to the .lby file.
-        patterns (dict): Patterns of obsolete dependencies with reasons.
+        root_dir (str): The root directory to search in.
 
     Returns:
-        list: Matches found in the file in the format (library_name, dependency, reason, file_path).
+        list: Sorted paths of the directories containing an .apj file.
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        # Extract library name (directory name as identifier)
-        library_name = os.path.basename(os.path.dirname(file_path))
-        # Extract dependencies from the XML content
-        dependencies = re.findall(r'<Dependency ObjectName="([^"]+)"', content, re.IGNORECASE)
-        for dependency in dependencies:
-            for pattern, reason in patterns.items():
-                # Compare case-insensitively
-                if dependency.lower() == pattern.lower():
-                    results.append((library_name, dependency, reason, file_path))
-    return results
+    projects = []
+    for root, dirs, files in os.walk(root_dir):
+        if any(file.endswith(".apj") for file in files):
+            projects.append(root)
+            dirs[:] = []  # Projects are not nested, skip the project content
+    return sorted(projects)
 
-def process_c_cpp_hpp_includes_file(file_path, patterns):
+
+def run_batch(root_dir, workers, use_cache=True, triage_hits=None):
     """
-    Processes a C, C++, or header (.hpp) file to find obsolete dependencies in #include statements.
+    Scans all projects below a root directory concurrently and writes an aggregate report.
+    Every worker process loads the compiled rule pack once and shares it across all projects it scans.
 
     Args:
-        file_path (str): Path to the file.
-        patterns (dict): Dictionary of obsolete libraries with reasons.
+        root_dir (str): The root directory containing the projects.
+        workers (int): Maximum number of projects scanned at the same time.
+        use_cache (bool): Serve the results of unchanged files from the scan cache of each project.
+        triage_hits (int): If provided, only triage each project, see run_triage. The totals are then
+            the number of findings up to this limit per project.
 
     Returns:
-        list: Matches found in the file in the format (library_name, reason, file_path).
+        str: Path to the aggregate report.
     """
-    results = []
-    include_pattern = re.compile(r'#include\s+[<"]([^">]+)[">]')
-
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.readlines()
-
-        for line in content:
-            match = include_pattern.search(line)
-            if match:
-                included_library = match.group(1).lower()  # Normalize case
-                for pattern, reason in patterns.items():
-                    if included_library == f"{pattern.lower()}.h":
-                        results.append((pattern, reason, file_path))
-    
-    return results
+    projects = find_projects(root_dir)
+    if not projects:
+        print(f"Error: No .apj file found below the provided path: {root_dir}")
+        sys.exit(1)
 
-# Function to process libraries requiring reinstallation
-def process_reinstall_libraries(file_path, patterns):
+    print(f"Found {len(projects)} projects, scanning up to {workers} at the same time...")
+    start_time = time.time()
+
+    summaries = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker) as executor:
+        futures = {executor.submit(scan_project_to_file, project, use_cache, triage_hits): project for project in projects}
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            summaries[futures[future]] = future.result()
+            display_progress(f"Scanned project {i}/{len(projects)}...")
+
+    display_progress("Processing complete.".ljust(50))  # Clear line
+    print()  # Move to next line
+
+    summary_titles = triage_titles if triage_hits else dict(
+        scan_rule_titles,
+        transitive_dependencies=project_check_titles["transitive_dependencies"],
+        transitive_includes=project_check_titles["transitive_includes"],
+        uad_files=project_check_titles["uad_files"],
+    )
+    report_name = "AS6_migration_triage.txt" if triage_hits else "AS6_migration_result.txt"
+    output_file = os.path.join(root_dir, "AS6_migration_batch_result.txt")
+    with open(output_file, "w", encoding="utf-8") as file:
+        def log(message):
+            print(message)  # Print to console
+            file.write(message + "\n")  # Write to file
+
+        log(f"Batch {'triage' if triage_hits else 'scan'} of {len(projects)} projects in {root_dir}")
+
+        log(f"\n\nTotal findings per rule{f' (at most {triage_hits} per project)' if triage_hits else ''}:")
+        for name, title in summary_titles.items():
+            counts = [summary["counts"][name] for summary in summaries.values() if "counts" in summary]
+            affected_projects = sum(1 for count in counts if count)
+            log(f"- {title}: {sum(counts)} (in {affected_projects} projects)")
+
+        log("\n\nFindings per project:")
+        for project in projects:
+            summary = summaries[project]
+            log(f"\n{os.path.relpath(project, root_dir)}:")
+            if "error" in summary:
+                log(f"- [ERROR] {summary['error']}")
+                continue
+
+            total = sum(summary["counts"].values())
+            log(f"- Total: {total} (details in {os.path.join(project, report_name)})")
+            for name, title in summary_titles.items():
+                if summary["counts"][name]:
+                    log(f"- {title}: {summary['counts'][name]}")
+
+        end_time = time.time()
+        log(f"\n\nScanning completed successfully in {end_time - start_time:.2f} seconds.")
+
+    return output_file
+
+
+# Order in which the scan rules are decided in triage mode, cheapest first: library names in the package files
+# and hardware types are checked before the sources, which make up most of a project. Rules not listed are checked last.
+triage_rule_order = [
+    "invalid_pkg_files",
+    "reinstall_libraries",
+    "hardware",
+    "compatibility",
+    "lby_dependencies",
+    "invalid_var_typ_files",
+    "c_include_dependencies",
+    "invalid_st_c_files",
+    "deprecated_string_functions",
+    "deprecated_math_functions",
+]
+
+# Titles of the triage categories: the scan rules and the misplaced .uad files
+triage_titles = dict(scan_rule_titles, uad_files=project_check_titles["uad_files"])
+
+
+def run_triage(project_path, hit_limit=1):
     """
-    Processes a .pkg or .lby file to find libraries that need reinstallation.
+    Decides for each category whether the project has any blocker, without scanning every occurrence.
+    Files are scanned cheapest category first, and each file only with the rules of the categories that are
+    still undecided. A category is decided once it has hit_limit findings. When all categories are decided,
+    the files not yet started are cancelled. A category without findings is only clear once all its files are scanned.
 
     Args:
-        file_path (str): Path to the file.
-        patterns (dict): Libraries to be checked for reinstallation.
+        project_path (str): Path to the project directory.
+        hit_limit (int): Number of findings that decide a category.
 
     Returns:
-        list: Matches found in the file.
+        dict: {"hits": findings per category (at most hit_limit), "scanned_files": number of scanned files,
+               "total_files": number of files the scan rules apply to}.
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        matches = re.findall(r'>([^<]+)<', content, re.IGNORECASE)
-        for match in matches:
-            for library, action in patterns.items():
-                if match.lower() == library.lower():
-                    results.append((library, action, file_path))
-    return results
+    project_index = build_project_index(project_path)
+    hits = {name: [] for name in triage_titles}
+    hits["uad_files"] = check_uad_files(project_index, os.path.join(project_path, "Physical"))[:hit_limit]
+
+    rule_rank = {name: rank for rank, name in enumerate(triage_rule_order)}
+    targets = collect_scan_targets(project_index, scan_rules)
+    targets.sort(key=lambda target: (
+        min(rule_rank.get(name, len(rule_rank)) for name in target[1]), project_index["stats"][target[0]][0]
+    ))
+    pending_targets = iter(targets)
+
+    def undecided(rule_names):
+        return [name for name in rule_names if len(hits[name]) < hit_limit]
+
+    # Only a few files are submitted ahead, so files of decided categories are skipped before they are read
+    workers = min(32, (os.cpu_count() or 1) + 4)
+    scanned_files = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        running = set()
+        while True:
+            while len(running) < workers * 2:
+                target = next(pending_targets, None)
+                if target is None:
+                    break
+                rule_names = undecided(target[1])
+                if rule_names:
+                    running.add(executor.submit(scan_file, target[0], rule_names, scan_rules))
+            if not running:
+                break
+
+            done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                scanned_files += 1
+                for name, findings in future.result()["results"].items():
+                    hits[name].extend(findings[:max(0, hit_limit - len(hits[name]))])
+                display_progress(f"Triage: scanned {scanned_files} files...")
+
+            if not undecided(scan_rules):
+                for future in running:
+                    future.cancel()
+                break
+
+    display_progress("Triage complete.".ljust(50))  # Clear line
+    if show_progress:
+        print()  # Move to next line
+    return {"hits": hits, "scanned_files": scanned_files, "total_files": len(targets)}
+
+
+def write_triage_verdict(triage, log):
+    """
+    Writes the compact verdict of a triage: one line per category, with the first finding of each blocker.
+
+    Args:
+        triage (dict): Result of run_triage.
+        log (callable): Function writing one line of the verdict.
+    """
+    blockers = [name for name in triage_titles if triage["hits"][name]]
+    log(f"Verdict: {'BLOCKERS FOUND' if blockers else 'NO BLOCKERS FOUND'} ({len(blockers)} of {len(triage_titles)} categories)")
+    for name, title in triage_titles.items():
+        findings = triage["hits"][name]
+        if not findings:
+            log(f"- [clear]   {title}")
+        elif name == "uad_files":
+            log(f"- [BLOCKER] {title}: {findings[0]}")
+        else:
+            log(f"- [BLOCKER] {title}: {format_finding(name, findings[0])}")
+    log(f"Scanned {triage['scanned_files']} of {triage['total_files']} files.")
+
+
+def is_output_file(project_path, path):
+    """
+    Checks if a path is one of the reports or caches the script writes to the project directory.
+
+    Args:
+        project_path (str): Path to the project directory.
+        path (str): Path of a changed file.
+
+    Returns:
+        bool: True for the files written by the script, including their temporary files.
+    """
+    return (
+        os.path.normpath(os.path.dirname(path)) == os.path.normpath(project_path)
+        and os.path.basename(path).startswith("AS6_migration")
+    )
+
+
+def run_watch(project_path, output_file, jobs=None, use_cache=True, project_model=False, debounce=0.2, scan_limits=None):
+    """
+    Scans the project, then rescans it whenever files change until interrupted with Ctrl+C.
+    The rule pack, the project index and the results of every file stay in memory, so after a change only the
+    changed files are read and the report is rewritten.
+
+    Args:
+        project_path (str): Path to the project directory.
+        output_file (str): Path to the report file.
+        jobs (int): Number of worker processes for the file scan, None for the thread pool.
+        use_cache (bool): Use the cache files of the library graph, the include graph and the project model.
+        project_model (bool): Scan only the files in the Logical directory that are referenced by the package hierarchy.
+        debounce (float): Quiet time in seconds that ends a burst of changes, e.g. while an editor saves.
+        scan_limits (dict): Size and time limits per file, see scan_file.
+    """
+    project_index = build_project_index(project_path)
+    scan_cache = {}
+    watcher = create_watcher(project_path)
+    if watcher["kind"] != "inotify":
+        print(f"File system events are not available, checking for changes every {poll_interval} seconds.")
+
+    changed_paths = None
+    try:
+        while True:
+            start_time = time.perf_counter()
+            if changed_paths:
+                update_project_index(project_index, changed_paths)
+
+            results = run_checks(project_path, jobs, use_cache, (), None, project_model, project_index, scan_cache, scan_limits)
+            with open(output_file, "w", encoding="utf-8") as file:
+                write_report(results, lambda message: file.write(message + "\n"))
+
+            total_findings = sum(count_findings(results).values())
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            changes = f"{len(changed_paths)} changed paths, " if changed_paths else ""
+            print(f"[{time.strftime('%H:%M:%S')}] {changes}{total_findings} findings, report updated in {elapsed_ms:.0f} ms. Waiting for changes (Ctrl+C to stop)...")
+
+            changed_paths = set()
+            while not changed_paths:
+                changed_paths = {path for path in wait_for_changes(watcher, debounce) if not is_output_file(project_path, path)}
+    except KeyboardInterrupt:
+        print("\nWatch mode stopped.")
+    finally:
+        close_watcher(watcher)
+
+
+# Warm state of the projects served by the scan server in the format
+# project path -> {"lock", "project_index", "watcher", "scan_cache"}
+served_projects = {}
+served_projects_lock = threading.Lock()
+
+
+def get_served_project(project_path):
+    """
+    Returns the warm state of a project served by the scan server, created on the first request.
+
+    Args:
+        project_path (str): Path to the project directory.
+
+    Returns:
+        tuple: (absolute project path, project state).
+
+    Raises:
+        ValueError: If the directory is not an Automation Studio project.
+    """
+    project_path = os.path.abspath(project_path)
+    with served_projects_lock:
+        if project_path not in served_projects:
+            if not os.path.isdir(project_path) or not any(file.endswith(".apj") for file in os.listdir(project_path)):
+                raise ValueError(f"No .apj file found in the provided path: {project_path}")
+            served_projects[project_path] = {"lock": threading.Lock(), "project_index": None, "watcher": None, "scan_cache": {}}
+        return project_path, served_projects[project_path]
+
+
+def refresh_served_index(project_path, state):
+    """
+    Brings the project index of a served project up to date. Only the first request traverses the directory tree,
+    later requests apply the changes reported by the file watcher of the project. Must be called with the lock of
+    the project held.
+
+    Args:
+        project_path (str): Absolute path to the project directory.
+        state (dict): Project state, see get_served_project. Updated in place.
+    """
+    if state["project_index"] is None:
+        # The watcher starts before the traversal, so no change in between is lost
+        state["watcher"] = create_watcher(project_path)
+        state["project_index"] = build_project_index(project_path)
+        return
+
+    changed_paths = {path for path in collect_changes(state["watcher"]) if not is_output_file(project_path, path)}
+    if changed_paths:
+        update_project_index(state["project_index"], changed_paths)
+
+
+def collect_file_findings(scan_cache, file_paths):
+    """
+    Collects the findings of scanned files from the cache entries.
+
+    Args:
+        scan_cache (dict): Cache entries, see load_scan_cache.
+        file_paths (iterable): Paths of the files.
+
+    Returns:
+        list: Findings in the format {"rule", "file", "line", "column", "message"}.
+    """
+    findings = []
+    for file_path in file_paths:
+        record = scan_cache.get(file_path)
+        if record is None:
+            continue
+        for name, items in record["results"].items():
+            for finding, (line, column) in zip(items, record["locations"][name]):
+                findings.append({"rule": name, "file": file_path, "line": line, "column": column, "message": format_finding(name, finding)})
+    return findings
+
+
+def serve_scan_project(project_path, project_model=False):
+    """
+    Scan server method: runs all checks on a project. The project index is kept up to date by the file watcher
+    of the project, see refresh_served_index, so only new and changed files are read.
+
+    Args:
+        project_path (str): Path to the project directory.
+        project_model (bool): Scan only the files in the Logical directory that are referenced by the package hierarchy.
+
+    Returns:
+        dict: {"counts": number of findings per check, "findings": findings of all scanned files, see collect_file_findings}.
+    """
+    project_path, state = get_served_project(project_path)
+    with state["lock"]:
+        refresh_served_index(project_path, state)
+        results = run_checks(project_path, None, True, (), None, project_model, state["project_index"], state["scan_cache"])
+        return {"counts": count_findings(results), "findings": collect_file_findings(state["scan_cache"], sorted(state["scan_cache"]))}
+
+
+def serve_scan_paths(project_path, paths):
+    """
+    Scan server method: scans the given files of a project, e.g. the files staged for a commit.
+    Nothing else is traversed or read, and files unchanged since the last request are served from memory.
+
+    Args:
+        project_path (str): Path to the project directory.
+        paths (list): Paths of the files, absolute or relative to the project directory.
+
+    Returns:
+        dict: {"findings": findings of the given files, see collect_file_findings}.
+    """
+    project_path, state = get_served_project(project_path)
+    file_paths = [os.path.normpath(os.path.join(project_path, path)) for path in paths]
+    rule_roots = resolve_rule_roots(project_path, scan_rules)
+
+    with state["lock"]:
+        refresh_served_index(project_path, state)
+        # The files may have been saved just now, before the watcher reported them
+        update_project_index(state["project_index"], file_paths)
+
+        scan_cache = state["scan_cache"]
+        for file_path in file_paths:
+            rule_names = get_file_rules(os.path.basename(file_path), get_active_rules(os.path.dirname(file_path), rule_roots), scan_rules)
+            if file_path not in state["project_index"]["stats"] or not rule_names:
+                scan_cache.pop(file_path, None)
+                continue
+            size, mtime = state["project_index"]["stats"][file_path]
+            cached_entry = scan_cache.get(file_path)
+            if not is_entry_current(cached_entry, size, mtime, rule_names):
+                scan_cache[file_path] = scan_file(file_path, rule_names, scan_rules, cached_entry, False, default_scan_limits)
+                scan_cache[file_path].pop("limits", None)
+
+        return {"findings": collect_file_findings(scan_cache, file_paths)}
+
+
+def run_server(port):
+    """
+    Runs the scan server until interrupted with Ctrl+C. The compiled rule pack and the project index and the
+    results of every file of each served project stay in memory between requests.
+
+    Args:
+        port (int): TCP port on localhost.
+    """
+    global show_progress
+    show_progress = False
+
+    handlers = {
+        "scan_project": (serve_scan_project, {"project_path": (str, None), "project_model": (bool, None)}),
+        "scan_paths": (serve_scan_paths, {"project_path": (str, None), "paths": (list, str)}),
+    }
+    with create_scan_server(handlers, port) as server:
+        print(f"Scan server listening on 127.0.0.1:{port} (Ctrl+C to stop)...")
+        print(f"Requests must carry the token in {server.token_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nScan server stopped.")
+        finally:
+            for state in served_projects.values():
+                if state["watcher"] is not None:
+                    close_watcher(state["watcher"])
+
+
+def run_client(project_path, paths, port):
+    """
+    Sends a scan request to a running scan server and prints the findings.
+
+    Args:
+        project_path (str): Path to the project directory.
+        paths (list): Files to scan, relative to the project directory. If empty, the whole project is scanned.
+        port (int): TCP port of the server on localhost.
+    """
+    project_path = os.path.abspath(project_path)
+    try:
+        if paths:
+            response = call_scan_server("scan_paths", {"project_path": project_path, "paths": paths}, port)
+        else:
+            response = call_scan_server("scan_project", {"project_path": project_path}, port)
+    except OSError:
+        print(f"Error: No scan server is running on port {port}. Start one with: python AS6_migration.py --serve")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"Error: The scan server reported an error: {e}")
+        sys.exit(1)
 
+    for finding in response["findings"]:
+        file_path = os.path.relpath(finding["file"], project_path)
+        print(f"{file_path}:{finding['line']}:{finding['column']}: [{finding['rule']}] {finding['message']}")
+    print(f"\n{len(response['findings'])} findings.")
 
 
 # Update main function to handle project directory input and optional debug flag
@@ -303,11 +2524,64 @@ def main():
     Main function to scan for obsolete libraries, function blocks, functions, and unsupported hardware.
     Outputs the results to a file as well as the console.
     """
+    gc.set_threshold(gc_threshold, *gc.get_threshold()[1:])
+
     # Check if debug flag is provided
     debug_mode = "--debug" in sys.argv
 
+    # Check if a number of worker processes is provided
+    jobs = get_positive_int_option("--jobs")
+
+    # Check if the scan cache is disabled
+    use_cache = "--no-cache" not in sys.argv
+
+    # Check if only the files referenced by the packages should be scanned
+    project_model = "--project-model" in sys.argv
+
+    # Check if the size and time limits per file are changed
+    max_file_size_mb = get_positive_int_option("--max-file-size")
+    file_time_budget = get_positive_int_option("--file-time-budget")
+    scan_limits = {
+        "max_file_size": max_file_size_mb * 1024 * 1024 if max_file_size_mb else default_scan_limits["max_file_size"],
+        "time_budget": file_time_budget or default_scan_limits["time_budget"],
+    }
+
+    # Check if the checks should be profiled
+    profile_mode = "--profile" in sys.argv
+    profile_top_files = get_positive_int_option("--profile-top") or 10
+
+    # Check if machine readable findings should be written
+    findings_outputs = [(output_format, get_option_value(f"--{output_format}")) for output_format in ("jsonl", "sarif")]
+    findings_outputs = [(output_format, path) for output_format, path in findings_outputs if path]
+
+    # Check if the findings should be printed while the scan runs. They replace the progress display.
+    if "--stream" in sys.argv:
+        global show_progress
+        show_progress = False
+        findings_outputs.append(("text", "-"))
+
+    # Check if the project should be rescanned on every change
+    watch_mode = "--watch" in sys.argv
+    debounce_ms = get_positive_int_option("--debounce") or 200
+
+    # Check if only a verdict per category is needed, decided after the given number of findings
+    triage_hits = (get_positive_int_option("--triage-hits") or 1) if "--triage" in sys.argv else None
+
+    # Check if the scan server should be started or used
+    server_port = get_positive_int_option("--port") or default_server_port
+    client_paths = get_option_value("--paths")
+
+    # Check if only the files changed since a git revision should be scanned
+    since_revision = get_option_value("--since")
+
+    # Serve scan requests for any number of projects
+    if "--serve" in sys.argv:
+        run_server(server_port)
+        return
+
     # Check if a project path is provided
     project_path = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else os.getcwd()
+    project_path = os.path.normpath(os.path.abspath(project_path))
 
     # Check if valid project path
     if not os.path.exists(project_path):
@@ -317,6 +2591,13 @@ def main():
         print('   python AS6_migration.py "C:\\path\\to\\your\\project"')
         sys.exit(1)
 
+    # Scan all projects below the provided path
+    if "--batch" in sys.argv:
+        workers = get_positive_int_option("--workers") or os.cpu_count() or 1
+        output_file = run_batch(project_path, workers, use_cache, triage_hits)
+        print(f"\nResults have been saved to {output_file}\n")
+        return
+
     # Check if .apj file exists in the provided path
     apj_files = [file for file in os.listdir(project_path) if file.endswith(".apj")]
     if not apj_files:
@@ -329,227 +2610,85 @@ def main():
         print("   python AS6_migration.py")
         sys.exit(1)
 
+    # Send the scan request to a running scan server
+    if "--client" in sys.argv:
+        run_client(project_path, client_paths.split(",") if client_paths else [], server_port)
+        return
+
     print(f"Project path validated: {project_path}")
     print(f"Using project file: {apj_files[0]}")
 
     output_file = os.path.join(project_path, "AS6_migration_result.txt")
+
+    if since_revision:
+        try:
+            report_changes_since(project_path, since_revision, output_file)
+        except RuntimeError as e:
+            print(f"Error: The differential scan against {since_revision} failed: {e}")
+            print("\nMake sure the project is inside a git repository and the revision exists.")
+            sys.exit(1)
+        print(f"\nResults have been saved to {output_file}\n")
+        return
+
+    if triage_hits:
+        output_file = os.path.join(project_path, "AS6_migration_triage.txt")
+        start_time = time.time()
+        triage = run_triage(project_path, triage_hits)
+        with open(output_file, "w", encoding="utf-8") as file:
+            def log(message):
+                print(message)  # Print to console
+                file.write(message + "\n")  # Write to file
+
+            write_triage_verdict(triage, log)
+            log(f"Triage completed in {time.time() - start_time:.2f} seconds.")
+        print(f"\nResults have been saved to {output_file}\n")
+        return
+
+    if watch_mode:
+        run_watch(project_path, output_file, jobs, use_cache, project_model, debounce_ms / 1000, scan_limits)
+        print(f"\nResults have been saved to {output_file}\n")
+        return
+
     with open(output_file, "w", encoding="utf-8") as file:
         try:
             def log(message, log_file=file):
                 print(message)  # Print to console
-                log_file.write(message + "\n")  # Write to file
-                log_file.flush()  # Ensure data is written immediately
+                log_file.write(message + "\n")  # Write to file, flushed when the report is complete
 
             log("Scanning started... Please wait while the script analyzes your project files.\n", file)
 
             start_time = time.time()
 
-            # Use project_path as the root directory for scanning
-            reinstall_library_results = scan_files_parallel(
-                os.path.join(project_path, "Logical", "Libraries"), [".pkg"], process_reinstall_libraries, reinstall_libraries
-            )
-            
-            invalid_pkg_files = scan_files_parallel(
-                os.path.join(project_path, "Logical", "Libraries"), [".pkg"], process_pkg_file, obsolete_dict
-            )
-
-            invalid_var_typ_files = scan_files_parallel(
-                os.path.join(project_path, "Logical"), [".var", ".typ"], process_var_file, obsolete_function_blocks
-            )
-
-            invalid_st_c_files = scan_files_parallel(
-                os.path.join(project_path, "Logical"), [".st", ".c", ".cpp"], process_st_c_file, obsolete_functions
-            )
-
-            hardware_results = scan_files_parallel(
-                os.path.join(project_path, "Physical"), [".hw"], process_hw_file, unsupported_hardware
-            )
-
-            lby_dependency_results = scan_files_parallel(
-                os.path.join(project_path, "Logical", "Libraries"), [".lby"], process_lby_file, obsolete_dict
-            )
-
-            c_include_dependency_results = scan_files_parallel(
-                os.path.join(project_path, "Logical"), [".c", ".cpp", ".hpp"], process_c_cpp_hpp_includes_file, obsolete_dict
-            )
-
-            vision_settings_results = check_vision_settings(os.path.join(project_path, "Physical"))
-
-            mappView_settings_results = check_mappView(os.path.join(project_path, "Physical"))
-
-            mapp_version_results = check_mapp_version(project_path)
-
-            # Store the list of files containing deprecated string functions
-            deprecated_string_files = check_deprecated_string_functions(
-                os.path.join(project_path, "Logical"), 
-                [".st"], 
-                deprecated_string_functions 
-            )
-
-            # Ensure we have a valid list, even if no deprecated functions are found
-            if not isinstance(deprecated_string_files, list):
-                deprecated_string_files = []  # Fallback to an empty list
-
-            # Boolean flag to indicate whether deprecated string functions were found
-            found_deprecated_string = bool(deprecated_string_files)
-
-
-            # Store the list of files containing deprecated math functions
-            deprecated_math_files = check_deprecated_math_functions(
-                os.path.join(project_path, "Logical"),
-                [".st"],
-                deprecated_math_functions
-            )
-
-            # Ensure we have a valid list, even if no deprecated functions are found
-            if not isinstance(deprecated_math_files, list):
-                deprecated_math_files = []  # Fallback to an empty list
+            profile = None
+            if profile_mode:
+                tracemalloc.start()
+                profile = create_profile(profile_top_files)
 
-            # Boolean flag to indicate whether deprecated math functions were found
-            found_deprecated_math = bool(deprecated_math_files)
-
-            log("\n\nChecking project and hardware files for compatibility...")
-            file_patterns = ["*.apj", "*.hw"]
-            compatibility_results = check_files_for_compatibility(project_path, file_patterns)
-            if compatibility_results:
-                for file_path, issue in compatibility_results:
-                    log(f"- {file_path}: {issue}")
-                log("\nPlease ensure these files are saved at least once with Automation Studio 4.12.")
-            else:
-                log("- All project and hardware files are valid.")
-
-            log("\n\nChecking for misplaced .uad files...")
-            uad_results = check_uad_files(os.path.join(project_path, "Physical"))
-            if uad_results:
-                log("The following .uad files are not located in the required Connectivity/OpcUA directory:")
-                for file_path in uad_results:
-                    log(f"- {file_path}")
-                log("\nPlease create (via AS 4.12) and move these files to the required directory: Connectivity/OpcUA.")
-            else:
-                log("- All .uad files are in the correct location.")
-
-            log("\n\nThe following unsupported hardware were found:")
-            if hardware_results:
-                grouped_results = {}
-                for hardware_id, reason, file_path in hardware_results:
-                    config_name = os.path.basename(os.path.dirname(file_path))
-                    grouped_results.setdefault(config_name, set()).add((hardware_id, reason))
-
-                for config_name, entries in grouped_results.items():
-                    log(f"\nHardware configuration: {config_name}")
-                    for hardware_id, reason in sorted(entries):
-                        log(f"- {hardware_id}: {reason}")
-            else:
-                log("- None")
-
-            log("\n\nThe following invalid libraries were found in .pkg files:")
-            if invalid_pkg_files:
-                for library, reason, file_path in invalid_pkg_files:
-                    log(f"- {library}: {reason} (Found in: {file_path})")
-            else:
-                log("- None")
-
-            log("\n\nThe following libraries must be deleted and re-added with a version >= 6.0:")
-            if reinstall_library_results:
-                for library, reason, file_path in reinstall_library_results:
-                    log(f"- {library}: {reason} (Found in: {file_path})")
-            else:
-                log("- None")
-
-            # Convert .lby results to match the (library_name, reason, file_path) format
-            normalized_lby_results = [(lib, f"Dependency on {dep}: {reason}", path) for lib, dep, reason, path in lby_dependency_results]
-
-            # Merge results from .lby and C/C++/HPP include dependencies
-            all_dependency_results = normalized_lby_results + c_include_dependency_results
-
-            log("\n\nThe following obsolete dependencies were found in .lby, .c, .cpp, and .hpp files:")
-            if all_dependency_results:
-                for library_name, reason, file_path in all_dependency_results:
-                    log(f"- {library_name}: {reason} (Found in: {file_path})")
-            else:
-                log("- None")
+            findings_sinks = [
+                open_findings_sink(path, output_format, project_path, dict(scan_rule_titles, **project_check_titles))
+                for output_format, path in findings_outputs
+            ]
+            try:
+                results = run_checks(project_path, jobs, use_cache, findings_sinks, profile, project_model, None, None, scan_limits)
+            finally:
+                for sink in findings_sinks:
+                    close_findings_sink(sink)
 
-            log("\n\nThe following invalid function blocks were found in .var and .typ files:")
-            if invalid_var_typ_files:
-                for block, reason, file_path in invalid_var_typ_files:
-                    log(f"- {block}: {reason} (Found in: {file_path})")
-            else:
-                log("- None")
-
-            log("\n\nThe following invalid functions were found in .st, .c and .cpp files:")
-            found_any_invalid_functions = False
-
-            if invalid_st_c_files:
-                for function, reason, file_path in invalid_st_c_files:
-                    log(f"- {function}: {reason} (Found in: {file_path})")
-                found_any_invalid_functions = True
-
-            if found_deprecated_string:
-                log("- Deprecated AsString functions detected in the project: Consider using AsStringToAsBrStr.py to replace them.")
-                found_any_invalid_functions = True
-
-                # Debug: Print where the deprecated string functions were found only if --debug is enabled
-                if debug_mode and deprecated_string_files:
-                    print("\n[DEBUG] Deprecated AsString functions detected in the following files:")
-                    for file in deprecated_string_files:
-                        print(f"[DEBUG] - {file}")
-
-            if found_deprecated_math:
-                log("- Deprecated AsMath functions detected in the project: Consider using AsMathToAsBrMath.py to replace them.")
-                found_any_invalid_functions = True
-
-                # Debug: Print where the deprecated math functions were found only if --debug is enabled
-                if debug_mode and found_deprecated_math:
-                    print("\n[DEBUG] Deprecated AsMath functions detected in the following files:")
-                    for file in deprecated_math_files:
-                        print(f"[DEBUG] - {file}")
-            
-            if not found_any_invalid_functions:
-                log("- None")
-
-
-            if vision_settings_results['total_files'] > 2:
-                log("\n\nFound vision configuration. Make sure that IP forwarding is activated under the Powerlink interface!")
-                
-                # Debug: Print detailed information about mappVision locations if debug mode is enabled
-                if debug_mode and vision_settings_results['locations']:
-                    print("\n[DEBUG] mappVision folders found at:")
-                    for location in vision_settings_results['locations']:
-                        print(f"[DEBUG] - {location}")
-                
-                found_any_invalid_functions = True
-
-            if mappView_settings_results['found']:
-                log("\n\nFound mappView configuration. Several security seetings will be enforced after the migration.")
-                log("\n- To allow access without a certificate")
-                log("  Change the following settings in the OPC Client/Server configuration (Physical View/Connectivity/OpcUaCs/UaCsConfig.uacfg):")
-                log("  ClientServerConfiguration->Security->MessageSecurity->SecurityPolicies->None: Enabled")
-                log("\n- User login will be enabled by default. To allow anonymous access")
-                log("  Change the following settings in mappView configuration (Physical View/mappView/Config.mappviewcfg):")
-                log("  MappViewConfiguration->Server Configuration->Startup User: anonymous token")
-                log("\n  Change the following settings in the OPC Client/Server configuration (Physical View/Connectivity/OpcUaCs/UaCsConfig.uacfg):")
-                log("  ClientServerConfiguration->Security->Authentication->Authentication Methods->Anymous: Enabled")
-                log("  ClientServerConfiguration->Security->Authorization->Anonymous Access Add new user role and select \"everyone\"")
-                                    
-                # Debug: Print detailed information about mappVision locations if debug mode is enabled
-                if debug_mode and vision_settings_results['locations']:
-                    print("\n[DEBUG] mappView folders found at:")
-                    for location in vision_settings_results['locations']:
-                        print(f"[DEBUG] - {location}")
-                
-                found_any_invalid_functions = True                
-
-            log("\n\nChecking mapp version in project file...")
-            mapp_results = check_mapp_version(project_path)
-            if mapp_version_results:
-                for msg in mapp_version_results:
-                    log(f"- {msg}")
-            else:
-                log("- No mapp version information found.")
+            write_report(results, log, debug_mode)
 
             end_time = time.time()
             log(f"\n\nScanning completed successfully in {end_time - start_time:.2f} seconds.")
 
+            if profile is not None:
+                profile_result = finish_profile(profile)
+                tracemalloc.stop()
+                profile_file = os.path.join(project_path, "AS6_migration_profile.json")
+                write_profile(profile_result, profile_file)
+                print("\nProfile:")
+                for line in format_profile_summary(profile_result):
+                    print(line)
+                print(f"\nProfile has been saved to {profile_file}")
+
         except Exception as e:
             error_message = f"\n[ERROR] An unexpected error occurred: {str(e)}"
 
@@ -4,5 +4,5 @@ from .opc_ua import check_uad_files
 from .mapp_vision import check_vision_settings
 from .mapp_view import check_mappView
 from .mapp_services import check_mapp_version
-from .file_compatibility import check_files_for_compatibility
+from .file_compatibility import check_file_compatibility
 
@@ -1,51 +1,35 @@
-import os
-import re
-
-
-def check_deprecated_string_functions(root_dir, extensions, deprecated_functions):
+def check_deprecated_string_functions(file_path, content, function_matcher):
     """
-    Scans all .st files in the project directory for deprecated string functions.
+    Checks the content of an .st file for deprecated string functions.
+
+    Args:
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        function_matcher (re.Pattern): Precompiled matcher for all deprecated string functions.
 
     Returns:
-        list: A list of file paths where deprecated string functions were found.
+        list: The file path if deprecated string functions were found, otherwise an empty list.
     """
-    deprecated_files = []
+    if function_matcher.search(content):
+        return [file_path]
 
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if any(file.endswith(ext) for ext in extensions):
-                file_path = os.path.join(root, file)
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    if any(re.search(rf'\b{func}\b', content) for func in deprecated_functions):
-                        deprecated_files.append(file_path)
+    return []
 
-    return deprecated_files
 
-
-def check_deprecated_math_functions(root_dir, extensions, deprecated_functions):
+def check_deprecated_math_functions(file_path, content, function_matcher):
     """
-    Scans files for deprecated math function calls.
+    Checks the content of a file for deprecated math function calls.
     
     Args:
-        root_dir (str): The root directory to search in.
-        extensions (list): List of file extensions to check.
-        deprecated_functions (set): Set of deprecated math functions.
+        file_path (str): Path to the file.
+        content (bytes): Raw content of the file.
+        function_matcher (re.Pattern): Precompiled matcher for all deprecated math functions,
+            matching function names only when followed by '('.
 
     Returns:
-        list: A list of file paths where deprecated math functions were found.
+        list: The file path if deprecated math functions were found, otherwise an empty list.
     """
-    deprecated_files = []
-    function_pattern = re.compile(r'\b(' + '|'.join(deprecated_functions) + r')\s*\(')  # Match function names only when followed by '('
-
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if any(file.endswith(ext) for ext in extensions):
-                file_path = os.path.join(root, file)
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-                    if function_pattern.search(content):  # Only matches function calls
-                        deprecated_files.append(file_path)
-
-    return deprecated_files
+    if function_matcher.search(content):  # Only matches function calls
+        return [file_path]
 
+    return []
@@ -1,23 +1,16 @@
-import os
 import re
 
-def check_mapp_version(directory):
+def check_mapp_version(apj_file):
     """
     Checks for the mapp Services version in the .apj project file.
 
     Args:
-        directory (str): Path to the project directory.
+        apj_file (str): Path to the .apj project file, or None if the project has none.
 
     Returns:
         list: List of warnings or information about mapp Services version.
     """
     messages = []
-    apj_file = None
-
-    for file in os.listdir(directory):
-        if file.endswith(".apj"):
-            apj_file = os.path.join(directory, file)
-            break
 
     if not apj_file:
         return messages
@@ -44,4 +37,8 @@ def check_mapp_version(directory):
                 messages.append("You must first upgrade mappMotion to version 6.0 using 'Change runtime versions' in AS6.")
                 messages.append("Once mappMotion 6.0 is set, a dialog will assist with converting all project configurations.")
 
+            # The versions are only listed in the TechnologyPackages section, the rest of the file is not read
+            if "</TechnologyPackages>" in line:
+                break
+
     return messages
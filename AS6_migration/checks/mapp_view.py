@@ -1,10 +1,13 @@
 import os
 
-def check_mappView(directory):
+from scanner.project_index import iter_directories
+
+def check_mappView(project_index, directory):
     """
     Checks for the presence of mappView settings files in the specified directory.
 
     Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
         directory (str): Path to the directory to scan.
 
     Returns:
@@ -18,11 +21,11 @@ def check_mappView(directory):
     }
 
     # Walk through all directories
-    for root, dirs, files in os.walk(directory):
+    for root, dirs, files in iter_directories(project_index, directory):
         # Check if "mappVision" folder exists in current directory
         if "mappView" in dirs:
-            mappView_path = os.path.join(directory, "mappView")
+            mappView_path = os.path.join(root, "mappView")
             mappView_settings_result['found'] = True
             mappView_settings_result['locations'].append(mappView_path)
             
-    return mappView_settings_result   
\ No newline at end of file
+    return mappView_settings_result
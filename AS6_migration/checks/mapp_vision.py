@@ -1,10 +1,13 @@
 import os
 
-def check_vision_settings(directory):
+from scanner.project_index import iter_directories
+
+def check_vision_settings(project_index, directory):
     """
     Checks for the presence of mappVision settings files in the specified directory.
 
     Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
         directory (str): Path to the directory to scan.
 
     Returns:
@@ -20,7 +23,7 @@ def check_vision_settings(directory):
     }
     
     # Walk through all directories
-    for root, dirs, files in os.walk(directory):
+    for root, dirs, files in iter_directories(project_index, directory):
         # Check if "mappVision" folder exists in current directory
         if "mappVision" in dirs:
             vision_path = os.path.join(root, "mappVision")
@@ -29,9 +32,9 @@ def check_vision_settings(directory):
             
             # Count files in the mappVision folder and its subdirectories
             file_count = 0
-            for sub_root, _, sub_files in os.walk(vision_path):
+            for sub_root, _, sub_files in iter_directories(project_index, vision_path):
                 file_count += len(sub_files)
             
             vision_settings_result['total_files'] += file_count
     
-    return vision_settings_result
\ No newline at end of file
+    return vision_settings_result
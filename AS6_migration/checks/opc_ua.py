@@ -1,11 +1,14 @@
 import os
 
-def check_uad_files(root_dir):
+from scanner.project_index import iter_directories
+
+def check_uad_files(project_index, root_dir):
     """
     Checks if .uad files are located in any directory ending with Connectivity/OpcUA.
     Returns a list of misplaced .uad files.
 
     Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
         root_dir (str): Root directory of the project.
 
     Returns:
@@ -14,7 +17,7 @@ def check_uad_files(root_dir):
     required_suffix = os.path.normpath(os.path.join("Connectivity", "OpcUA"))
     misplaced_files = []
 
-    for root, _, files in os.walk(root_dir):
+    for root, _, files in iter_directories(project_index, root_dir):
         for file in files:
             if file.endswith(".uad"):
                 current_dir = os.path.normpath(root)  # Normalize the directory path
@@ -22,4 +25,4 @@ def check_uad_files(root_dir):
                 if not current_dir.endswith(required_suffix):
                     misplaced_files.append(os.path.join(root, file))
 
-    return misplaced_files
\ No newline at end of file
+    return misplaced_files
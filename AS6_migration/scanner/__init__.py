@@ -0,0 +1,63 @@
+from .keyword_matcher import compile_keyword_matcher
+from .keyword_matcher import find_keywords
+from .lookup_table import build_lookup_table
+from .lookup_table import lookup
+from .scan_cache import compute_fingerprint
+from .scan_cache import hash_content
+from .scan_cache import load_scan_cache
+from .scan_cache import save_scan_cache
+from .scan_cache import is_entry_current
+from .scan_cache import has_cache_changed
+from .git_diff import resolve_revision
+from .git_diff import get_changed_files
+from .git_diff import read_file_at_revision
+from .hardware_index import build_hardware_index
+from .hardware_index import lookup_hardware
+from .rule_pack import create_rule_pack
+from .rule_pack import get_rule_section
+from .findings_sink import open_findings_sink
+from .findings_sink import write_finding
+from .findings_sink import close_findings_sink
+from .project_index import build_project_index
+from .project_index import iter_directories
+from .project_index import update_project_index
+from .project_index import derive_project_index
+from .scheduler import run_scheduled_checks
+from .profiler import create_profile
+from .profiler import profile_check
+from .profiler import start_memory_measurement
+from .profiler import get_peak_memory
+from .profiler import add_file_profile
+from .profiler import finish_profile
+from .profiler import write_profile
+from .profiler import format_profile_summary
+from .xml_elements import compile_element_matcher
+from .xml_elements import find_element_values
+from .xml_elements import find_element_spans
+from .project_model import build_project_model
+from .project_model import get_descriptor_stats
+from .project_model import load_project_model
+from .project_model import save_project_model
+from .library_graph import get_library_files
+from .library_graph import build_library_graph
+from .library_graph import load_library_graph
+from .library_graph import save_library_graph
+from .library_graph import find_transitive_dependencies
+from .library_graph import parse_library_dependencies
+from .library_graph import find_dependent_libraries
+from .include_graph import include_pattern
+from .include_graph import load_include_cache
+from .include_graph import save_include_cache
+from .include_graph import build_include_graph
+from .include_graph import find_transitive_includes
+from .include_graph import include_graph_extensions
+from .include_graph import parse_includes
+from .include_graph import find_including_files
+from .file_watcher import create_watcher
+from .file_watcher import wait_for_changes
+from .file_watcher import collect_changes
+from .file_watcher import close_watcher
+from .file_watcher import poll_interval
+from .scan_server import create_scan_server
+from .scan_server import call_scan_server
+from .scan_server import default_server_port
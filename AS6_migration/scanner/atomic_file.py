@@ -0,0 +1,61 @@
+import os
+import json
+import threading
+
+
+def write_file_atomic(file_path, write, binary=False):
+    """
+    Writes a file through a temporary file, which then replaces it. An aborted run never leaves a broken file,
+    and the temporary name is unique per process and thread, so concurrent writers do not collide.
+
+    Args:
+        file_path (str): Path to the file.
+        write (callable): Called with the open temporary file to write the content.
+        binary (bool): Open the temporary file in binary mode instead of UTF-8 text mode.
+
+    Raises:
+        OSError: If the file cannot be written. The temporary file is removed.
+    """
+    temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') if binary else open(temp_path, 'w', encoding='utf-8') as f:
+            write(f)
+        os.replace(temp_path, file_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_json_atomic(file_path, content):
+    """
+    Saves a dictionary as compact JSON, see write_file_atomic.
+
+    Args:
+        file_path (str): Path to the file.
+        content (dict): JSON serializable content.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    write_file_atomic(file_path, lambda f: json.dump(content, f, separators=(',', ':')))
+
+
+def load_json(file_path):
+    """
+    Loads a dictionary saved by save_json_atomic.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        dict: The content, or None if the file does not exist, cannot be read or does not hold a JSON object.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return content if isinstance(content, dict) else None
@@ -0,0 +1,133 @@
+from collections import deque
+
+
+def trace_dependents(dependents, target):
+    """
+    Searches everything that depends on a target, directly or through other nodes, breadth first along the reversed edges.
+    Every node remembers the next node on its shortest path to the target, so each edge is visited once and
+    cycles in the graph are handled.
+
+    Args:
+        dependents (dict): Reversed edges in the format node -> [nodes depending on it].
+        target: The node to search the dependents of.
+
+    Returns:
+        dict: Dependent node -> next node on the path to the target. Direct dependents point to the target itself.
+    """
+    next_node = dict.fromkeys(dependents.get(target, ()), target)
+    queue = deque(next_node)
+    while queue:
+        node = queue.popleft()
+        for dependent in dependents.get(node, ()):
+            if dependent not in next_node and dependent != target:
+                next_node[dependent] = node
+                queue.append(dependent)
+    return next_node
+
+
+def collect_closure(successors, nodes):
+    """
+    Collects the given nodes and every node reachable from them.
+
+    Args:
+        successors (dict): Edges in the format node -> [nodes it depends on]. Nodes without an entry are left out.
+        nodes (iterable): The nodes to start from.
+
+    Returns:
+        set: The reachable nodes that have an entry in successors, including the given ones.
+    """
+    closure = {node for node in nodes if node in successors}
+    queue = deque(closure)
+    while queue:
+        for successor in successors[queue.popleft()]:
+            if successor in successors and successor not in closure:
+                closure.add(successor)
+                queue.append(successor)
+    return closure
+
+
+def get_dependency_path(next_node, node, target):
+    """
+    Returns the nodes between a dependent and the target, see trace_dependents.
+
+    Args:
+        next_node (dict): Next node per dependent, as returned by trace_dependents.
+        node: The dependent node.
+        target: The target node.
+
+    Returns:
+        list: The intermediate nodes in dependency order, empty for a direct dependent.
+    """
+    path = []
+    hop = next_node[node]
+    while hop != target:
+        path.append(hop)
+        hop = next_node[hop]
+    return path
+
+
+def collect_reachable(successors, own_bits):
+    """
+    Combines for every node the bits of all nodes reachable from it, including its own, in a single pass.
+    Strongly connected components are found with Tarjan's algorithm, which emits them in reverse topological order,
+    so the bits of all successors of a component are known when it is emitted and every edge is visited once.
+
+    Args:
+        successors (dict): Edges in the format node -> [nodes it depends on]. Nodes without an entry have no edges.
+        own_bits (dict): Bit mask per node, e.g. one bit per obsolete library the node depends on directly.
+
+    Returns:
+        dict: Node -> bitwise or of the own bits of all nodes reachable from it, for every node of successors.
+    """
+    reachable = {}
+    index = {}
+    low_link = {}
+    stack = []
+    on_stack = set()
+
+    for root in successors:
+        if root in index:
+            continue
+        # Iterative depth first search, each frame holds a node and the iterator over its successors
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        frames = [(root, iter(successors.get(root, ())))]
+        while frames:
+            node, remaining = frames[-1]
+            for successor in remaining:
+                if successor not in successors:
+                    continue
+                if successor not in index:
+                    index[successor] = low_link[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    frames.append((successor, iter(successors.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    low_link[node] = min(low_link[node], index[successor])
+            else:
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+                if low_link[node] != index[node]:
+                    continue
+
+                # The node is the root of a component: pop its members and combine their bits with the
+                # bits of the components they depend on, which were all emitted before
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                bits = 0
+                for member in component:
+                    bits |= own_bits.get(member, 0)
+                    for successor in successors.get(member, ()):
+                        bits |= reachable.get(successor, 0)
+                for member in component:
+                    reachable[member] = bits
+    return reachable
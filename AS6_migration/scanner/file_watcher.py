@@ -0,0 +1,279 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify event masks, see inotify(7)
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_watch_mask = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+
+# Header of an inotify event: watch descriptor, mask, cookie and length of the name
+_event_header = struct.Struct("iIII")
+
+# Interval in seconds at which the file stats are compared if inotify is not available
+poll_interval = 0.5
+
+
+def _stat_file(path):
+    """
+    Returns the size and the modification time of a file, None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _list_directory(dir_path):
+    """
+    Returns the modification time and the entry names of a directory, None if it cannot be read.
+    """
+    try:
+        return os.stat(dir_path).st_mtime_ns, set(os.listdir(dir_path))
+    except OSError:
+        return None
+
+
+def _record_tree(watcher, dir_path):
+    """
+    Records the file stats and the entries of a directory and all its subdirectories for polling.
+    """
+    for root, _, files in os.walk(dir_path):
+        listing = _list_directory(root)
+        if listing is None:
+            continue
+        watcher["directories"][root] = listing
+        for file in files:
+            path = os.path.join(root, file)
+            stat = _stat_file(path)
+            if stat is not None:
+                watcher["stats"][path] = stat
+
+
+def _forget_path(watcher, path):
+    """
+    Removes a file, or a directory with all its content, from the polling state.
+    """
+    watcher["stats"].pop(path, None)
+    if watcher["directories"].pop(path, None) is None:
+        return
+    prefix = os.path.join(path, "")
+    for dir_path in [dir_path for dir_path in watcher["directories"] if dir_path.startswith(prefix)]:
+        del watcher["directories"][dir_path]
+    for file_path in [file_path for file_path in watcher["stats"] if file_path.startswith(prefix)]:
+        del watcher["stats"][file_path]
+
+
+def _load_inotify():
+    """
+    Loads the inotify functions of the C library. Returns None on other platforms than Linux.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _add_watches(watcher, dir_path):
+    """
+    Watches a directory and all its subdirectories.
+
+    Raises:
+        OSError: If the watch limit of the system is reached.
+    """
+    for root, _, _ in os.walk(dir_path):
+        wd = watcher["libc"].inotify_add_watch(watcher["fd"], os.fsencode(root), _watch_mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached")
+            continue
+        watcher["directories"][wd] = root
+
+
+def create_watcher(root_dir):
+    """
+    Creates a watcher for all changes below a directory. On Linux the changes are reported by inotify events,
+    on other platforms or if the inotify watch limit is reached, the file stats are compared periodically.
+
+    Args:
+        root_dir (str): The directory to watch, e.g. the project directory.
+
+    Returns:
+        dict: The watcher, used with wait_for_changes and close_watcher.
+    """
+    libc = _load_inotify()
+    if libc is not None:
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd >= 0:
+            watcher = {"kind": "inotify", "root": root_dir, "libc": libc, "fd": fd, "directories": {}}
+            try:
+                _add_watches(watcher, root_dir)
+                return watcher
+            except OSError:
+                os.close(fd)
+
+    watcher = {"kind": "poll", "root": root_dir, "stats": {}, "directories": {}}
+    _record_tree(watcher, root_dir)
+    return watcher
+
+
+def _read_events(watcher, changed_paths):
+    """
+    Reads the pending inotify events and adds the affected paths. New directories are watched as well.
+    """
+    try:
+        data = os.read(watcher["fd"], 65536)
+    except BlockingIOError:
+        return
+
+    offset = 0
+    while offset < len(data):
+        wd, mask, _, name_length = _event_header.unpack_from(data, offset)
+        offset += _event_header.size
+        name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+        offset += name_length
+
+        if mask & _IN_Q_OVERFLOW:
+            # Events were lost, everything may have changed
+            changed_paths.add(watcher["root"])
+            continue
+        if mask & _IN_IGNORED:
+            watcher["directories"].pop(wd, None)
+            continue
+
+        dir_path = watcher["directories"].get(wd)
+        if dir_path is None:
+            continue
+        path = os.path.join(dir_path, name) if name else dir_path
+        changed_paths.add(path)
+        if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+            try:
+                _add_watches(watcher, path)
+            except OSError:
+                changed_paths.add(watcher["root"])
+
+
+def _poll_changes(watcher):
+    """
+    Compares the file stats and the modification times of the directories with the previous call and returns
+    the paths of new, changed and deleted files and directories. Only directories whose modification time
+    changed are listed again, to find their new and deleted entries.
+    """
+    changed_paths = set()
+    for path, stat in list(watcher["stats"].items()):
+        current_stat = _stat_file(path)
+        if current_stat == stat:
+            continue
+        changed_paths.add(path)
+        if current_stat is None:
+            del watcher["stats"][path]
+        else:
+            watcher["stats"][path] = current_stat
+
+    for dir_path, (mtime, names) in list(watcher["directories"].items()):
+        if dir_path not in watcher["directories"]:
+            continue  # Removed together with its parent
+        try:
+            if os.stat(dir_path).st_mtime_ns == mtime:
+                continue
+        except OSError:
+            continue  # A deleted directory is reported by its parent
+        listing = _list_directory(dir_path)
+        if listing is None:
+            continue
+        watcher["directories"][dir_path] = listing
+        for name in names - listing[1]:
+            path = os.path.join(dir_path, name)
+            changed_paths.add(path)
+            _forget_path(watcher, path)
+        for name in listing[1] - names:
+            path = os.path.join(dir_path, name)
+            changed_paths.add(path)
+            if os.path.isdir(path):
+                _record_tree(watcher, path)
+            else:
+                stat = _stat_file(path)
+                if stat is not None:
+                    watcher["stats"][path] = stat
+    return changed_paths
+
+
+def wait_for_changes(watcher, debounce=0.2):
+    """
+    Blocks until files below the watched directory change. Editors often write a file several times or
+    through temporary files when saving, so the changes are collected until no event arrived for the debounce time.
+
+    Args:
+        watcher (dict): Watcher created by create_watcher.
+        debounce (float): Quiet time in seconds that ends a burst of changes. When polling, a poll without changes ends it.
+
+    Returns:
+        set: Paths of the changed, created and deleted files and directories. Contains the watched directory
+             itself if events were lost and everything must be considered changed.
+    """
+    changed_paths = set()
+    if watcher["kind"] == "inotify":
+        timeout = None
+        while True:
+            readable, _, _ = select.select([watcher["fd"]], [], [], timeout)
+            if not readable:
+                return changed_paths
+            _read_events(watcher, changed_paths)
+            timeout = debounce
+
+    while True:
+        time.sleep(poll_interval)
+        new_changes = _poll_changes(watcher)
+        if not new_changes and changed_paths:
+            return changed_paths
+        changed_paths.update(new_changes)
+
+
+def collect_changes(watcher):
+    """
+    Returns the changes since the watcher was created or since the last call, without blocking.
+    Unlike wait_for_changes, a burst of changes that is still in progress is not waited for.
+
+    Args:
+        watcher (dict): Watcher created by create_watcher.
+
+    Returns:
+        set: Paths of the changed, created and deleted files and directories, see wait_for_changes.
+    """
+    if watcher["kind"] == "inotify":
+        changed_paths = set()
+        while select.select([watcher["fd"]], [], [], 0)[0]:
+            _read_events(watcher, changed_paths)
+        return changed_paths
+    return _poll_changes(watcher)
+
+
+def close_watcher(watcher):
+    """
+    Stops watching and releases the inotify file descriptor.
+
+    Args:
+        watcher (dict): Watcher created by create_watcher.
+    """
+    if watcher["kind"] == "inotify":
+        os.close(watcher["fd"])
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+
+# Write buffer of the findings file, so findings are not flushed one by one
+sink_buffer_size = 1024 * 1024
+
+
+def open_findings_sink(file_path, output_format, project_path, rule_titles):
+    """
+    Opens a findings output.
+    JSONL and text findings are written as soon as they are reported. SARIF needs a single document,
+    so its findings are collected and written when the sink is closed.
+
+    Args:
+        file_path (str): Path to the output file, "-" for the console.
+        output_format (str): "jsonl", "sarif" or "text" (one "file:line:column: [rule] message" line per finding).
+        project_path (str): Path to the project directory. File paths are reported relative to it.
+        rule_titles (dict): Description per rule id.
+
+    Returns:
+        dict: The sink, used with write_finding and close_findings_sink.
+    """
+    return {
+        "format": output_format,
+        "file": sys.stdout if file_path == "-" else open(file_path, "w", encoding="utf-8", buffering=sink_buffer_size),
+        "project_path": project_path,
+        "rule_titles": rule_titles,
+        "results": [],
+    }
+
+
+def write_finding(sink, rule_id, message, file_path, line=1, column=1, level="warning"):
+    """
+    Reports a single finding to a sink.
+
+    Args:
+        sink (dict): Sink created by open_findings_sink.
+        rule_id (str): Name of the rule that produced the finding.
+        message (str): Human readable description.
+        file_path (str): Path of the file the finding was found in.
+        line (int): Line of the finding, starting at 1.
+        column (int): Column of the finding, starting at 1.
+        level (str): "warning" for migration issues, "note" for information.
+    """
+    relative_path = os.path.relpath(file_path, sink["project_path"]).replace(os.sep, "/")
+
+    if sink["format"] == "jsonl":
+        finding = {
+            "rule": rule_id,
+            "level": level,
+            "file": relative_path,
+            "line": line,
+            "column": column,
+            "message": message,
+        }
+        sink["file"].write(json.dumps(finding) + "\n")
+        return
+
+    if sink["format"] == "text":
+        sink["file"].write(f"{relative_path}:{line}:{column}: [{rule_id}] {message}\n")
+        return
+
+    sink["results"].append({
+        "ruleId": rule_id,
+        "level": level,
+        "message": {"text": message},
+        "locations": [{
+            "physicalLocation": {
+                "artifactLocation": {"uri": relative_path, "uriBaseId": "PROJECTROOT"},
+                "region": {"startLine": line, "startColumn": column},
+            }
+        }],
+    })
+
+
+def close_findings_sink(sink):
+    """
+    Completes the output of a sink and closes its file. The console is only flushed.
+
+    Args:
+        sink (dict): Sink created by open_findings_sink.
+    """
+    if sink["format"] == "sarif":
+        project_uri = "file:///" + os.path.abspath(sink["project_path"]).replace(os.sep, "/").lstrip("/") + "/"
+        document = {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {
+                    "driver": {
+                        "name": "AS6_migration",
+                        "informationUri": "https://github.com/BRDK-GitHub/BrdkScripts",
+                        "rules": [
+                            {"id": rule_id, "shortDescription": {"text": title}}
+                            for rule_id, title in sink["rule_titles"].items()
+                        ],
+                    }
+                },
+                "originalUriBaseIds": {"PROJECTROOT": {"uri": project_uri}},
+                "results": sink["results"],
+            }],
+        }
+        json.dump(document, sink["file"], indent=1)
+
+    if sink["file"] is sys.stdout:
+        sink["file"].flush()
+    else:
+        sink["file"].close()
@@ -0,0 +1,101 @@
+import subprocess
+
+
+def run_git(project_path, *args):
+    """
+    Runs a git command in the project directory.
+
+    Args:
+        project_path (str): Path to the project directory.
+        *args: Arguments of the git command.
+
+    Returns:
+        bytes: Standard output of the command.
+
+    Raises:
+        RuntimeError: If git is not available or the command fails.
+    """
+    try:
+        completed = subprocess.run(["git", "-C", project_path, *args], capture_output=True)
+    except OSError as e:
+        raise RuntimeError(f"git could not be started: {e}")
+
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.decode("utf-8", errors="ignore").strip())
+    return completed.stdout
+
+
+def resolve_revision(project_path, revision):
+    """
+    Resolves a revision to a commit. A range A...B, as used by merge request pipelines, resolves to the
+    merge base of A and B, so only the changes of the merge request are compared. An empty side means HEAD.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git revision, e.g. origin/main or origin/main...HEAD.
+
+    Returns:
+        str: Hash of the commit.
+
+    Raises:
+        RuntimeError: If the project is not in a git repository or the revision is unknown.
+    """
+    run_git(project_path, "rev-parse", "--show-toplevel")
+    if "..." in revision:
+        base, head = revision.split("...", 1)
+        try:
+            return run_git(project_path, "merge-base", base or "HEAD", head or "HEAD").decode("utf-8").strip()
+        except RuntimeError:
+            raise RuntimeError(f"no merge base for '{revision}'")
+
+    try:
+        return run_git(project_path, "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}").decode("utf-8").strip()
+    except RuntimeError:
+        raise RuntimeError(f"unknown revision '{revision}'")
+
+
+def get_changed_files(project_path, revision, diff_filter=None):
+    """
+    Asks git which files below the project directory changed since a revision.
+    Includes uncommitted changes and untracked files. Renames are reported as a deletion and an addition.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git revision to compare against, e.g. origin/main, or a range A...B, see resolve_revision.
+        diff_filter (str): Only report these kinds of changes, e.g. "A" for added files, see git diff --diff-filter.
+            Untracked files count as added.
+
+    Returns:
+        list: Paths relative to the project directory.
+
+    Raises:
+        RuntimeError: If the project is not in a git repository or the revision is unknown.
+    """
+    revision = resolve_revision(project_path, revision)
+    filter_args = [f"--diff-filter={diff_filter}"] if diff_filter else []
+    changed = run_git(project_path, "diff", "--name-only", "--no-renames", "--relative", "-z", *filter_args, revision, "--", ".")
+    untracked = b""
+    if diff_filter is None or "A" in diff_filter:
+        untracked = run_git(project_path, "ls-files", "--others", "--exclude-standard", "-z", "--", ".")
+
+    paths = {path for path in (changed + untracked).decode("utf-8").split("\0") if path}
+    return sorted(paths)
+
+
+def read_file_at_revision(project_path, revision, relative_path):
+    """
+    Reads the content a file had at a revision, without touching the working tree.
+
+    Args:
+        project_path (str): Path to the project directory.
+        revision (str): Git revision.
+        relative_path (str): Path relative to the project directory, as returned by get_changed_files.
+
+    Returns:
+        bytes: The file content, or None if the file did not exist at the revision.
+    """
+    try:
+        return run_git(project_path, "show", f"{revision}:./{relative_path}")
+    except RuntimeError:
+        return None
+
@@ -0,0 +1,50 @@
+def build_hardware_index(hardware_dict):
+    """
+    Builds a reverse index from module type to reason, once at startup.
+    Entries ending with '*' (e.g. "3AI*") match a whole module family and are stored in a prefix trie.
+
+    Args:
+        hardware_dict (dict): Unsupported hardware in the format reason -> [module types].
+
+    Returns:
+        dict: Index in the format {"exact": module type -> [reasons], "prefixes": prefix trie}.
+              Trie nodes map a character to the child node, the key "" holds the reasons of a family ending there.
+    """
+    index = {"exact": {}, "prefixes": {}}
+    for reason, items in hardware_dict.items():
+        for item in items:
+            if item.endswith("*"):
+                node = index["prefixes"]
+                for char in item[:-1]:
+                    node = node.setdefault(char, {})
+                reasons = node.setdefault("", [])
+            else:
+                reasons = index["exact"].setdefault(item, [])
+            if reason not in reasons:
+                reasons.append(reason)
+    return index
+
+
+def lookup_hardware(index, hw_type):
+    """
+    Returns the reasons why a module type is unsupported.
+    Costs one hash lookup plus one trie step per character of the module type.
+
+    Args:
+        index (dict): Index created by build_hardware_index.
+        hw_type (str): The module type, e.g. "3AI350.6".
+
+    Returns:
+        list: Reasons, empty if the module type is supported.
+    """
+    reasons = list(index["exact"].get(hw_type, []))
+
+    node = index["prefixes"]
+    for char in hw_type:
+        node = node.get(char)
+        if node is None:
+            break
+        for reason in node.get("", []):
+            if reason not in reasons:
+                reasons.append(reason)
+    return reasons
@@ -0,0 +1,237 @@
+import os
+import re
+
+from .atomic_file import save_json_atomic
+from .atomic_file import load_json
+from collections import deque
+
+from .dependency_paths import trace_dependents
+from .dependency_paths import get_dependency_path
+from .lookup_table import lookup
+from .scan_cache import hash_content
+
+# Version of the include cache layout, increase when the format or the include parsing changes
+include_cache_format_version = 1
+
+# Files of the include graph: sources include headers, headers include other headers
+include_graph_extensions = (".c", ".cpp", ".h", ".hpp")
+
+# Files reported as sources, headers only appear as intermediate files
+source_extensions = (".c", ".cpp")
+
+# An #include statement does not span lines, so the content is scanned without splitting it into lines.
+# Group 1 holds the included name as written.
+include_pattern = re.compile(rb'#include[^\S\r\n]+[<"]([^">\r\n]+)[">]')
+
+
+def load_include_cache(cache_path):
+    """
+    Loads the include lists of a previous run.
+
+    Args:
+        cache_path (str): Path to the cache file.
+
+    Returns:
+        dict: Cache in the format {"files": file_path -> [size, mtime, content hash], "includes": content hash -> [included names]}.
+              Empty if the cache does not exist, cannot be read or has another format.
+    """
+    empty_cache = {"files": {}, "includes": {}}
+    cache = load_json(cache_path)
+    if cache is None or cache.get("version") != include_cache_format_version:
+        return empty_cache
+    return {"files": cache.get("files", {}), "includes": cache.get("includes", {})}
+
+
+def save_include_cache(cache_path, cache):
+    """
+    Saves the include lists, see save_json_atomic.
+
+    Args:
+        cache_path (str): Path to the cache file.
+        cache (dict): The cache, see load_include_cache.
+    """
+    save_json_atomic(cache_path, {"version": include_cache_format_version, **cache})
+
+
+def parse_includes(content):
+    """
+    Returns the names included by a C/C++ source or header.
+
+    Args:
+        content (bytes): Raw content of the file.
+
+    Returns:
+        list: Names as written in the #include statements.
+    """
+    return [name.decode('utf-8', errors='ignore') for name in include_pattern.findall(content)]
+
+
+def build_include_graph(project_index, root_dir, cache, project_model=None):
+    """
+    Collects the #include statements of all C/C++ sources and headers below a directory.
+    Files with unchanged size and modification time are not read. The include lists are stored by content hash,
+    so identical copies of a header are parsed only once. The cache is updated in place, entries of deleted
+    files are dropped.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        root_dir (str): The directory to search in, e.g. the Logical directory.
+        cache (dict): Include cache, see load_include_cache.
+        project_model (set): Files referenced by the packages of the project, see build_project_model.
+            If provided, unreferenced files are left out.
+
+    Returns:
+        dict: File path -> [names as written in the #include statements].
+    """
+    prefix = os.path.join(root_dir, "")
+    cached_files = cache["files"]
+    cached_includes = cache["includes"]
+    files = {}
+    includes = {}
+    graph = {}
+
+    for extension in include_graph_extensions:
+        for file_path in project_index["files_by_extension"].get(extension, []):
+            if not file_path.startswith(prefix) or (project_model is not None and file_path not in project_model):
+                continue
+
+            size, mtime = project_index["stats"][file_path]
+            entry = cached_files.get(file_path)
+            if entry is None or entry[0] != size or entry[1] != mtime or entry[2] not in cached_includes:
+                try:
+                    with open(file_path, 'rb') as f:
+                        content = f.read()
+                except OSError:
+                    continue
+                content_hash = hash_content(content)
+                if content_hash not in cached_includes:
+                    cached_includes[content_hash] = parse_includes(content)
+                entry = [size, mtime, content_hash]
+
+            files[file_path] = entry
+            includes[entry[2]] = cached_includes[entry[2]]
+            graph[file_path] = includes[entry[2]]
+
+    cache["files"] = files
+    cache["includes"] = includes
+    return graph
+
+
+def resolve_include(name, directory, headers_by_name, project_index):
+    """
+    Resolves an included name to a header of the project.
+    The name is first looked up relative to the including file, then by file name among all headers of the project,
+    like the include paths of Automation Studio do for the library and program directories.
+
+    Args:
+        name (str): Name as written in the #include statement.
+        directory (str): Directory of the including file.
+        headers_by_name (dict): Lowercase file name -> sorted header paths.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+
+    Returns:
+        str: Path of the header, or None if it is not part of the project.
+    """
+    candidate = os.path.normpath(os.path.join(directory, name))
+    if candidate in project_index["stats"]:
+        return candidate
+    headers = headers_by_name.get(get_included_file_name(name))
+    return headers[0] if headers else None
+
+
+def get_included_file_name(name):
+    """
+    Returns the lowercase file name of an included name, e.g. "asarcnet.h" for <sub/AsARCNET.h>.
+    """
+    return os.path.basename(name.replace("\\", "/")).lower()
+
+
+def find_including_files(graph, file_paths):
+    """
+    Finds the files including the given files, directly or through other headers. Includes are compared by file name,
+    which covers the relative and the project wide resolution of resolve_include, so a few more files than
+    necessary may be returned, but never fewer.
+
+    Args:
+        graph (dict): The include graph, see build_include_graph.
+        file_paths (iterable): Paths of the files, they do not need to be part of the graph.
+
+    Returns:
+        set: Paths of the including files and the given paths.
+    """
+    including_files = {}
+    for file_path, names in graph.items():
+        for name in names:
+            including_files.setdefault(get_included_file_name(name), []).append(file_path)
+
+    found_files = set(file_paths)
+    queue = deque(found_files)
+    while queue:
+        for file_path in including_files.get(os.path.basename(queue.popleft()).lower(), ()):
+            if file_path not in found_files:
+                found_files.add(file_path)
+                queue.append(file_path)
+    return found_files
+
+
+def find_transitive_includes(graph, project_index, patterns, file_paths=None):
+    """
+    Finds sources that include the header of an obsolete library through other headers of the project,
+    e.g. Main.c -> Motion.h -> AsTPU.h. Headers named <library>.h refer to a library.
+    Direct includes are not reported, they are found by process_c_cpp_hpp_includes_file.
+
+    Args:
+        graph (dict): The include graph, see build_include_graph.
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        patterns (dict): Lookup table of obsolete libraries with reasons, created by build_lookup_table.
+        file_paths (set): Paths of the sources to report. If provided, only these files and the headers they include
+            are evaluated, e.g. the changed files and the files including them, see find_including_files.
+
+    Returns:
+        list: Findings in the format (file_name, [intermediate headers], obsolete library, reason, file_path),
+              sorted by file path.
+    """
+    headers_by_name = {}
+    for file_path in sorted(graph):
+        if file_path.lower().endswith((".h", ".hpp")):
+            headers_by_name.setdefault(os.path.basename(file_path).lower(), []).append(file_path)
+
+    # Edges point from the included file to the including file. Obsolete libraries are nodes of their own,
+    # identified by their lowercase name, and are not followed any further.
+    # Without file_paths every file of the graph is visited, otherwise the given files and the headers they include
+    dependents = {}
+    obsolete_libraries = {}
+    queue = deque(graph if file_paths is None else sorted(file_path for file_path in file_paths if file_path in graph))
+    visited = set(queue) if file_paths is not None else None
+    while queue:
+        file_path = queue.popleft()
+        directory = os.path.dirname(file_path)
+        for name in graph[file_path]:
+            library = os.path.basename(name.replace("\\", "/"))
+            entries = lookup(patterns, library[:-2]) if library.lower().endswith(".h") else []
+            if entries:
+                node = library[:-2].lower()
+                obsolete_libraries[node] = entries
+            else:
+                node = resolve_include(name, directory, headers_by_name, project_index)
+                if node is None or node == file_path:
+                    continue
+                if visited is not None and node in graph and node not in visited:
+                    visited.add(node)
+                    queue.append(node)
+            dependents.setdefault(node, []).append(file_path)
+
+    results = []
+    for obsolete, entries in obsolete_libraries.items():
+        next_file = trace_dependents(dependents, obsolete)
+        for file_path, hop in next_file.items():
+            if hop == obsolete or not file_path.lower().endswith(source_extensions):
+                continue
+            if file_paths is not None and file_path not in file_paths:
+                continue
+            path = [os.path.basename(header) for header in get_dependency_path(next_file, file_path, obsolete)]
+            for pattern, reason in entries:
+                results.append((os.path.basename(file_path), path, pattern, reason, file_path))
+
+    results.sort(key=lambda finding: (finding[4], finding[2]))
+    return results
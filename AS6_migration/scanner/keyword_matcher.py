@@ -0,0 +1,65 @@
+import re
+
+
+def _trie_pattern(node):
+    """
+    Converts a character trie into a regex fragment.
+    Shared prefixes are matched once, so the regex engine does not retry every keyword at each position.
+
+    Args:
+        node (dict): Trie node in the format character -> child node. The key "" marks the end of a keyword.
+
+    Returns:
+        str: Regex fragment matching every keyword stored below the node.
+    """
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+
+    keyword_ends_here = "" in node
+    if len(branches) == 1 and not keyword_ends_here:
+        return branches[0]
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if keyword_ends_here else pattern
+
+
+def compile_keyword_matcher(keywords, suffix=r'\b'):
+    """
+    Compiles a list of keywords into one regex that finds all of them in a single pass.
+    Keywords are matched as whole words. The matcher runs on the raw bytes of a file, so the content never
+    has to be decoded; all keywords of the discontinuation lists are ASCII.
+
+    Args:
+        keywords (iterable): Keywords to match, e.g. function names from the discontinuation lists.
+        suffix (str): Regex that must follow a keyword, e.g. r'\\s*\\(' to match function calls only.
+
+    Returns:
+        re.Pattern: Compiled bytes matcher. Group 1 holds the matched keyword.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    if not trie:
+        # Nothing to match, use a pattern that never matches
+        return re.compile(rb'(?!)')
+
+    return re.compile((r'\b(' + _trie_pattern(trie) + r')' + suffix).encode("utf-8"))
+
+
+def find_keywords(matcher, content):
+    """
+    Scans the content once and returns every keyword hit.
+
+    Args:
+        matcher (re.Pattern): Matcher created by compile_keyword_matcher.
+        content (bytes): Raw content to scan, or a memory map of the file.
+
+    Returns:
+        list: Hits in the format (keyword, offset), in the order they appear in the content.
+    """
+    return [(match.group(1).decode("utf-8"), match.start(1)) for match in matcher.finditer(content)]
@@ -0,0 +1,223 @@
+import os
+
+from .atomic_file import save_json_atomic
+from .atomic_file import load_json
+from .dependency_paths import collect_closure
+from .dependency_paths import collect_reachable
+from .dependency_paths import trace_dependents
+from .dependency_paths import get_dependency_path
+from .lookup_table import lookup
+from .xml_elements import compile_element_matcher
+from .xml_elements import find_element_values
+
+
+# Dependencies of a library: ObjectName attributes of the <Dependency> elements of its .lby file
+_dependency_matcher = compile_element_matcher("Dependency", "ObjectName")
+
+
+def get_library_files(project_index, libraries_dir, project_model=None):
+    """
+    Returns the .lby files of all libraries below a directory.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        libraries_dir (str): The directory to search in, e.g. Logical/Libraries.
+        project_model (set): Files referenced by the packages of the project, see build_project_model.
+            If provided, unreferenced libraries are left out.
+
+    Returns:
+        dict: .lby path -> [size, modification time in nanoseconds]. The graph only changes if one of them changes.
+    """
+    prefix = os.path.join(libraries_dir, "")
+    return {
+        path: list(project_index["stats"][path])
+        for path in project_index["files_by_extension"].get(".lby", [])
+        if path.startswith(prefix) and (project_model is None or path in project_model)
+    }
+
+
+def parse_library_dependencies(content):
+    """
+    Returns the direct dependencies of a library.
+
+    Args:
+        content (bytes): Raw content of the .lby file.
+
+    Returns:
+        list: Names of the libraries it depends on.
+    """
+    return find_element_values(_dependency_matcher, content)
+
+
+def build_library_graph(library_files, cache=None):
+    """
+    Reads the direct dependencies of every library. Libraries with unchanged size and modification time are
+    taken from the graph of a previous run, every other .lby file is read once.
+
+    Args:
+        library_files (dict): .lby path -> [size, modification time in nanoseconds], see get_library_files.
+        cache (dict): Graph of a previous run, see load_library_graph. None to read every .lby file.
+
+    Returns:
+        dict: .lby path -> [names of the libraries it depends on].
+    """
+    cached_files = cache["libraries"] if cache else {}
+    cached_graph = cache["graph"] if cache else {}
+    graph = {}
+    for file_path in sorted(library_files):
+        if cached_files.get(file_path) == library_files[file_path] and file_path in cached_graph:
+            graph[file_path] = cached_graph[file_path]
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            continue
+        graph[file_path] = parse_library_dependencies(content)
+    return graph
+
+
+def load_library_graph(graph_path):
+    """
+    Loads the library graph of a previous run.
+
+    Args:
+        graph_path (str): Path to the graph file.
+
+    Returns:
+        dict: Cache in the format {"libraries": .lby path -> [size, mtime], "graph": the library graph}.
+              Empty if the file does not exist or cannot be read.
+    """
+    cached = load_json(graph_path)
+    if cached is None:
+        return {"libraries": {}, "graph": {}}
+    return {"libraries": cached.get("libraries", {}), "graph": cached.get("graph", {})}
+
+
+def save_library_graph(graph_path, library_files, graph):
+    """
+    Saves the library graph, see save_json_atomic.
+
+    Args:
+        graph_path (str): Path to the graph file.
+        library_files (dict): .lby files with their stats the graph was built from, see get_library_files.
+        graph (dict): The library graph, see build_library_graph.
+    """
+    save_json_atomic(graph_path, {"libraries": library_files, "graph": graph})
+
+
+def get_library_name(file_path):
+    """
+    Returns the name of a library, compared case-insensitively like Automation Studio does.
+
+    Args:
+        file_path (str): Path to the .lby file, the library name is the name of its directory.
+
+    Returns:
+        str: The lowercase library name.
+    """
+    return os.path.basename(os.path.dirname(file_path)).lower()
+
+
+def find_dependent_libraries(graph, file_paths):
+    """
+    Finds the libraries depending on the given libraries, directly or through other libraries.
+
+    Args:
+        graph (dict): The library graph, see build_library_graph.
+        file_paths (iterable): Paths of the .lby files, they do not need to be part of the graph.
+
+    Returns:
+        set: Paths of the .lby files of the dependent libraries and the given paths.
+    """
+    libraries = {}
+    dependents = {}
+    for file_path, names in graph.items():
+        name = get_library_name(file_path)
+        libraries.setdefault(name, file_path)
+        for dependency in names:
+            dependents.setdefault(dependency.lower(), []).append(name)
+
+    dependent_files = set(file_paths)
+    for file_path in file_paths:
+        dependent_files.update(libraries[name] for name in trace_dependents(dependents, get_library_name(file_path)))
+    return dependent_files
+
+
+def find_transitive_dependencies(graph, patterns, file_paths=None):
+    """
+    Finds libraries that depend on an obsolete library through other libraries, e.g. X -> Y -> obsolete.
+    The obsolete libraries reachable from every library are collected in a single pass over the graph, see
+    collect_reachable. Only for the obsolete libraries with findings, the reported paths are then searched along
+    the reversed edges, see trace_dependents. Each search only visits the libraries depending on its obsolete library.
+    Direct dependencies are not reported, they are found by process_lby_file.
+
+    Args:
+        graph (dict): The library graph, see build_library_graph. The library name is the directory name of the .lby file.
+        patterns (dict): Lookup table of obsolete libraries with reasons, created by build_lookup_table.
+        file_paths (set): Paths of the .lby files to report. If provided, only these libraries and the libraries
+            they depend on are evaluated, e.g. the changed libraries and their dependents, see find_dependent_libraries.
+
+    Returns:
+        list: Findings in the format (library_name, [intermediate libraries], obsolete library, reason, file_path),
+              sorted by file path.
+    """
+    libraries = {}
+    for file_path in graph:
+        libraries.setdefault(get_library_name(file_path), file_path)
+    dependencies = {name: [dependency.lower() for dependency in graph[file_path]] for name, file_path in libraries.items()}
+    if file_paths is not None:
+        # The findings of a library only depend on the libraries it depends on
+        closure = collect_closure(dependencies, [name for name, file_path in libraries.items() if file_path in file_paths])
+        dependencies = {name: names for name, names in dependencies.items() if name in closure}
+
+    # One bit per obsolete library, and the bits of the obsolete libraries each library depends on directly
+    obsolete_libraries = []
+    obsolete_bits = {}
+    for dependency in sorted({dependency for names in dependencies.values() for dependency in names}):
+        if lookup(patterns, dependency):
+            obsolete_bits[dependency] = 1 << len(obsolete_libraries)
+            obsolete_libraries.append(dependency)
+    direct_bits = {}
+    for name, names in dependencies.items():
+        for dependency in names:
+            direct_bits[name] = direct_bits.get(name, 0) | obsolete_bits.get(dependency, 0)
+
+    reachable = collect_reachable(dependencies, direct_bits)
+
+    # Libraries reaching an obsolete library only through another library, per obsolete library
+    reporting_libraries = {}
+    for name, names in dependencies.items():
+        if file_paths is not None and libraries[name] not in file_paths:
+            continue
+        transitive_bits = 0
+        for dependency in names:
+            if dependency in libraries:
+                transitive_bits |= reachable[dependency]
+        transitive_bits &= ~(direct_bits.get(name, 0) | obsolete_bits.get(name, 0))
+        while transitive_bits:
+            bit = transitive_bits & -transitive_bits
+            transitive_bits ^= bit
+            reporting_libraries.setdefault(obsolete_libraries[bit.bit_length() - 1], []).append(name)
+
+    dependents = {}
+    if reporting_libraries:
+        for name, names in dependencies.items():
+            for dependency in names:
+                dependents.setdefault(dependency, []).append(name)
+
+    results = []
+    for obsolete, names in reporting_libraries.items():
+        entries = lookup(patterns, obsolete)
+        next_library = trace_dependents(dependents, obsolete)
+        for name in names:
+            path = [
+                os.path.basename(os.path.dirname(libraries[library]))
+                for library in get_dependency_path(next_library, name, obsolete)
+            ]
+            file_path = libraries[name]
+            for pattern, reason in entries:
+                results.append((os.path.basename(os.path.dirname(file_path)), path, pattern, reason, file_path))
+
+    results.sort(key=lambda finding: (finding[4], finding[2]))
+    return results
@@ -0,0 +1,29 @@
+def build_lookup_table(patterns):
+    """
+    Precompiles a discontinuation dictionary into a case-folded lookup table.
+    Each name found in a file can then be resolved with a single hash lookup.
+
+    Args:
+        patterns (dict): Patterns with reasons, e.g. {"AsARCNET": "Supports SG3 only"}.
+
+    Returns:
+        dict: Lookup table in the format lowercase name -> [(pattern, reason)].
+    """
+    table = {}
+    for pattern, reason in patterns.items():
+        table.setdefault(pattern.lower(), []).append((pattern, reason))
+    return table
+
+
+def lookup(table, name):
+    """
+    Resolves a name case-insensitively in a lookup table.
+
+    Args:
+        table (dict): Lookup table created by build_lookup_table.
+        name (str): Name found in a file.
+
+    Returns:
+        list: Matching entries in the format (pattern, reason), empty if the name is not listed.
+    """
+    return table.get(name.lower(), [])
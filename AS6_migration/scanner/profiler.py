@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import heapq
+import tracemalloc
+
+# Highest traced memory since the current measurement window started. tracemalloc.reset_peak discards the
+# peak, so the peak is folded into this high-water mark before every reset.
+window_peak_memory = 0
+
+
+def update_window_peak():
+    """
+    Folds the current peak of tracemalloc into the high-water mark of the measurement window.
+
+    Returns:
+        int: Highest traced memory in bytes since the window started.
+    """
+    global window_peak_memory
+    window_peak_memory = max(window_peak_memory, tracemalloc.get_traced_memory()[1])
+    return window_peak_memory
+
+
+def start_memory_window():
+    """
+    Starts a new measurement window by clearing the high-water mark and the peak of tracemalloc.
+    """
+    global window_peak_memory
+    window_peak_memory = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def create_profile(top_files=10):
+    """
+    Creates an empty scan profile.
+
+    Args:
+        top_files (int): Number of slowest files to keep.
+
+    Returns:
+        dict: The profile, filled by profile_check and add_file_profile.
+    """
+    start_memory_window()
+    return {
+        "top_files": top_files,
+        "start_wall": time.perf_counter(),
+        "start_cpu": time.process_time(),
+        "checks": {},
+        "extensions": {},
+        "rules": {},
+        "cached_files": 0,
+        "slowest_files": [],
+        # High-water mark of all checks, kept across the measurement windows of the checks
+        "peak_memory": 0,
+    }
+
+
+def profile_check(profile, name, function):
+    """
+    Wraps a check function so its wall time, CPU time and peak memory are recorded.
+    The peak memory is only meaningful if the checks run one after another while tracemalloc is tracing.
+
+    Args:
+        profile (dict): Profile created by create_profile.
+        name (str): Name of the check.
+        function (callable): The check function.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    def profiled_function(*args):
+        if tracemalloc.is_tracing():
+            profile["peak_memory"] = max(profile["peak_memory"], update_window_peak())
+            start_memory_window()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            return function(*args)
+        finally:
+            peak_memory = update_window_peak() if tracemalloc.is_tracing() else None
+            if peak_memory is not None:
+                profile["peak_memory"] = max(profile["peak_memory"], peak_memory)
+            profile["checks"][name] = {
+                "wall_time": time.perf_counter() - start_wall,
+                "cpu_time": time.process_time() - start_cpu,
+                "peak_memory": peak_memory,
+            }
+    return profiled_function
+
+
+def start_memory_measurement():
+    """
+    Resets the peak memory of tracemalloc before a file is scanned, after folding it into the high-water mark of the
+    measurement window. The peak is shared by all threads, so it only belongs to the file if the files are scanned one
+    after another.
+
+    Returns:
+        int: Traced memory in bytes at the start, or None if tracemalloc is not tracing.
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    update_window_peak()
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def get_peak_memory(start_memory):
+    """
+    Returns the peak memory allocated since start_memory_measurement.
+
+    Args:
+        start_memory (int): Value returned by start_memory_measurement.
+
+    Returns:
+        int: Peak memory in bytes above the memory in use at the start, or None if tracemalloc is not tracing.
+    """
+    if start_memory is None or not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[1] - start_memory
+
+
+def add_file_profile(profile, file_path, file_stats):
+    """
+    Adds the measurements of one scanned file to the profile.
+
+    Args:
+        profile (dict): Profile created by create_profile.
+        file_path (str): Path to the file.
+        file_stats (dict): Measurements of scan_file with the keys "bytes", "wall_time", "cpu_time",
+            "read_time", "rule_times" and "peak_memory", or None if the file was served from the scan cache.
+    """
+    if file_stats is None:
+        profile["cached_files"] += 1
+        return
+
+    extension = os.path.splitext(file_path)[1]
+    extension_profile = profile["extensions"].setdefault(extension, {
+        "files": 0, "bytes": 0, "wall_time": 0.0, "cpu_time": 0.0, "read_time": 0.0, "regex_time": 0.0, "peak_memory": None,
+    })
+    extension_profile["files"] += 1
+    extension_profile["bytes"] += file_stats["bytes"]
+    extension_profile["wall_time"] += file_stats["wall_time"]
+    extension_profile["cpu_time"] += file_stats["cpu_time"]
+    extension_profile["read_time"] += file_stats["read_time"]
+    if file_stats["peak_memory"] is not None:
+        # The largest peak of a single file of the extension
+        extension_profile["peak_memory"] = max(extension_profile["peak_memory"] or 0, file_stats["peak_memory"])
+
+    for rule_name, rule_time in file_stats["rule_times"].items():
+        rule_profile = profile["rules"].setdefault(rule_name, {"files": 0, "regex_time": 0.0})
+        rule_profile["files"] += 1
+        rule_profile["regex_time"] += rule_time
+        extension_profile["regex_time"] += rule_time
+
+    # Keep only the slowest files in a min-heap
+    entry = (file_stats["wall_time"], file_path, file_stats["bytes"])
+    if len(profile["slowest_files"]) < profile["top_files"]:
+        heapq.heappush(profile["slowest_files"], entry)
+    else:
+        heapq.heappushpop(profile["slowest_files"], entry)
+
+
+def finish_profile(profile):
+    """
+    Completes the profile with the totals.
+
+    Args:
+        profile (dict): Profile created by create_profile.
+
+    Returns:
+        dict: The profile as JSON serializable dictionary.
+    """
+    peak_memory = max(profile["peak_memory"], update_window_peak()) if tracemalloc.is_tracing() else None
+    return {
+        "total": {
+            "wall_time": time.perf_counter() - profile["start_wall"],
+            "cpu_time": time.process_time() - profile["start_cpu"],
+            "peak_memory": peak_memory,
+        },
+        "checks": profile["checks"],
+        "extensions": profile["extensions"],
+        "rules": profile["rules"],
+        "cached_files": profile["cached_files"],
+        "slowest_files": [
+            {"file": file_path, "bytes": size, "wall_time": wall_time}
+            for wall_time, file_path, size in sorted(profile["slowest_files"], reverse=True)
+        ],
+    }
+
+
+def write_profile(profile_result, file_path):
+    """
+    Writes a completed profile to a JSON file.
+
+    Args:
+        profile_result (dict): Profile returned by finish_profile.
+        file_path (str): Path to the JSON file.
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(profile_result, f, indent=2)
+
+
+def format_profile_summary(profile_result):
+    """
+    Formats a completed profile as console summary.
+
+    Args:
+        profile_result (dict): Profile returned by finish_profile.
+
+    Returns:
+        list: Lines of the summary.
+    """
+    def format_memory(size):
+        return f"{size / (1024 * 1024):.1f} MB" if size is not None else "-"
+
+    total = profile_result["total"]
+    lines = [
+        f"Total: {total['wall_time']:.2f} s wall, {total['cpu_time']:.2f} s CPU, peak memory {format_memory(total['peak_memory'])}",
+        "",
+        f"{'Check':<20}{'Wall [s]':>10}{'CPU [s]':>10}{'Peak memory':>14}",
+    ]
+    for name, check in profile_result["checks"].items():
+        lines.append(f"{name:<20}{check['wall_time']:>10.3f}{check['cpu_time']:>10.3f}{format_memory(check['peak_memory']):>14}")
+
+    lines += ["", f"{'Extension':<12}{'Files':>8}{'MB read':>10}{'Wall [s]':>10}{'CPU [s]':>10}{'Regex [s]':>11}{'Peak memory':>14}"]
+    for extension, stats in sorted(profile_result["extensions"].items(), key=lambda item: -item[1]["wall_time"]):
+        lines.append(
+            f"{extension or '(none)':<12}{stats['files']:>8}{stats['bytes'] / (1024 * 1024):>10.2f}"
+            f"{stats['wall_time']:>10.3f}{stats['cpu_time']:>10.3f}{stats['regex_time']:>11.3f}{format_memory(stats['peak_memory']):>14}"
+        )
+
+    lines += ["", f"{'Rule':<30}{'Files':>8}{'Regex [s]':>11}"]
+    for rule_name, stats in sorted(profile_result["rules"].items(), key=lambda item: -item[1]["regex_time"]):
+        lines.append(f"{rule_name:<30}{stats['files']:>8}{stats['regex_time']:>11.3f}")
+
+    if profile_result["cached_files"]:
+        lines += ["", f"{profile_result['cached_files']} files were served from the scan cache and are not included."]
+
+    lines += ["", "Slowest files:"]
+    for entry in profile_result["slowest_files"]:
+        lines.append(f"- {entry['wall_time'] * 1000:8.1f} ms {entry['bytes'] / 1024:10.1f} KB  {entry['file']}")
+    return lines
@@ -0,0 +1,184 @@
+import os
+import bisect
+
+
+def build_project_index(project_path):
+    """
+    Traverses the project directory tree once with os.scandir and records its structure.
+    All checks query this index instead of walking the disk again. Names are sorted, so the traversal order
+    and every result derived from it are the same on every file system. The traversal is top-down like os.walk:
+    the files of a directory come before the content of its subdirectories. This is not the sorted order of the
+    full paths, e.g. Logical/Main.st comes before Logical/Libraries/Lib.lby.
+
+    Args:
+        project_path (str): Path to the project directory.
+
+    Returns:
+        dict: The index with the keys
+              - 'root': the project path
+              - 'directories': dir_path -> (sorted subdirectory names, sorted file names), in top-down traversal order
+              - 'files_by_extension': extension -> [file paths]
+              - 'stats': file_path -> (size, modification time in nanoseconds)
+    """
+    project_index = {
+        "root": project_path,
+        "directories": {},
+        "files_by_extension": {},
+        "stats": {},
+    }
+
+    stack = [project_path]
+    while stack:
+        dir_path = stack.pop()
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    try:
+                        if entry.is_dir():
+                            # Like os.walk, list linked directories but do not descend into them
+                            subdirs.append((entry.name, entry.is_symlink()))
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append(entry.name)
+                    project_index["files_by_extension"].setdefault(os.path.splitext(entry.name)[1], []).append(entry.path)
+                    project_index["stats"][entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            continue
+
+        project_index["directories"][dir_path] = ([name for name, _ in subdirs], files)
+        stack.extend(os.path.join(dir_path, name) for name, is_link in reversed(subdirs) if not is_link)
+
+    return project_index
+
+
+def iter_directories(project_index, root_dir):
+    """
+    Iterates over a directory and all its subdirectories from the index, in the same order as os.walk.
+
+    Args:
+        project_index (dict): Index created by build_project_index.
+        root_dir (str): The directory to start from, e.g. os.path.join(project_path, "Physical").
+
+    Yields:
+        tuple: (dir_path, subdirectory names, file names)
+    """
+    directories = project_index["directories"]
+    stack = [root_dir]
+    while stack:
+        dir_path = stack.pop()
+        if dir_path not in directories:
+            continue
+        subdirs, files = directories[dir_path]
+        yield dir_path, subdirs, files
+        stack.extend(os.path.join(dir_path, name) for name in reversed(subdirs))
+
+
+def _remove_path(project_index, path):
+    """
+    Removes a file, or a directory with all its content, from the index.
+    """
+    parent, name = os.path.split(path)
+    parent_entry = project_index["directories"].get(parent)
+
+    if path in project_index["directories"]:
+        prefix = os.path.join(path, "")
+        for dir_path in [dir_path for dir_path in project_index["directories"] if dir_path == path or dir_path.startswith(prefix)]:
+            _, files = project_index["directories"].pop(dir_path)
+            for file in files:
+                _remove_path(project_index, os.path.join(dir_path, file))
+        if parent_entry is not None and name in parent_entry[0]:
+            parent_entry[0].remove(name)
+        return
+
+    if project_index["stats"].pop(path, None) is not None:
+        extension_files = project_index["files_by_extension"].get(os.path.splitext(name)[1], [])
+        if path in extension_files:
+            extension_files.remove(path)
+    if parent_entry is not None and name in parent_entry[1]:
+        parent_entry[1].remove(name)
+
+
+def derive_project_index(project_index, added_paths, deleted_paths):
+    """
+    Derives the index of another version of the tree from the index, without traversing the disk, e.g. of the tree
+    at a previous revision: the added files are removed, together with the directories they leave empty, and the
+    deleted files are added back. The stats of files added back are unknown and recorded as (0, 0).
+
+    Args:
+        project_index (dict): Index created by build_project_index. Not modified.
+        added_paths (iterable): Paths of the files that do not exist in the other version.
+        deleted_paths (iterable): Paths of the files that only exist in the other version.
+
+    Returns:
+        dict: The index of the other version, see build_project_index.
+    """
+    derived_index = {
+        "root": project_index["root"],
+        "directories": {dir_path: (list(subdirs), list(files)) for dir_path, (subdirs, files) in project_index["directories"].items()},
+        "files_by_extension": {extension: list(files) for extension, files in project_index["files_by_extension"].items()},
+        "stats": dict(project_index["stats"]),
+    }
+    directories = derived_index["directories"]
+
+    for path in added_paths:
+        _remove_path(derived_index, path)
+        # Git does not track directories, so a directory left empty did not exist either
+        dir_path = os.path.dirname(path)
+        while dir_path != derived_index["root"] and directories.get(dir_path) == ([], []):
+            _remove_path(derived_index, dir_path)
+            dir_path = os.path.dirname(dir_path)
+
+    for path in sorted(deleted_paths):
+        if path in derived_index["stats"]:
+            continue
+        parent, name = os.path.split(path)
+        missing = []
+        while parent not in directories and parent.startswith(os.path.join(derived_index["root"], "")):
+            missing.append(parent)
+            parent = os.path.dirname(parent)
+        if parent not in directories:
+            continue  # Outside of the indexed tree
+        for dir_path in reversed(missing):
+            bisect.insort(directories[os.path.dirname(dir_path)][0], os.path.basename(dir_path))
+            directories[dir_path] = ([], [])
+        bisect.insort(directories[os.path.dirname(path)][1], name)
+        derived_index["files_by_extension"].setdefault(os.path.splitext(name)[1], []).append(path)
+        derived_index["stats"][path] = (0, 0)
+    return derived_index
+
+
+def update_project_index(project_index, changed_paths):
+    """
+    Updates the index for changed, created and deleted files and directories, without traversing the rest of the tree.
+
+    Args:
+        project_index (dict): Index created by build_project_index. Updated in place.
+        changed_paths (iterable): Paths of the changed files and directories, e.g. reported by wait_for_changes.
+    """
+    for path in sorted(changed_paths):
+        _remove_path(project_index, path)
+        parent, name = os.path.split(path)
+        parent_entry = project_index["directories"].get(parent)
+        if path != project_index["root"] and parent_entry is None:
+            continue  # Outside of the indexed tree, or inside a linked directory
+
+        if os.path.isdir(path):
+            subtree_index = build_project_index(path)
+            project_index["directories"].update(subtree_index["directories"])
+            project_index["stats"].update(subtree_index["stats"])
+            for extension, files in subtree_index["files_by_extension"].items():
+                project_index["files_by_extension"].setdefault(extension, []).extend(files)
+            if parent_entry is not None:
+                bisect.insort(parent_entry[0], name)
+        elif os.path.isfile(path):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            bisect.insort(parent_entry[1], name)
+            project_index["files_by_extension"].setdefault(os.path.splitext(name)[1], []).append(path)
+            project_index["stats"][path] = (stat.st_size, stat.st_mtime_ns)
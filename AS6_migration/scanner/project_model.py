@@ -0,0 +1,158 @@
+import os
+
+from .atomic_file import save_json_atomic
+from .atomic_file import load_json
+from .xml_elements import compile_element_matcher
+from .xml_elements import find_element_values
+
+
+# Files describing the content of a directory: packages, programs and libraries
+descriptor_extensions = (".pkg", ".prg", ".lby")
+
+# Entries of a descriptor: <Object> elements of packages, <File> elements of programs and libraries
+_object_matcher = compile_element_matcher("Object")
+_file_matcher = compile_element_matcher("File")
+
+
+def find_descriptor(project_index, directory):
+    """
+    Returns the file describing the content of a directory, e.g. Package.pkg, IEC.prg or the .lby file of a library.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        directory (str): Path to the directory.
+
+    Returns:
+        str: Path to the descriptor, or None if the directory has none.
+    """
+    _, files = project_index["directories"].get(directory, ([], []))
+    descriptors = sorted(name for name in files if name.lower().endswith(descriptor_extensions))
+    for name in descriptors:
+        if name.lower() == "package.pkg":
+            return os.path.join(directory, name)
+    return os.path.join(directory, descriptors[0]) if descriptors else None
+
+
+def _resolve_entry(project_index, project_path, directory, entry, name_maps):
+    """
+    Resolves an entry of a descriptor to a path in the project index.
+    Names are compared case-insensitively, like Automation Studio does on Windows. References starting with a
+    backslash, e.g. \\Logical\\Shared\\Common.st, are relative to the project directory.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        project_path (str): Path to the project directory.
+        directory (str): Directory of the descriptor.
+        entry (str): Object or file name as written in the descriptor.
+        name_maps (dict): Case-folded names per directory, filled on demand.
+
+    Returns:
+        str: Path of the entry. The path may not exist.
+    """
+    current = project_path if entry.startswith(("\\", "/")) else directory
+    for part in entry.replace("\\", "/").split("/"):
+        if part in ("", "."):
+            continue
+        if part == "..":
+            current = os.path.dirname(current)
+            continue
+
+        if current not in name_maps:
+            subdirs, files = project_index["directories"].get(current, ([], []))
+            name_maps[current] = {name.lower(): name for name in subdirs + files}
+        current = os.path.join(current, name_maps[current].get(part.lower(), part))
+    return current
+
+
+def build_project_model(project_index, root_descriptors):
+    """
+    Resolves the object tree of a project, starting from the given descriptors.
+    Each package, program and library descriptor lists its objects and files. Directories are followed
+    through their own descriptor, so files that are not part of the project are never visited.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        root_descriptors (list): Descriptors to start from, e.g. Logical/Package.pkg.
+
+    Returns:
+        set: Paths of all referenced files, including the descriptors.
+    """
+    project_path = project_index["root"]
+    referenced_files = set()
+    name_maps = {}
+    stack = list(root_descriptors)
+
+    while stack:
+        descriptor = stack.pop()
+        if descriptor in referenced_files or descriptor not in project_index["stats"]:
+            continue
+        referenced_files.add(descriptor)
+
+        try:
+            with open(descriptor, 'rb') as f:
+                content = f.read()
+        except OSError:
+            continue
+
+        directory = os.path.dirname(descriptor)
+        for entry in find_element_values(_object_matcher, content) + find_element_values(_file_matcher, content):
+            path = _resolve_entry(project_index, project_path, directory, entry, name_maps)
+            if path in project_index["directories"]:
+                child_descriptor = find_descriptor(project_index, path)
+                if child_descriptor:
+                    stack.append(child_descriptor)
+            else:
+                referenced_files.add(path)
+
+    return referenced_files
+
+
+def get_descriptor_stats(project_index, root_dir):
+    """
+    Returns size and modification time of every descriptor below a directory.
+    The project model only changes if one of them changes, is added or is removed.
+
+    Args:
+        project_index (dict): Index of the project directory tree, see build_project_index.
+        root_dir (str): The directory to check, e.g. the Logical directory.
+
+    Returns:
+        dict: Descriptor path -> [size, modification time in nanoseconds].
+    """
+    prefix = os.path.join(root_dir, "")
+    return {
+        path: list(project_index["stats"][path])
+        for extension in descriptor_extensions
+        for path in project_index["files_by_extension"].get(extension, [])
+        if path.startswith(prefix)
+    }
+
+
+def load_project_model(model_path, descriptor_stats):
+    """
+    Loads the project model of a previous run.
+
+    Args:
+        model_path (str): Path to the model file.
+        descriptor_stats (dict): Current descriptor stats, see get_descriptor_stats.
+
+    Returns:
+        set: Paths of all referenced files, or None if the file does not exist, cannot be read or
+             any descriptor has changed since.
+    """
+    model = load_json(model_path)
+    if model is None or model.get("descriptors") != descriptor_stats:
+        return None
+    return set(model.get("files", []))
+
+
+def save_project_model(model_path, descriptor_stats, referenced_files):
+    """
+    Saves the project model, see save_json_atomic.
+
+    Args:
+        model_path (str): Path to the model file.
+        descriptor_stats (dict): Descriptor stats the model was built from, see get_descriptor_stats.
+        referenced_files (set): Paths of all referenced files.
+    """
+    save_json_atomic(model_path, {"descriptors": descriptor_stats, "files": sorted(referenced_files)})
@@ -0,0 +1,121 @@
+import os
+import json
+import pickle
+import threading
+
+from .atomic_file import write_file_atomic
+
+# Version of the compiled rule pack layout, increase when the format of the stored sections changes
+rule_pack_format_version = 1
+
+
+def create_rule_pack(sections, source_dir, cache_dir, code_files=()):
+    """
+    Creates a lazily loaded rule pack. Nothing is read until a section is requested.
+
+    Args:
+        sections (dict): Sections in the format name -> ([discontinuation list names], builder).
+            The builder is called with the parsed lists and returns the prebuilt lookup structure.
+        source_dir (str): Directory of the discontinuation lists (<name>.json).
+        cache_dir (str): Directory for the compiled sections.
+        code_files (iterable): Source files of the builders. A change in any of them rebuilds all sections.
+
+    Returns:
+        dict: The rule pack, used with get_rule_section.
+    """
+    return {
+        "sections": sections,
+        "source_dir": str(source_dir),
+        "cache_dir": str(cache_dir),
+        "code_files": [str(code_file) for code_file in code_files],
+        "loaded": {},
+        "lock": threading.Lock(),
+    }
+
+
+def _file_stamp(file_path):
+    """
+    Returns a cheap change marker of a file, without reading it.
+    """
+    stat = os.stat(file_path)
+    return (os.path.basename(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def _section_stamp(rule_pack, source_names):
+    """
+    Returns the version stamp of a section: the format version and the markers of its sources and of the builder code.
+    """
+    source_paths = [os.path.join(rule_pack["source_dir"], f"{name}.json") for name in source_names]
+    return (
+        rule_pack_format_version,
+        [_file_stamp(file_path) for file_path in source_paths + rule_pack["code_files"]],
+    )
+
+
+def _load_compiled_section(cache_path, stamp):
+    """
+    Loads a compiled section, if it exists and was built from the current sources.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            compiled_stamp, value = pickle.load(f)
+    except Exception:
+        return None, False
+
+    if compiled_stamp != stamp:
+        return None, False
+    return value, True
+
+
+def _save_compiled_section(cache_path, stamp, value):
+    """
+    Saves a compiled section. Failures are ignored, e.g. if the script is installed in a read-only location.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        write_file_atomic(cache_path, lambda f: pickle.dump((stamp, value), f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except OSError:
+        pass
+
+
+def get_rule_section(rule_pack, name):
+    """
+    Returns a section of the rule pack, loading it on first use.
+    The compiled section is read from the cache directory and only rebuilt from the JSON lists when they changed.
+
+    Args:
+        rule_pack (dict): Rule pack created by create_rule_pack.
+        name (str): Name of the section.
+
+    Returns:
+        The prebuilt lookup structure of the section.
+
+    Raises:
+        RuntimeError: If a discontinuation list cannot be read.
+    """
+    loaded = rule_pack["loaded"]
+    if name in loaded:
+        return loaded[name]
+
+    with rule_pack["lock"]:
+        if name in loaded:
+            return loaded[name]
+
+        source_names, builder = rule_pack["sections"][name]
+        try:
+            stamp = _section_stamp(rule_pack, source_names)
+            cache_path = os.path.join(rule_pack["cache_dir"], f"{name}.pickle")
+
+            value, found = _load_compiled_section(cache_path, stamp)
+            if not found:
+                sources = []
+                for source_name in source_names:
+                    with open(os.path.join(rule_pack["source_dir"], f"{source_name}.json"), "r") as json_file:
+                        sources.append(json.load(json_file))
+                value = builder(*sources)
+                _save_compiled_section(cache_path, stamp, value)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"error reading discontinuation lists: {e}")
+
+        loaded[name] = value
+        return value
@@ -0,0 +1,147 @@
+import os
+import hashlib
+
+from .atomic_file import save_json_atomic
+from .atomic_file import load_json
+
+# Version of the cache file layout, increase when the format of the stored entries changes
+cache_format_version = 3
+
+
+def compute_fingerprint(file_paths):
+    """
+    Computes a fingerprint over the files that define the scan rules.
+    A cache created with other discontinuation lists or other rule code is never reused.
+
+    Args:
+        file_paths (list): Paths of the discontinuation lists and rule sources.
+
+    Returns:
+        str: Hex digest of the file names and contents.
+    """
+    sha = hashlib.sha256(str(cache_format_version).encode())
+    for file_path in sorted(file_paths):
+        sha.update(os.path.basename(file_path).encode())
+        with open(file_path, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def hash_content(data):
+    """
+    Hashes the raw content of a file.
+
+    Args:
+        data (bytes): The file content.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def _restore_entry(stored_entry, empty_results):
+    """
+    Converts a stored entry [size, mtime, hash, [rule names], {results}, {locations}] back to a cache entry.
+    Only rules with findings are stored, their findings are converted back to tuples, as returned by the process functions.
+    Entries without findings share one results dictionary per set of rules from empty_results, it is never modified.
+    """
+    size, mtime, content_hash, rule_names, stored_results, stored_locations = stored_entry
+    if not stored_results:
+        results = empty_results.get(tuple(rule_names))
+        if results is None:
+            results = empty_results[tuple(rule_names)] = dict.fromkeys(rule_names, ())
+        return {"size": size, "mtime": mtime, "hash": content_hash, "results": results, "locations": results}
+
+    results = dict.fromkeys(rule_names, ())
+    locations = dict.fromkeys(rule_names, ())
+    for name, items in stored_results.items():
+        results[name] = [tuple(item) if isinstance(item, list) else item for item in items]
+        locations[name] = stored_locations[name]
+    return {"size": size, "mtime": mtime, "hash": content_hash, "results": results, "locations": locations}
+
+
+def _store_entry(entry):
+    """
+    Converts a cache entry to the compact stored form, see _restore_entry.
+    """
+    results = entry["results"]
+    return [
+        entry["size"], entry["mtime"], entry["hash"], list(results),
+        {name: items for name, items in results.items() if items},
+        {name: locations for name, locations in entry["locations"].items() if results[name]},
+    ]
+
+
+def load_scan_cache(cache_path, fingerprint):
+    """
+    Loads the per-file results of a previous scan.
+
+    Args:
+        cache_path (str): Path to the cache file.
+        fingerprint (str): Fingerprint of the current scan rules.
+
+    Returns:
+        dict: Cache entries in the format file_path -> {"size", "mtime", "hash", "results", "locations"}.
+              Rules without findings share an empty tuple. Empty if the cache does not exist, cannot be read
+              or was created with other rules.
+    """
+    cache = load_json(cache_path)
+    if cache is None or cache.get("fingerprint") != fingerprint:
+        return {}
+    empty_results = {}
+    return {
+        file_path: _restore_entry(stored_entry, empty_results) for file_path, stored_entry in cache.get("files", {}).items()
+    }
+
+
+def save_scan_cache(cache_path, fingerprint, entries):
+    """
+    Saves the per-file results of a scan, see save_json_atomic.
+
+    Args:
+        cache_path (str): Path to the cache file.
+        fingerprint (str): Fingerprint of the current scan rules.
+        entries (dict): Cache entries in the format file_path -> {"size", "mtime", "hash", "results", "locations"}.
+    """
+    save_json_atomic(
+        cache_path, {"fingerprint": fingerprint, "files": {file_path: _store_entry(entry) for file_path, entry in entries.items()}}
+    )
+
+
+def has_cache_changed(previous_entries, entries):
+    """
+    Checks if a scan replaced, added or dropped any cache entry, so the cache file only has to be written then.
+    Entries served unchanged are the same objects as before the scan, so they are compared by identity.
+
+    Args:
+        previous_entries (dict): Copy of the entries before the scan.
+        entries (dict): Entries after the scan.
+
+    Returns:
+        bool: True if any entry is not the same object as before.
+    """
+    return len(previous_entries) != len(entries) or any(
+        previous_entries.get(file_path) is not entry for file_path, entry in entries.items()
+    )
+
+
+def is_entry_current(entry, size, mtime, rule_names):
+    """
+    Checks if a cache entry can be used without reading the file.
+
+    Args:
+        entry (dict): Cache entry of the file, or None.
+        size (int): Current file size.
+        mtime (int): Current modification time in nanoseconds.
+        rule_names (list): Names of the scan rules that apply to the file.
+
+    Returns:
+        bool: True if size and modification time are unchanged and results exist for all rules.
+    """
+    return (
+        entry is not None
+        and entry["size"] == size
+        and entry["mtime"] == mtime
+        and all(name in entry["results"] for name in rule_names)
+    )
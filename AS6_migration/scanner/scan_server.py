@@ -0,0 +1,199 @@
+import os
+import hmac
+import json
+import socket
+import inspect
+import secrets
+import socketserver
+
+# Port of the scan server on localhost, if none is provided
+default_server_port = 8743
+
+# First words of an HTTP request. A browser can send a cross-origin POST to localhost, such connections are closed.
+_http_methods = {b"GET", b"HEAD", b"POST", b"PUT", b"DELETE", b"CONNECT", b"OPTIONS", b"TRACE", b"PATCH"}
+
+
+class _ScanRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serves JSON-RPC 2.0 requests, one JSON object per line. A connection may send any number of requests.
+    Every request carries the token of the server, see create_scan_server.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            if line.split(None, 1)[0].upper() in _http_methods:
+                return
+            self.wfile.write(json.dumps(self.handle_request(line)).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    def handle_request(self, line):
+        """
+        Calls the handler of a request and returns the response.
+        """
+        response = {"jsonrpc": "2.0", "id": None}
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response["error"] = {"code": -32700, "message": f"Parse error: {e}"}
+            return response
+
+        if not isinstance(request, dict):
+            response["error"] = {"code": -32600, "message": "Invalid Request: the request must be a JSON object"}
+            return response
+        response["id"] = request.get("id")
+        token = request.get("token")
+        if not isinstance(token, str) or not hmac.compare_digest(token, self.server.token):
+            response["error"] = {"code": -32001, "message": "Unauthorized: the request must carry the token of the server"}
+            return response
+        params = request.get("params", {})
+        if not isinstance(params, dict):
+            response["error"] = {"code": -32600, "message": "Invalid Request: the params must be a JSON object"}
+            return response
+
+        handler = self.server.handlers.get(request.get("method"))
+        if handler is None:
+            response["error"] = {"code": -32601, "message": f"Method not found: {request.get('method')}"}
+            return response
+        handler, param_types = handler
+        error = _check_params(handler, param_types, params)
+        if error:
+            response["error"] = {"code": -32602, "message": f"Invalid params: {error}"}
+            return response
+        try:
+            response["result"] = handler(**params)
+        except Exception as e:
+            response["error"] = {"code": -32000, "message": str(e)}
+        return response
+
+
+def _check_params(handler, param_types, params):
+    """
+    Checks the params of a request against the signature of the handler and the expected types.
+
+    Args:
+        handler (callable): The handler of the method.
+        param_types (dict): Expected type per param in the format name -> (type, item type). The item type
+            is the type of every element of a list, None for other params.
+        params (dict): Params of the request.
+
+    Returns:
+        str: Description of the first problem, or None if the params are valid.
+    """
+    try:
+        inspect.signature(handler).bind(**params)
+    except TypeError as e:
+        return str(e)
+    for name, value in params.items():
+        value_type, item_type = param_types[name]
+        if not isinstance(value, value_type):
+            return f"'{name}' must be of type {value_type.__name__}"
+        if item_type is not None and not all(isinstance(item, item_type) for item in value):
+            return f"the items of '{name}' must be of type {item_type.__name__}"
+    return None
+
+
+class _ScanServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    # Token file written by create_scan_server, None until the server is bound. A server that fails to bind
+    # must not remove the token file of the server already running on the port.
+    token_path = None
+
+    def server_close(self):
+        super().server_close()
+        if self.token_path is not None:
+            try:
+                os.remove(self.token_path)
+            except OSError:
+                pass
+
+
+def get_token_path(port):
+    """
+    Returns the path of the token file of the scan server on a port, in the home directory of the user.
+
+    Args:
+        port (int): TCP port on localhost.
+
+    Returns:
+        str: Path to the token file.
+    """
+    return os.path.join(os.path.expanduser("~"), f".AS6_migration_server_{port}.token")
+
+
+def _write_token(token_path, token):
+    """
+    Writes the token to a new file that only the current user can read.
+    """
+    try:
+        os.remove(token_path)
+    except FileNotFoundError:
+        pass
+    file_descriptor = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def create_scan_server(handlers, port=default_server_port):
+    """
+    Creates a JSON-RPC server on localhost. Each connection is served in its own thread,
+    so the handlers must protect shared state themselves.
+    Any local process can connect, so a random token is generated for the session and written to a file only the
+    current user can read, see get_token_path. Requests without the token are rejected, and the file is removed when
+    the server is closed.
+
+    Args:
+        handlers (dict): Methods in the format name -> (function, param types). The function is called with the params
+            of the request as keyword arguments and returns a JSON serializable result. Requests with missing,
+            unknown or mistyped params are answered with an error, see _check_params.
+        port (int): TCP port on localhost.
+
+    Returns:
+        socketserver.TCPServer: The server, started with serve_forever().
+    """
+    server = _ScanServer(("127.0.0.1", port), _ScanRequestHandler)
+    server.handlers = handlers
+    server.token = secrets.token_hex(32)
+    try:
+        _write_token(get_token_path(port), server.token)
+    except OSError:
+        server.server_close()
+        raise
+    server.token_path = get_token_path(port)
+    return server
+
+
+def call_scan_server(method, params, port=default_server_port, timeout=None):
+    """
+    Sends a request to a running scan server and waits for the response. The token of the server is read from its token file.
+
+    Args:
+        method (str): Name of the method.
+        params (dict): Parameters of the method.
+        port (int): TCP port of the server on localhost.
+        timeout (float): Maximum time in seconds to wait for the response, None to wait until it arrives.
+
+    Returns:
+        The result of the method.
+
+    Raises:
+        OSError: If no server is running on the port or its token file cannot be read.
+        RuntimeError: If the server reports an error.
+    """
+    with open(get_token_path(port), "r", encoding="utf-8") as f:
+        token = f.read().strip()
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params, "token": token}
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as connection:
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as stream:
+            line = stream.readline()
+
+    if not line:
+        raise ConnectionError("The scan server closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"]["message"])
+    return response["result"]
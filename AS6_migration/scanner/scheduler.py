@@ -0,0 +1,42 @@
+import concurrent.futures
+
+
+def run_scheduled_checks(checks, inputs, max_workers=None):
+    """
+    Runs checks concurrently, each as soon as all of its inputs are available.
+    Every input is computed only once, however many checks use it.
+
+    Args:
+        checks (dict): Checks in the format name -> ([input names], function). The function is called with
+            the values of its inputs as positional arguments. Inputs are names of other checks or of the given inputs.
+        inputs (dict): Values that are available from the start, e.g. the project path.
+            Checks whose result is already given here are not run again.
+        max_workers (int): Maximum number of checks running at the same time.
+
+    Returns:
+        dict: Result per check name, in the order of the checks, independent of the completion order.
+
+    Raises:
+        ValueError: If the inputs of a check can never be satisfied.
+    """
+    values = dict(inputs)
+    pending = {name: check for name, check in checks.items() if name not in values}
+    running = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Start every check whose inputs are complete
+            for name, (input_names, function) in list(pending.items()):
+                if all(input_name in values for input_name in input_names):
+                    future = executor.submit(function, *[values[input_name] for input_name in input_names])
+                    running[future] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Unresolved inputs of checks: {', '.join(sorted(pending))}")
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                values[running.pop(future)] = future.result()
+
+    return {name: values[name] for name in checks}
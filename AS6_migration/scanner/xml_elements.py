@@ -0,0 +1,68 @@
+import re
+
+
+# XML comments, matched as an alternative of every element so commented out elements are skipped
+_comment_pattern = rb'<!--.*?-->'
+
+
+def compile_element_matcher(element, attribute=None):
+    """
+    Compiles a matcher that pulls the text or one attribute of an XML element from raw content.
+    Only the given element is matched, so text in other elements, e.g. descriptions, is never reported.
+    XML comments are matched as a whole without a value, so elements inside them are never reported.
+
+    Args:
+        element (str): Name of the element, e.g. "Module".
+        attribute (str): Name of the attribute to extract, e.g. "Type". If None, the text of the element is extracted.
+
+    Returns:
+        re.Pattern: Compiled bytes matcher. Group 1 holds the value, None for a comment.
+    """
+    name = re.escape(element.encode("utf-8"))
+    if attribute is None:
+        return re.compile(_comment_pattern + rb'|<' + name + rb'\b[^>]*>([^<]*)</' + name + rb'\s*>', re.DOTALL)
+    # Attributes may be separated by any whitespace, e.g. a line break when an editor wrapped the element
+    return re.compile(
+        _comment_pattern + rb'|<' + name + rb'\b[^>]*\s' + re.escape(attribute.encode("utf-8")) + rb'="([^"]*)"', re.DOTALL
+    )
+
+
+def find_element_values(matcher, content):
+    """
+    Scans the content once and returns the value of every matching element, in document order.
+    The content is neither parsed into a tree nor copied, so the memory use does not depend on the size of the file.
+
+    Args:
+        matcher (re.Pattern): Matcher created by compile_element_matcher.
+        content (bytes): Raw XML content, or a memory map of the file.
+
+    Returns:
+        list: Values of the elements, decoded and stripped of surrounding whitespace.
+    """
+    return [
+        match.group(1).strip().decode("utf-8", errors="ignore")
+        for match in matcher.finditer(content)
+        if match.group(1) is not None
+    ]
+
+
+def find_element_spans(matcher, content):
+    """
+    Scans the content once like find_element_values and also returns where each value is in the content.
+
+    Args:
+        matcher (re.Pattern): Matcher created by compile_element_matcher.
+        content (bytes): Raw XML content, or a memory map of the file.
+
+    Returns:
+        list: Values in the format (value, (start, end)), with the byte offsets of the value without surrounding whitespace.
+    """
+    spans = []
+    for match in matcher.finditer(content):
+        raw_value = match.group(1)
+        if raw_value is None:
+            continue
+        value = raw_value.strip()
+        start = match.start(1) + len(raw_value) - len(raw_value.lstrip())
+        spans.append((value.decode("utf-8", errors="ignore"), (start, start + len(value))))
+    return spans
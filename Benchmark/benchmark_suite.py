@@ -0,0 +1,462 @@
+import os
+import re
+import sys
+import json
+import builtins
+import time
+import tempfile
+import platform
+import subprocess
+import tracemalloc
+
+from collections import Counter
+from pathlib import Path
+
+from project_generator import generate_project
+
+# Make the AS6 migration script importable
+script_directory = Path(__file__).resolve().parent
+repository_directory = script_directory.parent
+sys.path.insert(0, str(repository_directory / "AS6_migration"))
+
+import AS6_migration
+
+# Rewriters in the format name -> (script, {expected key: label of the "Total ... replaced" summary line})
+rewriters = {
+    "AsStringToAsBrStr": (repository_directory / "AsStringToAsBrStr" / "AsStringToAsBrStr.py", {"functions": "functions"}),
+    "AsMathToAsBrMath": (repository_directory / "AsMathToAsBrMath" / "AsMathToAsBrMath.py", {"functions": "functions"}),
+    "AsOpcUacRename": (
+        repository_directory / "AsOpcUacRename" / "AsOpcUacRename.py",
+        {"function blocks": "function blocks", "types": "types", "enumerators": "emunaretors"},
+    ),
+}
+
+default_sizes = [1000, 10000, 100000]
+
+# Number of program source files of the project committed to git by validate_differential_scan
+differential_scan_files = 200
+
+# Obsolete function written to a new file by validate_server_index
+obsolete_function = "PV_xgetval"
+
+# Timings below this difference in seconds are never reported as regression, they are within the noise
+minimum_regression_time = 0.05
+
+
+def get_option_value(option, default=None):
+    """
+    Returns the value following an option on the command line.
+
+    Args:
+        option (str): Name of the option, e.g. "--sizes".
+        default: Value returned if the option is not provided.
+
+    Returns:
+        str: The value of the option, or the default.
+    """
+    if option in sys.argv:
+        index = sys.argv.index(option)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+        print(f"Error: {option} requires a value.")
+        sys.exit(1)
+    return default
+
+
+def finding_key(rule_name, finding):
+    """
+    Reduces a finding of a scan rule to the file and the reported name, as recorded by generate_project.
+
+    Args:
+        rule_name (str): Name of the scan rule.
+        finding: The finding as returned by the process function of the rule.
+
+    Returns:
+        tuple: Key in the format (file_path, detail).
+    """
+    if rule_name in ("deprecated_string_functions", "deprecated_math_functions"):
+        return (finding, None)
+    if rule_name == "compatibility":
+        return (finding[0], finding[1])
+    if rule_name == "lby_dependencies":
+        return (finding[3], finding[1])
+    return (finding[-1], finding[0])
+
+
+def validate_findings(results, expected, project_path):
+    """
+    Compares the results of the AS6 checks with the findings seeded by the generator.
+
+    Args:
+        results (dict): Results per check, see run_checks.
+        expected (dict): Expected findings per scan rule, see generate_project.
+        project_path (str): Path to the project directory.
+
+    Returns:
+        list: Description of every difference, empty if the findings are correct.
+    """
+    errors = []
+    for rule_name, expected_findings in expected.items():
+        actual_findings = Counter(finding_key(rule_name, finding) for finding in results[rule_name])
+        missing = expected_findings - actual_findings
+        unexpected = actual_findings - expected_findings
+        for (file_path, detail), count in missing.items():
+            errors.append(f"{rule_name}: missing {detail or ''} in {os.path.relpath(file_path, project_path)} ({count}x)")
+        for (file_path, detail), count in unexpected.items():
+            errors.append(f"{rule_name}: unexpected {detail or ''} in {os.path.relpath(file_path, project_path)} ({count}x)")
+    return errors
+
+
+def validate_locations(expected_locations, project_path):
+    """
+    Scans the files with seeded locations again and compares the line and column of their findings.
+
+    Args:
+        expected_locations (dict): Expected locations per scan rule, see generate_project.
+        project_path (str): Path to the project directory.
+
+    Returns:
+        list: Description of every wrong location, empty if the locations are correct.
+    """
+    errors = []
+    for rule_name, locations in expected_locations.items():
+        files = {}
+        for (file_path, detail), location in locations.items():
+            files.setdefault(file_path, {})[detail] = location
+
+        for file_path, expected_details in files.items():
+            record = AS6_migration.scan_file(file_path, [rule_name], AS6_migration.scan_rules)
+            actual_details = {}
+            for finding, location in zip(record["results"][rule_name], record["locations"][rule_name]):
+                actual_details.setdefault(finding_key(rule_name, finding)[1], tuple(location))
+            for detail, location in expected_details.items():
+                if actual_details.get(detail) != location:
+                    errors.append(
+                        f"{rule_name}: {detail} in {os.path.relpath(file_path, project_path)} "
+                        f"located at {actual_details.get(detail)}, expected {location}"
+                    )
+    return errors
+
+
+def run_as6_checks(project_path, jobs):
+    """
+    Runs all AS6 migration checks on a project, timing each check.
+
+    Args:
+        project_path (str): Path to the project directory.
+        jobs (int): Number of worker processes for the file scan, None for the thread pool.
+
+    Returns:
+        tuple: (results per check, timings in seconds per check including "total").
+    """
+    profile = AS6_migration.create_profile()
+    results = AS6_migration.run_checks(project_path, jobs, use_cache=False, profile=profile)
+    profile_result = AS6_migration.finish_profile(profile)
+
+    timings = {"total": profile_result["total"]["wall_time"]}
+    for name, check in profile_result["checks"].items():
+        timings[name] = check["wall_time"]
+    return results, timings
+
+
+def validate_profile_memory(project_path):
+    """
+    Profiles the AS6 checks with tracemalloc and checks that the reported peak memory covers the peaks measured inside
+    the checks, which reset the peak of tracemalloc for every check and every scanned file.
+
+    Args:
+        project_path (str): Path to the project directory.
+
+    Returns:
+        list: Description of every inconsistent peak, empty if the peaks are consistent.
+    """
+    tracemalloc.start()
+    try:
+        profile = AS6_migration.create_profile()
+        AS6_migration.run_checks(project_path, None, use_cache=False, profile=profile)
+        profile_result = AS6_migration.finish_profile(profile)
+    finally:
+        tracemalloc.stop()
+
+    errors = []
+    total_peak = profile_result["total"]["peak_memory"]
+    for name, check in profile_result["checks"].items():
+        if check["peak_memory"] > total_peak:
+            errors.append(f"profile: peak memory of {name} ({check['peak_memory']} bytes) above the total ({total_peak} bytes)")
+    scan_peak = profile_result["checks"]["file_scan"]["peak_memory"]
+    for extension, stats in profile_result["extensions"].items():
+        if stats["peak_memory"] > scan_peak:
+            errors.append(f"profile: peak memory of {extension} files ({stats['peak_memory']} bytes) above file_scan ({scan_peak} bytes)")
+    return errors
+
+
+def validate_server_index(project_path):
+    """
+    Sends two scan_project requests to the scan server methods, with a new file in between, and checks that the
+    second request finds the new file without listing any directory except the one that changed.
+
+    Args:
+        project_path (str): Path to the project directory.
+
+    Returns:
+        list: Description of every problem, empty if the project index was kept and refreshed.
+    """
+    errors = []
+    program_dir = os.path.join(project_path, "Logical", "Programs", "Group0", "Task0")
+    new_file = os.path.join(program_dir, "ServerCheck.st")
+    listings = []
+    scandir, listdir = os.scandir, os.listdir
+
+    def count_scandir(path="."):
+        listings.append(path)
+        return scandir(path)
+
+    def count_listdir(path="."):
+        listings.append(path)
+        return listdir(path)
+
+    try:
+        AS6_migration.serve_scan_project(project_path)
+        with open(new_file, "w", encoding="utf-8") as f:
+            f.write(f"PROGRAM _CYCLIC\n    status := {obsolete_function}(1);\nEND_PROGRAM\n")
+        os.scandir, os.listdir = count_scandir, count_listdir
+        try:
+            response = AS6_migration.serve_scan_project(project_path)
+        finally:
+            os.scandir, os.listdir = scandir, listdir
+
+        unexpected_listings = sorted({os.path.relpath(str(path), project_path) for path in listings if str(path) != program_dir})
+        if unexpected_listings:
+            errors.append(f"scan server: second request listed {', '.join(unexpected_listings)}")
+        if not any(finding["file"] == new_file for finding in response["findings"]):
+            errors.append("scan server: second request did not report the new file")
+    finally:
+        if os.path.exists(new_file):
+            os.remove(new_file)
+        state = AS6_migration.served_projects.pop(os.path.abspath(project_path), None)
+        if state is not None and state["watcher"] is not None:
+            AS6_migration.close_watcher(state["watcher"])
+    return errors
+
+
+def validate_differential_scan():
+    """
+    Commits a small generated project to git, then adds a header including an obsolete library and includes it
+    from a source file, and runs the differential scan against the commit. The new transitive include must be
+    reported, and no file except the two changed ones may be opened.
+
+    Returns:
+        list: Description of every problem, empty if the differential scan is correct.
+    """
+    with tempfile.TemporaryDirectory() as project_path:
+        generate_project(project_path, differential_scan_files, 50)
+        try:
+            for args in (["init", "-q"], ["add", "-A"], ["-c", "user.name=Benchmark", "-c", "user.email=benchmark@localhost", "commit", "-q", "-m", "Base"]):
+                subprocess.run(["git", "-C", project_path, *args], check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError):
+            print("git is not available, the differential scan is not validated.")
+            return []
+
+        # The full scan creates the caches of the include and library graphs, which the differential scan starts from
+        AS6_migration.run_checks(project_path, None)
+        program_dir = os.path.join(project_path, "Logical", "Programs", "Group0", "Task0")
+        header_path = os.path.join(program_dir, "Legacy.h")
+        source_path = os.path.join(program_dir, "Helper.c")
+        with open(header_path, "w", encoding="utf-8") as f:
+            f.write("#include <AsTPU.h>\n")
+        with open(source_path, "a", encoding="utf-8") as f:
+            f.write('#include "Legacy.h"\n')
+
+        opened_files = []
+        builtin_open = builtins.open
+
+        def recording_open(file, *args, **kwargs):
+            opened_files.append(file)
+            return builtin_open(file, *args, **kwargs)
+
+        builtins.open = recording_open
+        try:
+            introduced, removed, _ = AS6_migration.scan_changes_since(project_path, AS6_migration.scan_rules, "HEAD")
+        finally:
+            builtins.open = builtin_open
+
+        errors = []
+        # The cache files of the script and of its rule pack are expected to be read
+        unexpected_files = sorted({
+            str(file) for file in opened_files
+            if str(file) not in (header_path, source_path)
+            and not os.path.basename(str(file)).startswith("AS6_migration")
+            and not str(file).startswith(str(repository_directory))
+        })
+        if unexpected_files:
+            errors.append(f"differential scan: {len(unexpected_files)} unchanged files opened, e.g. {unexpected_files[0]}")
+        if not any(source_path in finding for finding in introduced.get("transitive_includes", [])):
+            errors.append("differential scan: the transitive include of Legacy.h was not reported")
+        if any(removed.values()):
+            errors.append(f"differential scan: unexpected removed findings {removed}")
+    return errors
+
+
+def run_rewriter(script, project_path):
+    """
+    Runs a rewriter script on a project, answering its confirmation prompts with yes.
+
+    Args:
+        script (Path): Path to the rewriter script.
+        project_path (str): Path to the project directory.
+
+    Returns:
+        tuple: (elapsed time in seconds, replacements per label of the summary).
+    """
+    start_time = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, str(script), project_path], input="y\ny\n", capture_output=True, text=True, encoding="utf-8"
+    )
+    elapsed = time.perf_counter() - start_time
+    if process.returncode != 0:
+        raise RuntimeError(f"{script.name} failed: {process.stderr.strip() or process.stdout.strip()}")
+
+    replacements = {label: int(count) for label, count in re.findall(r'Total (.+?) replaced: (\d+)', process.stdout)}
+    return elapsed, replacements
+
+
+def benchmark_size(file_count, hardware_modules, jobs):
+    """
+    Generates a project of the given size and measures the AS6 checks and the rewriters on it.
+
+    Args:
+        file_count (int): Number of program source files.
+        hardware_modules (int): Number of modules per Hardware.hw file.
+        jobs (int): Number of worker processes for the file scan, None for the thread pool.
+
+    Returns:
+        dict: Measurements in the format {"files", "timings", "findings", "errors"}.
+    """
+    with tempfile.TemporaryDirectory() as project_path:
+        print(f"\nGenerating synthetic project with {file_count} files...")
+        start_time = time.perf_counter()
+        expected = generate_project(project_path, file_count, hardware_modules)
+        timings = {"generate": time.perf_counter() - start_time}
+
+        print("Running AS6 migration checks...")
+        results, check_timings = run_as6_checks(project_path, jobs)
+        timings.update({f"AS6_migration:{name}": elapsed for name, elapsed in check_timings.items()})
+        errors = validate_findings(results, expected["findings"], project_path)
+        errors += validate_locations(expected["locations"], project_path)
+        findings = {name: len(results[name]) for name in AS6_migration.scan_rules}
+
+        print("Validating the profile...")
+        errors += validate_profile_memory(project_path)
+        print("Validating the scan server...")
+        errors += validate_server_index(project_path)
+
+        # The rewriters change the files, so they run after the checks. They replace disjoint symbols.
+        for name, (script, labels) in rewriters.items():
+            print(f"Running {name}...")
+            elapsed, replacements = run_rewriter(script, project_path)
+            timings[name] = elapsed
+            for key, label in labels.items():
+                expected_count = expected["rewriters"][name][key]
+                actual_count = replacements.get(label)
+                findings[f"{name}:{key}"] = actual_count
+                if actual_count != expected_count:
+                    errors.append(f"{name}: {actual_count} {key} replaced, expected {expected_count}")
+
+    return {"files": expected["files"], "timings": timings, "findings": findings, "errors": errors}
+
+
+def compare_with_baseline(measurements, baseline, tolerance):
+    """
+    Compares the measurements with a previous run.
+
+    Args:
+        measurements (dict): Measurements per size, see benchmark_size.
+        baseline (dict): Measurements per size of the previous run.
+        tolerance (float): Allowed relative slowdown, e.g. 0.25 for 25 %.
+
+    Returns:
+        list: Description of every regression, empty if there is none.
+    """
+    regressions = []
+    for size, current in measurements.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+
+        for name, elapsed in current["timings"].items():
+            previous_elapsed = previous["timings"].get(name)
+            if name == "generate" or previous_elapsed is None:
+                continue
+            if elapsed > previous_elapsed * (1 + tolerance) and elapsed - previous_elapsed > minimum_regression_time:
+                regressions.append(f"{size} files, {name}: {elapsed:.2f} s, previously {previous_elapsed:.2f} s (+{elapsed / previous_elapsed - 1:.0%})")
+
+        for name, count in current["findings"].items():
+            previous_count = previous["findings"].get(name)
+            if previous_count is not None and count != previous_count:
+                regressions.append(f"{size} files, {name}: {count} findings, previously {previous_count}")
+    return regressions
+
+
+def main():
+    """
+    Runs the benchmark suite for each project size, validates the findings and compares the timings with the previous run.
+    """
+    sizes = [int(size) for size in get_option_value("--sizes", ",".join(map(str, default_sizes))).split(",")]
+    hardware_modules = int(get_option_value("--hardware-modules", "2000"))
+    jobs = int(get_option_value("--jobs")) if get_option_value("--jobs") else None
+    tolerance = float(get_option_value("--tolerance", "0.25"))
+    results_file = get_option_value("--results", str(script_directory / "benchmark_results.json"))
+    baseline_file = get_option_value("--baseline", results_file)
+
+    # Status output of the checks would interleave with the benchmark output
+    AS6_migration.show_progress = False
+
+    measurements = {}
+    for size in sizes:
+        measurements[str(size)] = benchmark_size(size, hardware_modules, jobs)
+
+    print("\nValidating the differential scan...")
+    differential_scan_errors = validate_differential_scan()
+
+    print(f"\n{'Files':>8}  {'Step':<40}{'Time [s]':>10}")
+    for size, current in measurements.items():
+        for name, elapsed in current["timings"].items():
+            print(f"{current['files']:>8}  {name:<40}{elapsed:>10.2f}")
+
+    failed = False
+    for size, current in measurements.items():
+        for error in current["errors"]:
+            print(f"[FAILED] {size} files, {error}")
+            failed = True
+    for error in differential_scan_errors:
+        print(f"[FAILED] {error}")
+        failed = True
+
+    if os.path.isfile(baseline_file):
+        with open(baseline_file, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(measurements, baseline["sizes"], tolerance)
+        for regression in regressions:
+            print(f"[REGRESSION] {regression}")
+        if not regressions:
+            print(f"\nNo regressions compared to {baseline_file} ({baseline['date']}).")
+        failed = failed or bool(regressions)
+
+    with open(results_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": jobs,
+            "hardware_modules": hardware_modules,
+            "sizes": measurements,
+        }, f, indent=2)
+    print(f"\nResults have been saved to {results_file}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
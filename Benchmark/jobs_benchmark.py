@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import tempfile
+
+from pathlib import Path
+
+from project_generator import generate_project
+
+# Make the AS6 migration script importable
+script_directory = Path(__file__).resolve().parent
+sys.path.insert(0, str(script_directory.parent / "AS6_migration"))
+
+import AS6_migration
+
+
+def run_scan(project_path, jobs):
+    """
+    Runs the content scan once and measures the elapsed time.
+
+    Args:
+        project_path (str): Path to the project directory.
+        jobs (int): Number of worker processes, None for the thread pool.
+
+    Returns:
+        float: Elapsed time in seconds.
+    """
+    start_time = time.perf_counter()
+    AS6_migration.scan_files_parallel(project_path, AS6_migration.scan_rules, jobs)
+    return time.perf_counter() - start_time
+
+
+def main():
+    """
+    Measures the scan throughput of the thread pool and of the process pool with an increasing number of cores.
+    """
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cpu_count = os.cpu_count() or 1
+
+    job_counts = [1]
+    while job_counts[-1] * 2 <= cpu_count:
+        job_counts.append(job_counts[-1] * 2)
+    if job_counts[-1] != cpu_count:
+        job_counts.append(cpu_count)
+
+    # Status output of the scan would bury the results table
+    AS6_migration.show_progress = False
+
+    with tempfile.TemporaryDirectory() as project_path:
+        print(f"Creating synthetic project with {file_count} files...")
+        generate_project(project_path, file_count)
+        # The generator adds package, library and hardware files, so the throughput is based on the scanned files
+        project_index = AS6_migration.build_project_index(project_path)
+        scanned_files = len(AS6_migration.collect_scan_targets(project_index, AS6_migration.scan_rules))
+        print(f"Scanning {scanned_files} files...")
+
+        measurements = [("threads", run_scan(project_path, None))]
+        for jobs in job_counts:
+            measurements.append((f"--jobs {jobs}", run_scan(project_path, jobs)))
+
+    print(f"\n{'Mode':<12}{'Time [s]':>10}{'Files/s':>12}{'Speedup':>10}")
+    baseline = measurements[0][1]
+    for mode, elapsed in measurements:
+        print(f"{mode:<12}{elapsed:>10.2f}{scanned_files / elapsed:>12.0f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
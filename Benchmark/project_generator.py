@@ -0,0 +1,363 @@
+import os
+import sys
+import random
+
+from collections import Counter
+
+
+# Symbols seeded into the generated source files. Each list only contains entries of the discontinuation lists
+# (or of the rewriter mappings) that do not overlap with any other list, so every seeded symbol causes exactly
+# the findings recorded by generate_project.
+obsolete_functions = ["PV_xgetval", "MEM_alloc", "SW_gettime", "ST_suspend"]
+deprecated_string_calls = ["strcpy(ADR(target), ADR(source))", "memcpy(ADR(target), ADR(source), 10)", "atoi(ADR(source))"]
+deprecated_math_calls = ["atan2(1.0, 2.0)", "pow(value, 2.0)", "floor(value)"]
+obsolete_function_blocks = ["SysconfInfo", "BatteryInfo", "EXCInfo"]
+obsolete_include_libraries = ["AsTPU", "AsARCNET", "IOConfig"]
+# Directories written in front of the seeded library headers, only the file name of a header refers to the library
+include_directories = ["", "bur/", "..\\"]
+opcua_enumerators = ["UAIdentifierType_String", "UASecurityPolicy_None"]
+opcua_function_blocks = ["UaClt_ReadBulk", "UaClt_WriteBulk"]
+opcua_types = ["UADataValue", "UAByteString"]
+
+# Libraries of Logical/Libraries/Package.pkg in the format (name, language, finding rules)
+project_libraries = [
+    ("AsARCNET", "binary", ["invalid_pkg_files"]),
+    ("AsTPU", "binary", ["invalid_pkg_files"]),
+    ("AsString", "binary", ["invalid_pkg_files"]),
+    ("AsMath", "binary", ["invalid_pkg_files"]),
+    ("MTTypes", "binary", ["reinstall_libraries"]),
+    ("AsBrStr", "binary", []),
+    ("AsOpcUac", "binary", []),
+]
+obsolete_library_dependencies = ["AsTPU", "IOConfig"]
+
+supported_hardware = ["X20DI9371", "X20DO9322", "X20AI4622", "X20BC0083", "X20PS9400"]
+unsupported_hardware = ["3AI350.6", "3CP340.60-1", "3DI475.6", "4PP045.0571-062"]
+
+# Number of source files per program: Main.st, Main.var, Types.typ and Helper.c
+files_per_program = 4
+programs_per_group = 100
+programs_per_library = 50
+
+
+def write_file(file_path, content):
+    """
+    Writes a generated file, creating its directory if needed.
+
+    Args:
+        file_path (str): Path to the file.
+        content (str): Content of the file.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(content)
+
+
+def package_file(objects, package_type="Package"):
+    """
+    Creates the content of a Package.pkg file.
+
+    Args:
+        objects (list): Objects of the package in the format (type, name) or (type, name, language).
+        package_type (str): Root element of the package.
+
+    Returns:
+        str: Content of the file.
+    """
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<?AutomationStudio Version="4.12.5.95"?>',
+        f'<{package_type} xmlns="http://br-automation.co.at/AS/{package_type}">',
+        "  <Objects>",
+    ]
+    for entry in objects:
+        language = f' Language="{entry[2]}"' if len(entry) > 2 else ""
+        lines.append(f'    <Object Type="{entry[0]}"{language}>{entry[1]}</Object>')
+    lines += ["  </Objects>", f"</{package_type}>", ""]
+    return "\n".join(lines)
+
+
+def generate_program(program_dir, index, rng, expected):
+    """
+    Generates the source files of one program and records the findings seeded into them.
+
+    Args:
+        program_dir (str): Directory of the program.
+        index (int): Number of the program.
+        rng (random.Random): Random generator of the project.
+        expected (dict): Expected results, see generate_project. Updated in place.
+    """
+    findings = expected["findings"]
+    rewriters = expected["rewriters"]
+    filler = "".join(f"    counter{line} := counter{line} + {line};\n" for line in range(40))
+
+    # Structured text: obsolete functions, deprecated string and math functions, OPC UA enumerators
+    st_path = os.path.join(program_dir, "Main.st")
+    body = ["PROGRAM _CYCLIC\n", filler]
+    if rng.random() < 1 / 3:
+        function = rng.choice(obsolete_functions)
+        # The keywords are case-sensitive, so the name in other case before the call is neither reported nor located
+        body.append(f"    (* {function.lower()} is called below *)\n")
+        body.append(f"    status := {function}(1);\n")
+        findings["invalid_st_c_files"][(st_path, function)] += 1
+        line = sum(part.count("\n") for part in body)
+        expected["locations"]["invalid_st_c_files"][(st_path, function)] = (line, len("    status := ") + 1)
+    if rng.random() < 1 / 4:
+        body.append(f"    result := {rng.choice(deprecated_string_calls)};\n")
+        findings["deprecated_string_functions"][(st_path, None)] += 1
+        rewriters["AsStringToAsBrStr"]["functions"] += 1
+    if rng.random() < 1 / 5:
+        body.append(f"    value := {rng.choice(deprecated_math_calls)};\n")
+        findings["deprecated_math_functions"][(st_path, None)] += 1
+        rewriters["AsMathToAsBrMath"]["functions"] += 1
+    if rng.random() < 1 / 6:
+        body.append(f"    identifier.IdentifierType := {rng.choice(opcua_enumerators)};\n")
+        rewriters["AsOpcUacRename"]["enumerators"] += 1
+    body.append("END_PROGRAM\n")
+    write_file(st_path, "".join(body))
+
+    # Variable declarations: obsolete function blocks and OPC UA function blocks
+    var_path = os.path.join(program_dir, "Main.var")
+    body = ["VAR\n", "    timer : TON;\n", "    value : REAL;\n"]
+    if rng.random() < 1 / 4:
+        function_block = rng.choice(obsolete_function_blocks)
+        body.append(f"    legacy{index} : {function_block};\n")
+        findings["invalid_var_typ_files"][(var_path, function_block)] += 1
+    if rng.random() < 1 / 6:
+        body.append(f"    client{index} : {rng.choice(opcua_function_blocks)};\n")
+        rewriters["AsOpcUacRename"]["function blocks"] += 1
+    body.append("END_VAR\n")
+    write_file(var_path, "".join(body))
+
+    # Data types: obsolete function blocks and OPC UA types
+    typ_path = os.path.join(program_dir, "Types.typ")
+    body = ["TYPE\n", f"    Program{index}Type : STRUCT\n", "        count : UDINT;\n"]
+    if rng.random() < 1 / 8:
+        function_block = rng.choice(obsolete_function_blocks)
+        body.append(f"        info : {function_block};\n")
+        findings["invalid_var_typ_files"][(typ_path, function_block)] += 1
+    if rng.random() < 1 / 6:
+        body.append(f"        data : {rng.choice(opcua_types)};\n")
+        rewriters["AsOpcUacRename"]["types"] += 1
+    body += ["    END_STRUCT;\n", "END_TYPE\n"]
+    write_file(typ_path, "".join(body))
+
+    # C source: obsolete library headers, obsolete functions and OPC UA enumerators
+    c_path = os.path.join(program_dir, "Helper.c")
+    body = ["#include <bur/plctypes.h>\n"]
+    if rng.random() < 1 / 6:
+        library = rng.choice(obsolete_include_libraries)
+        body.append(f'#include "{include_directories[index % len(include_directories)]}{library}.h"\n')
+        findings["c_include_dependencies"][(c_path, library)] += 1
+    body.append(f"\nvoid Helper{index}(void)\n{{\n")
+    if rng.random() < 1 / 8:
+        function = rng.choice(obsolete_functions)
+        body.append(f"    {function}(16);\n")
+        findings["invalid_st_c_files"][(c_path, function)] += 1
+    if rng.random() < 1 / 10:
+        body.append(f"    int mode = {rng.choice(opcua_enumerators)};\n")
+        rewriters["AsOpcUacRename"]["enumerators"] += 1
+    body.append("}\n")
+    write_file(c_path, "".join(body))
+
+    write_file(os.path.join(program_dir, "Package.pkg"), "\n".join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<?AutomationStudio Version="4.12.5.95"?>',
+        '<Program SubType="IEC" xmlns="http://br-automation.co.at/AS/Program">',
+        "  <Files>",
+        '    <File Description="Cyclic code">Main.st</File>',
+        '    <File Description="Local variables" Private="true">Main.var</File>',
+        '    <File Description="Local data types" Private="true">Types.typ</File>',
+        "    <File>Helper.c</File>",
+        "  </Files>",
+        "</Program>",
+        "",
+    ]))
+
+
+def generate_hardware(hardware_path, module_count, version, rng, expected):
+    """
+    Generates a Hardware.hw file and records the unsupported modules and the version finding.
+
+    Args:
+        hardware_path (str): Path to the Hardware.hw file.
+        module_count (int): Number of modules.
+        version (str): Automation Studio version of the configuration.
+        rng (random.Random): Random generator of the project.
+        expected (dict): Expected results, see generate_project. Updated in place.
+    """
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<?AutomationStudio Version="{version}" FileVersion="4.9"?>',
+        '<Hardware xmlns="http://br-automation.co.at/AS/Hardware">',
+        '  <Module Name="PLC" Type="X20CP3687X" Version="1.0.0" />',
+        # Commented out modules are not part of the configuration and are never reported
+        f'  <!-- <Module Name="Removed" Type="{unsupported_hardware[0]}" Version="1.0.0" /> -->',
+    ]
+    unsupported_modules = set()
+    line_count = len(lines)
+    for i in range(module_count):
+        # Editors separate the attributes by a space, a tab or a line break
+        separator = [" ", "\t", "\n    "][i % 3]
+        if rng.random() < 0.05:
+            module_type = rng.choice(unsupported_hardware)
+            if module_type not in unsupported_modules:
+                # The first module of the type is reported, at its Type value, and never the commented out one
+                type_prefix = f'  <Module Name="Module{i}"{separator}Type="'
+                expected["locations"]["hardware"][(hardware_path, module_type)] = (
+                    line_count + 1 + type_prefix.count("\n"), len(type_prefix.rsplit("\n", 1)[-1]) + 1
+                )
+            unsupported_modules.add(module_type)
+        else:
+            module_type = rng.choice(supported_hardware)
+        line_count += 3 + separator.count("\n")
+        lines.append(f'  <Module Name="Module{i}"{separator}Type="{module_type}" Version="1.0.0">')
+        lines.append(f'    <Connection Connector="SS1" TargetModule="Module{i - 1 if i else "PLC"}" TargetConnector="SS2" />')
+        lines.append("  </Module>")
+    lines += ["</Hardware>", ""]
+    write_file(hardware_path, "\n".join(lines))
+
+    for module_type in unsupported_modules:
+        expected["findings"]["hardware"][(hardware_path, module_type)] += 1
+    if not version.startswith("4.12"):
+        expected["findings"]["compatibility"][(hardware_path, f"Version {version}")] += 1
+
+
+def generate_project(root_dir, file_count, hardware_modules=2000, configurations=2, seed=0):
+    """
+    Generates a synthetic Automation Studio 4 project with known obsolete symbols.
+    The project contains the .apj file, the package hierarchy, libraries with .lby files, programs with
+    .st/.var/.typ/.c files and Physical configurations with large Hardware.hw files. The same arguments always
+    generate the same project.
+
+    Args:
+        root_dir (str): Directory to create the project in.
+        file_count (int): Number of program source files, rounded up to a multiple of four.
+        hardware_modules (int): Number of modules per Hardware.hw file.
+        configurations (int): Number of Physical configurations. The last one uses an old Automation Studio version.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict: Expected results in the format {"findings": {scan rule: Counter of (file_path, detail)},
+              "locations": {scan rule: {(file_path, detail): (line, column)}},
+              "rewriters": {script: {"functions", "function blocks", "types", "enumerators"}}, "files": count}.
+              Locations are only recorded for the findings of the rules invalid_st_c_files and hardware.
+    """
+    rng = random.Random(seed)
+    expected = {
+        "findings": {
+            name: Counter() for name in (
+                "reinstall_libraries", "invalid_pkg_files", "invalid_var_typ_files", "invalid_st_c_files", "hardware",
+                "lby_dependencies", "c_include_dependencies", "deprecated_string_functions",
+                "deprecated_math_functions", "compatibility",
+            )
+        },
+        "locations": {"invalid_st_c_files": {}, "hardware": {}},
+        "rewriters": {
+            "AsStringToAsBrStr": Counter(),
+            "AsMathToAsBrMath": Counter(),
+            "AsOpcUacRename": Counter(),
+        },
+        "files": 0,
+    }
+
+    write_file(os.path.join(root_dir, "Benchmark.apj"), "\n".join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<?AutomationStudio Version="4.12.5.95" WorkingVersion="4.12"?>',
+        '<Project Version="1.00.0" xmlns="http://br-automation.co.at/AS/Project">',
+        "  <Communication />",
+        "  <ANSIC DefaultIncludes=\"true\" />",
+        '  <IEC ExtendedConstants="true" IecExtendedComments="true" KeywordsAsStructureMembers="false" />',
+        '  <Motion RestartAcoposParameter="true" RestartInitParameter="true" />',
+        '  <Variables DefaultInitValue="0" DefaultRetain="false" DefaultVolatile="true" />',
+        "  <TechnologyPackages>",
+        '    <mapp Version="5.24.2" />',
+        '    <mappMotion Version="5.24.2" />',
+        '    <mappServices Version="5.24.2" />',
+        "  </TechnologyPackages>",
+        "</Project>",
+        "",
+    ]))
+
+    logical_dir = os.path.join(root_dir, "Logical")
+    write_file(os.path.join(logical_dir, "Package.pkg"), package_file([("Package", "Libraries"), ("Package", "Programs")]))
+
+    # Programs, grouped into packages of programs_per_group
+    program_count = max(1, -(-file_count // files_per_program))
+    programs_dir = os.path.join(logical_dir, "Programs")
+    group_count = -(-program_count // programs_per_group)
+    write_file(os.path.join(programs_dir, "Package.pkg"), package_file([("Package", f"Group{g}") for g in range(group_count)]))
+    for group in range(group_count):
+        group_dir = os.path.join(programs_dir, f"Group{group}")
+        indices = range(group * programs_per_group, min(program_count, (group + 1) * programs_per_group))
+        write_file(os.path.join(group_dir, "Package.pkg"), package_file([("Program", f"Task{i}", "IEC") for i in indices]))
+        for i in indices:
+            generate_program(os.path.join(group_dir, f"Task{i}"), i, rng, expected)
+    expected["files"] += program_count * files_per_program
+
+    # Libraries: the referenced system libraries and one user library per programs_per_library programs
+    libraries_dir = os.path.join(logical_dir, "Libraries")
+    user_libraries = [f"BenchLib{i}" for i in range(max(1, program_count // programs_per_library))]
+    libraries_pkg = os.path.join(libraries_dir, "Package.pkg")
+    write_file(libraries_pkg, package_file(
+        [("Library", name, language) for name, language, _ in project_libraries] + [("Library", name, "IEC") for name in user_libraries]
+    ))
+    for name, _, rules in project_libraries:
+        for rule in rules:
+            expected["findings"][rule][(libraries_pkg, name)] += 1
+
+    for library in user_libraries:
+        lby_path = os.path.join(libraries_dir, library, f"{library}.lby")
+        dependencies = ["AsBrStr"]
+        if rng.random() < 0.5:
+            dependency = rng.choice(obsolete_library_dependencies)
+            dependencies.append(dependency)
+            expected["findings"]["lby_dependencies"][(lby_path, dependency)] += 1
+        write_file(lby_path, "\n".join(
+            [
+                '<?xml version="1.0" encoding="utf-8"?>',
+                '<?AutomationStudio Version="4.12.5.95"?>',
+                '<Library Version="1.00.0" SubType="IEC" xmlns="http://br-automation.co.at/AS/Library">',
+                "  <Files>",
+                f'    <File Description="Exported functions">{library}.fun</File>',
+                "  </Files>",
+                "  <Dependencies>",
+            ]
+            + [f'    <Dependency ObjectName="{dependency}" />' for dependency in dependencies]
+            + ["  </Dependencies>", "</Library>", ""]
+        ))
+        write_file(os.path.join(libraries_dir, library, f"{library}.fun"), f"FUNCTION {library}Run : BOOL\n    VAR_INPUT\n        enable : BOOL;\n    END_VAR\nEND_FUNCTION\n")
+        expected["files"] += 2
+
+    # Physical configurations, the last one with an outdated version
+    physical_dir = os.path.join(root_dir, "Physical")
+    configuration_names = [f"Config{i + 1}" for i in range(configurations)]
+    write_file(os.path.join(physical_dir, "Physical.pkg"), package_file([("Configuration", name) for name in configuration_names], "Physical"))
+    for i, name in enumerate(configuration_names):
+        version = "4.10.3.60" if i == configurations - 1 and configurations > 1 else "4.12.5.95"
+        generate_hardware(os.path.join(physical_dir, name, "Hardware.hw"), hardware_modules, version, rng, expected)
+        expected["files"] += 1
+
+    return expected
+
+
+def main():
+    """
+    Generates a synthetic project into the given directory.
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python project_generator.py <directory> [number-of-files] [hardware-modules]")
+        sys.exit(1)
+
+    root_dir = sys.argv[1]
+    file_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    hardware_modules = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    expected = generate_project(root_dir, file_count, hardware_modules)
+    print(f"Generated {expected['files']} files in {root_dir}")
+    for name, findings in expected["findings"].items():
+        print(f"{name:<30}{sum(findings.values()):>8}")
+
+
+if __name__ == "__main__":
+    main()